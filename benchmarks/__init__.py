@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the IrintAI Assistant hot paths
+
+Run with:
+    python -m benchmarks.run_benchmarks --output data/benchmarks/latest.json
+"""
@@ -0,0 +1,654 @@
+"""
+IrintAI Assistant Benchmark Suite
+
+Measures the latency and throughput of the assistant's hot paths against a
+local stub Ollama, and compares them with a stored baseline so regressions
+are caught:
+
+    python -m benchmarks.run_benchmarks --output data/benchmarks/latest.json
+    python -m benchmarks.run_benchmarks --baseline data/benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --save-baseline data/benchmarks/baseline.json
+
+Benchmarks:
+    chat.send_message        ChatEngine.send_message round trip
+    chat.streaming           Time to first token and total through on_chunk
+    memory.search.<n>        MemorySystem.search over n synthetic documents
+    memory.search_many.<n>   Per-query latency of one MemorySystem.search_many batch
+    memory.ingest            MemorySystem.add_file_to_index on a large text file
+    memory.quantized.<kind>  Recall@10 (raw and after exact re-ranking), bytes per
+                             vector and search latency of int8 / PQ storage
+    pdf.cleanup              EnhancedPDFExtractor text cleanup on a large synthetic PDF
+    pdf.cleanup_legacy       The same cleanup done step by step, as it was before the
+                             single-pass engine (reference for the speedup)
+    event_bus.publish_sync   EventBus.publish throughput (synchronous dispatch)
+    event_bus.publish_async  EventBus.publish throughput (queued dispatch)
+"""
+import os
+import sys
+import json
+import time
+import re
+import zlib
+import platform
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+# Add project root to sys.path to allow importing core modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.stub_ollama import StubOllamaCLI, STUB_MODELS
+
+# Default allowed slowdown before a result counts as a regression
+DEFAULT_THRESHOLD = 0.20
+
+
+def _quiet(message, *args, **kwargs):
+    """Logger that discards messages"""
+    pass
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize a list of samples
+
+    Args:
+        samples: Measured values
+
+    Returns:
+        Dictionary with mean, p50, p95, min and max
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def latency_result(samples: List[float], **extra) -> Dict[str, Any]:
+    """Build a result whose headline metric is p50 latency in milliseconds"""
+    stats = {k: v * 1000.0 for k, v in summarize(samples).items()}
+    result = {"metric": "p50", "unit": "ms", "higher_is_better": False,
+              "value": stats.get("p50"), "samples": len(samples), "stats": stats}
+    result.update(extra)
+    return result
+
+
+def throughput_result(count: int, elapsed: float, unit: str, **extra) -> Dict[str, Any]:
+    """Build a result whose headline metric is operations per second"""
+    result = {"metric": "throughput", "unit": unit, "higher_is_better": True,
+              "value": count / elapsed if elapsed > 0 else 0.0, "samples": count,
+              "elapsed": elapsed}
+    result.update(extra)
+    return result
+
+
+class HashingEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer
+
+    Produces pseudo-random unit vectors seeded by the text, so memory
+    benchmarks measure indexing and scoring rather than model inference.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, convert_to_tensor: bool = True, **kwargs):
+        import torch
+        vectors = []
+        for text in texts:
+            generator = torch.Generator().manual_seed(zlib.crc32(text.encode("utf-8")))
+            vectors.append(torch.randn(self.dim, generator=generator))
+        embeddings = torch.nn.functional.normalize(torch.stack(vectors), dim=1)
+        return embeddings if convert_to_tensor else embeddings.numpy()
+
+
+class TableEncoder:
+    """
+    Encoder returning fixed vectors for known texts
+
+    Lets benchmarks run MemorySystem's real search (and rerank) path over
+    synthetic embeddings: each text embeds to the vector registered for it.
+    """
+
+    def __init__(self, vectors: Dict[str, Any]):
+        self.vectors = vectors
+
+    def encode(self, texts, convert_to_tensor: bool = True, **kwargs):
+        import torch
+        embeddings = torch.stack([self.vectors[text] for text in texts])
+        return embeddings if convert_to_tensor else embeddings.numpy()
+
+
+def create_memory_system(index_path: str, real_model: bool = False, dim: int = 384,
+                         encoder: Any = None, **options):
+    """
+    Create a MemorySystem for benchmarking
+
+    Args:
+        index_path: Vector store path (inside a temporary directory)
+        real_model: Use the real embedding model instead of HashingEncoder
+        dim: Embedding dimension for HashingEncoder
+        encoder: Encoder to use instead of HashingEncoder
+        **options: Further MemorySystem arguments (e.g. quantization)
+
+    Returns:
+        MemorySystem instance
+    """
+    from core.memory_system import MemorySystem
+
+    if real_model:
+        return MemorySystem(index_path=index_path, logger=_quiet, **options)
+
+    class BenchmarkMemorySystem(MemorySystem):
+        def load_model(self) -> bool:
+            self.model = encoder or HashingEncoder(dim)
+            return True
+
+    return BenchmarkMemorySystem(index_path=index_path, logger=_quiet, **options)
+
+
+def populate_memory(memory_system, count: int, dim: int = 384, seed: int = 0) -> None:
+    """
+    Fill a MemorySystem with synthetic rows without going through the encoder
+
+    Args:
+        memory_system: MemorySystem instance
+        count: Number of rows
+        dim: Embedding dimension
+        seed: Random seed
+    """
+    import torch
+    generator = torch.Generator().manual_seed(seed)
+    vectors = torch.nn.functional.normalize(torch.randn(count, dim, generator=generator), dim=1)
+    memory_system.index = [vectors[i] for i in range(count)]
+    memory_system.documents = [
+        {
+            "source": f"doc_{i // 10}.txt",
+            "path": f"/bench/doc_{i // 10}.txt",
+            "text": f"synthetic chunk {i}",
+            "chunk": i % 10 + 1,
+            "timestamp": "2024-01-01 00:00:00",
+        }
+        for i in range(count)
+    ]
+    memory_system.rebuild_indexes()
+
+
+def legacy_pdf_cleanup(text: str) -> str:
+    """
+    Reference PDF text cleanup, one pass per rule and one replace per
+    repeated line, as EnhancedPDFExtractor did it before its single-pass engine
+
+    Args:
+        text: Extracted text
+
+    Returns:
+        Cleaned text
+    """
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\xFF]', '', text)
+    text = text.replace("\uFFFD", "")
+    for symbol, name in (("α", "alpha"), ("β", "beta"), ("γ", "gamma"),
+                         ("Δ", "Delta"), ("π", "pi"), ("∞", "infinity")):
+        text = text.replace(symbol, name)
+    text = re.sub(r' {2,}', ' ', text)
+    text = re.sub(r'([a-zA-Z])- *\n *([a-zA-Z])', r'\1\2', text)
+
+    line_counts: Dict[str, int] = {}
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) > 5:
+            line_counts[line] = line_counts.get(line, 0) + 1
+    for pattern, count in line_counts.items():
+        if count >= 3:
+            text = text.replace(pattern, '')
+    return re.sub(r'\n{3,}', '\n\n', text)
+
+
+def synthetic_pdf_text(pages: int, seed: int = 0) -> str:
+    """
+    Build text shaped like a long extracted PDF: running headers and footers,
+    numbered page furniture, hyphenated line breaks, stray control characters
+    and math symbols
+
+    Args:
+        pages: Number of pages
+        seed: Seed for the body text
+
+    Returns:
+        Extracted-style text
+    """
+    parts = []
+    for page in range(pages):
+        # Running headers change every few pages, as chapter titles do
+        parts.append(f"ACME Corp Confidential Report\nChapter {page // 8 + 1}:  Quarterly Review\n\n")
+        for line in range(40):
+            n = zlib.crc32(f"{seed}-{page}-{line}".encode()) % 1000
+            parts.append(f"Line {line} of page {page} discusses item {n} and its  results")
+            if line % 8 == 7:
+                parts.append(" in a hyphen-\nated form")
+            elif line % 20 == 3:
+                parts.append(" with ratio π/∞\x0c")
+            parts.append(".\n")
+        parts.append(f"\n\n\nPage {page + 1}\nCopyright 2024 ACME Corp\n")
+    return "".join(parts)
+
+
+class BenchmarkSuite:
+    """Runs the benchmarks and compares results with a baseline"""
+
+    def __init__(self,
+                 iterations: int = 20,
+                 memory_sizes: Optional[List[int]] = None,
+                 token_rate: float = 200.0,
+                 latency: float = 0.05,
+                 tokens: int = 64,
+                 real_model: bool = False,
+                 quantization_size: int = 10000,
+                 logger: Optional[Callable] = None):
+        """
+        Initialize the benchmark suite
+
+        Args:
+            iterations: Iterations for latency benchmarks
+            memory_sizes: Corpus sizes for the memory search benchmark
+            token_rate: Stub tokens per second
+            latency: Stub first-token latency in seconds
+            tokens: Stub tokens per response
+            real_model: Use the real embedding model for memory benchmarks
+            quantization_size: Corpus size for the quantization benchmark
+            logger: Optional progress logging function
+        """
+        self.iterations = iterations
+        self.memory_sizes = memory_sizes or [1000, 10000, 100000]
+        self.stub_settings = {"token_rate": token_rate, "latency": latency, "tokens": tokens}
+        self.real_model = real_model
+        self.quantization_size = quantization_size
+        self.log = logger or print
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.workdir = tempfile.mkdtemp(prefix="irintai_bench_")
+
+    def run_all(self, selected: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run all (or the selected) benchmark groups
+
+        Args:
+            selected: Optional list of groups (chat, memory, ingest, quantization, pdf, event_bus)
+
+        Returns:
+            Dictionary of results keyed by benchmark name
+        """
+        groups = {
+            "chat": self.bench_chat,
+            "memory": self.bench_memory_search,
+            "ingest": self.bench_memory_ingest,
+            "quantization": self.bench_quantization,
+            "pdf": self.bench_pdf_cleanup,
+            "event_bus": self.bench_event_bus,
+        }
+        for name, bench in groups.items():
+            if selected and name not in selected:
+                continue
+            self.log(f"[Benchmark] Running {name}...")
+            try:
+                bench()
+            except Exception as e:
+                self.log(f"[Benchmark] {name} failed: {e}")
+                self.results[f"{name}.error"] = {"error": str(e)}
+        return self.results
+
+    def bench_chat(self) -> None:
+        """Benchmark ChatEngine.send_message, blocking and streaming"""
+        from core.model_manager import ModelManager
+        from core.chat_engine import ChatEngine
+
+        with StubOllamaCLI(**self.stub_settings):
+            model_manager = ModelManager(model_path=os.path.join(self.workdir, "models"), logger=_quiet)
+            model_manager.current_model = STUB_MODELS[0]
+            chat_engine = ChatEngine(
+                model_manager=model_manager,
+                session_file=os.path.join(self.workdir, "chat_history.json"),
+                logger=_quiet
+            )
+
+            try:
+                # History is cleared before every message, so each prompt is the same size
+                blocking = []
+                for i in range(self.iterations):
+                    chat_engine.clear_history()
+                    start = time.perf_counter()
+                    chat_engine.send_message(f"Benchmark question number {i}?")
+                    blocking.append(time.perf_counter() - start)
+                    # A failed generation returns quickly; its time is not a latency
+                    if not chat_engine.last_success:
+                        raise RuntimeError("send_message got no response from the model")
+                self.results["chat.send_message"] = latency_result(blocking)
+
+                ttft, total = [], []
+                for i in range(self.iterations):
+                    chat_engine.clear_history()
+                    timings = {}
+                    chunks = []
+                    chat_engine.send_message(f"Streaming question number {i}?",
+                                             on_chunk=chunks.append, timings=timings)
+                    if not chat_engine.last_success or not chunks:
+                        raise RuntimeError("streaming send_message produced no output")
+                    ttft.append(timings["ttft"])
+                    total.append(timings["total"])
+                self.results["chat.streaming.ttft"] = latency_result(ttft)
+                self.results["chat.streaming.total"] = latency_result(total)
+            finally:
+                model_manager.scheduler.stop()
+
+    def bench_memory_search(self) -> None:
+        """Benchmark MemorySystem.search at each corpus size"""
+        queries = [f"how do I configure feature {i}" for i in range(self.iterations)]
+        for size in self.memory_sizes:
+            # Without the result cache, so repeated queries measure the search itself
+            memory_system = create_memory_system(
+                os.path.join(self.workdir, f"search_{size}", "vector_store.json"),
+                real_model=self.real_model, cache_size=0
+            )
+            populate_memory(memory_system, size)
+
+            # Warm up (model caches, allocator)
+            memory_system.search(queries[0])
+
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                memory_system.search(query, top_k=5)
+                samples.append(time.perf_counter() - start)
+            self.results[f"memory.search.{size}"] = latency_result(samples, documents=size)
+
+            # The same queries as one batch, reported per query
+            samples = []
+            for _ in range(3):
+                start = time.perf_counter()
+                memory_system.search_many(queries, top_k=5)
+                samples.append((time.perf_counter() - start) / len(queries))
+            self.results[f"memory.search_many.{size}"] = latency_result(samples, documents=size, batch=len(queries))
+
+    def bench_memory_ingest(self) -> None:
+        """Benchmark chunking, embedding and persisting a large text file"""
+        memory_system = create_memory_system(
+            os.path.join(self.workdir, "ingest", "vector_store.json"),
+            real_model=self.real_model
+        )
+        sentence = "The assistant indexes local documents so answers can cite them. "
+        path = os.path.join(self.workdir, "ingest_corpus.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(20000):
+                f.write(f"Sentence {i}: {sentence}")
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        start = time.perf_counter()
+        memory_system.add_file_to_index(path)
+        elapsed = time.perf_counter() - start
+
+        self.results["memory.ingest"] = throughput_result(
+            len(memory_system.documents), elapsed, "chunks/s", size_mb=size_mb
+        )
+
+    def bench_quantization(self, dim: int = 384, k: int = 10) -> None:
+        """Measure recall and footprint of quantized embedding storage"""
+        import torch
+        from core.vector_quantization import create_quantized_index
+
+        # Clustered data resembles real embeddings far better than uniform noise
+        generator = torch.Generator().manual_seed(1)
+        centers = torch.randn(200, dim, generator=generator)
+        assignment = torch.randint(0, 200, (self.quantization_size,), generator=generator)
+        data = centers[assignment] + 0.3 * torch.randn(self.quantization_size, dim, generator=generator)
+        data = torch.nn.functional.normalize(data, dim=1)
+
+        query_count = max(50, self.iterations)
+        picks = torch.randint(0, self.quantization_size, (query_count,), generator=generator)
+        queries = torch.nn.functional.normalize(
+            data[picks] + 0.1 * torch.randn(query_count, dim, generator=generator), dim=1)
+        exact = [set(torch.topk(data @ q, k).indices.tolist()) for q in queries]
+
+        # The reranked recall goes through MemorySystem's own rerank path
+        texts = [f"vector {i}" for i in range(self.quantization_size)]
+        query_texts = [f"query {i}" for i in range(query_count)]
+        encoder = TableEncoder(dict(zip(texts + query_texts, list(data) + list(queries))))
+        documents = [{"source": "quantization.txt", "text": text, "row": i} for i, text in enumerate(texts)]
+
+        for kind in ("int8", "pq"):
+            index = create_quantized_index(kind)
+            index.extend(data)
+
+            hits, samples = 0, []
+            for query, truth in zip(queries, exact):
+                start = time.perf_counter()
+                scores = index.scores(query)
+                found = torch.topk(scores, k).indices.tolist()
+                samples.append(time.perf_counter() - start)
+                hits += len(truth.intersection(found))
+
+            memory_system = create_memory_system(
+                os.path.join(self.workdir, f"quantized_{kind}", "vector_store.json"),
+                encoder=encoder, quantization=kind, rerank=True, cache_size=0
+            )
+            memory_system.index = index
+            memory_system.documents = [dict(doc) for doc in documents]
+            memory_system.rebuild_indexes()
+            reranked_hits = sum(
+                len(truth.intersection(result["row"] for result in results))
+                for truth, results in zip(exact, memory_system.search_many(query_texts, top_k=k))
+            )
+
+            prefix = f"memory.quantized.{kind}"
+            self.results[f"{prefix}.recall_at_{k}"] = {
+                "metric": "recall", "unit": "recall", "higher_is_better": True,
+                "value": hits / (k * query_count), "samples": query_count,
+            }
+            self.results[f"{prefix}.recall_at_{k}_reranked"] = {
+                "metric": "recall", "unit": "recall", "higher_is_better": True,
+                "value": reranked_hits / (k * query_count), "samples": query_count,
+            }
+            self.results[f"{prefix}.bytes_per_vector"] = {
+                "metric": "bytes", "unit": "bytes", "higher_is_better": False,
+                "value": index.nbytes() / self.quantization_size, "samples": self.quantization_size,
+                "float32_bytes": dim * 4,
+            }
+            self.results[f"{prefix}.search"] = latency_result(samples, documents=self.quantization_size)
+
+    def bench_pdf_cleanup(self, pages: int = 2000) -> None:
+        """Benchmark PDF text cleanup against the step-by-step reference"""
+        from file_operations.pdf_file_ops import EnhancedPDFExtractor
+
+        extractor = EnhancedPDFExtractor(logger=_quiet, workers=1)
+        text = synthetic_pdf_text(pages)
+        size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+
+        def engine(raw: str) -> str:
+            return extractor._apply_global_cleaning(extractor._preprocess_text(raw))
+
+        outputs = {}
+        for name, cleanup in (("pdf.cleanup", engine), ("pdf.cleanup_legacy", legacy_pdf_cleanup)):
+            samples = []
+            for _ in range(3):
+                start = time.perf_counter()
+                outputs[name] = cleanup(text)
+                samples.append(time.perf_counter() - start)
+            self.results[name] = latency_result(samples, pages=pages, size_mb=size_mb)
+        self.results["pdf.cleanup"]["identical"] = outputs["pdf.cleanup"] == outputs["pdf.cleanup_legacy"]
+
+    def bench_event_bus(self) -> None:
+        """Benchmark EventBus publish throughput"""
+        from plugins.plugin_event_bus import EventBus
+
+        count = max(1000, self.iterations * 500)
+
+        bus = EventBus(logger=None)
+        received = [0]
+
+        def handler(name, data, event):
+            received[0] += 1
+
+        bus.subscribe("bench.tick", handler)
+        bus.subscribe("bench.*", handler)
+
+        start = time.perf_counter()
+        for i in range(count):
+            bus.publish("bench.tick", i)
+        self.results["event_bus.publish_sync"] = throughput_result(count, time.perf_counter() - start, "events/s")
+
+        bus.start()
+        received[0] = 0
+        start = time.perf_counter()
+        for i in range(count):
+            bus.publish("bench.tick", i, async_mode=True)
+        bus.event_queue.join()
+        self.results["event_bus.publish_async"] = throughput_result(count, time.perf_counter() - start, "events/s")
+        bus.stop()
+
+    def to_report(self) -> Dict[str, Any]:
+        """
+        Build the machine-readable report
+
+        Returns:
+            Report dictionary
+        """
+        return {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "platform": {
+                "python": platform.python_version(),
+                "system": platform.system(),
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+            },
+            "settings": {
+                "iterations": self.iterations,
+                "memory_sizes": self.memory_sizes,
+                "stub": self.stub_settings,
+                "real_model": self.real_model,
+            },
+            "results": self.results,
+        }
+
+
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any],
+                          threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare two reports benchmark by benchmark
+
+    Args:
+        current: Report from this run
+        baseline: Stored baseline report
+        threshold: Allowed relative slowdown (0.2 = 20%)
+
+    Returns:
+        List of comparison rows; rows with "regression": True failed
+    """
+    rows = []
+    baseline_results = baseline.get("results", {})
+    for name, result in current.get("results", {}).items():
+        base = baseline_results.get(name)
+        # Benchmarks without samples report None; they cannot be compared
+        if not base or result.get("value") is None or not base.get("value"):
+            continue
+
+        ratio = result["value"] / base["value"]
+        # Normalize so that > 1.0 always means "worse"
+        slowdown = (1.0 / ratio if ratio else float("inf")) if result.get("higher_is_better") else ratio
+        rows.append({
+            "name": name,
+            "unit": result.get("unit"),
+            "baseline": base["value"],
+            "current": result["value"],
+            "change": slowdown - 1.0,
+            "regression": slowdown > 1.0 + threshold,
+        })
+    return rows
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Print results (and baseline comparison) as a table"""
+    print(f"\n=== IrintAI Benchmarks ({report['timestamp']}) ===")
+    for name, result in report["results"].items():
+        if "error" in result:
+            print(f"{name:<28} ERROR: {result['error']}")
+            continue
+        value = result.get("value")
+        formatted = "n/a" if value is None else f"{value:.3f}"
+        print(f"{name:<28} {formatted:>12} {result['unit']}")
+
+    if comparison:
+        print("\n--- Baseline comparison (positive change = slower) ---")
+        for row in comparison:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"{row['name']:<28} {row['baseline']:>12.3f} -> {row['current']:>12.3f} "
+                  f"{row['unit']:<10} {row['change'] * 100:+7.1f}%  {flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="IrintAI Assistant Benchmark Suite")
+    parser.add_argument("--output", default="data/benchmarks/latest.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Baseline report to compare against")
+    parser.add_argument("--save-baseline", help="Also write this run as a baseline report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown before failing (default 0.2)")
+    parser.add_argument("--only", nargs="*", choices=["chat", "memory", "ingest", "quantization", "pdf", "event_bus"],
+                        help="Run only these benchmark groups")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations for latency benchmarks")
+    parser.add_argument("--memory-sizes", default="1000,10000,100000",
+                        help="Comma-separated corpus sizes for memory search")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Stub tokens per second")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub first-token latency (s)")
+    parser.add_argument("--tokens", type=int, default=64, help="Stub tokens per response")
+    parser.add_argument("--real-model", action="store_true", help="Use the real embedding model")
+    parser.add_argument("--quantization-size", type=int, default=10000,
+                        help="Corpus size for the quantization benchmark")
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite(
+        iterations=args.iterations,
+        memory_sizes=[int(s) for s in args.memory_sizes.split(",") if s.strip()],
+        token_rate=args.token_rate,
+        latency=args.latency,
+        tokens=args.tokens,
+        real_model=args.real_model,
+        quantization_size=args.quantization_size
+    )
+    suite.run_all(args.only)
+    report = suite.to_report()
+
+    comparison = None
+    if args.baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                comparison = compare_with_baseline(report, json.load(f), args.threshold)
+            report["comparison"] = comparison
+        else:
+            print(f"Baseline not found: {args.baseline}")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print_report(report, comparison)
+
+    failed = any("error" in r for r in report["results"].values())
+    regressed = bool(comparison) and any(row["regression"] for row in comparison)
+    return 1 if (failed or regressed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
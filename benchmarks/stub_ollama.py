@@ -0,0 +1,322 @@
+"""
+Stub Ollama - Local stand-in for the Ollama CLI and HTTP API
+
+Generates deterministic filler tokens at a configurable rate after a
+configurable first-token latency, so the chat and streaming paths can be
+benchmarked without a real model.
+
+CLI usage (mirrors the subset of `ollama` the assistant calls):
+    python stub_ollama.py list
+    python stub_ollama.py run <model> [prompt]
+    python stub_ollama.py serve --port 11435
+
+Settings are read from the environment when running as a CLI:
+    IRINTAI_STUB_TOKEN_RATE   tokens per second (default 200)
+    IRINTAI_STUB_LATENCY      seconds before the first token (default 0.05)
+    IRINTAI_STUB_TOKENS       tokens per response (default 64)
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Iterator
+
+STUB_MODELS = ["stub:latest", "stub-coder:latest"]
+
+_WORDS = ("the quick brown fox jumps over the lazy dog while the assistant "
+          "recalls relevant context from memory and answers").split()
+
+
+def stub_settings() -> Dict[str, float]:
+    """
+    Read stub settings from the environment
+
+    Returns:
+        Dictionary with token_rate, latency and tokens
+    """
+    return {
+        "token_rate": float(os.environ.get("IRINTAI_STUB_TOKEN_RATE", 200)),
+        "latency": float(os.environ.get("IRINTAI_STUB_LATENCY", 0.05)),
+        "tokens": int(os.environ.get("IRINTAI_STUB_TOKENS", 64)),
+    }
+
+
+def generate_tokens(prompt: str, token_rate: float = 200.0, latency: float = 0.05,
+                    tokens: int = 64) -> Iterator[str]:
+    """
+    Yield filler tokens with realistic pacing
+
+    Args:
+        prompt: Prompt text (only its length influences the output)
+        token_rate: Tokens per second after the first token
+        latency: Seconds to wait before the first token
+        tokens: Number of tokens to produce
+
+    Yields:
+        Token strings, each followed by a space
+    """
+    time.sleep(max(0.0, latency))
+    interval = 1.0 / token_rate if token_rate > 0 else 0.0
+    offset = len(prompt) % len(_WORDS)
+    next_time = time.time()
+    for i in range(tokens):
+        if interval:
+            next_time += interval
+            delay = next_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        yield _WORDS[(offset + i) % len(_WORDS)] + " "
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Handles the Ollama HTTP endpoints used by the assistant"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Keep benchmark output quiet"""
+        pass
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            self._send_json({"models": [{"name": m, "model": m, "size": 0} for m in STUB_MODELS]})
+        elif self.path.startswith("/api/version"):
+            self._send_json({"version": "0.0.0-stub"})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json({"error": "invalid JSON"}, status=400)
+            return
+
+        if not self.path.startswith("/api/generate"):
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        settings = self.server.stub_settings
+        model = request.get("model", STUB_MODELS[0])
+        prompt = request.get("prompt", "")
+        tokens = generate_tokens(prompt, settings["token_rate"], settings["latency"], settings["tokens"])
+
+        if not request.get("stream", True):
+            self._send_json({"model": model, "response": "".join(tokens).strip(), "done": True})
+            return
+
+        # Stream NDJSON with chunked transfer encoding, like the real server
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(payload: Dict[str, Any]) -> None:
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        count = 0
+        for token in tokens:
+            count += 1
+            write_chunk({"model": model, "response": token, "done": False})
+        write_chunk({"model": model, "response": "", "done": True, "eval_count": count})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class StubOllamaServer:
+    """Threaded HTTP stand-in for the Ollama server"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 token_rate: float = 200.0, latency: float = 0.05, tokens: int = 64):
+        """
+        Initialize the stub server
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            token_rate: Tokens per second
+            latency: Seconds before the first token
+            tokens: Tokens per response
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub_settings = {"token_rate": token_rate, "latency": latency, "tokens": tokens}
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubOllamaServer":
+        """Serve requests in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class StubOllamaCLI:
+    """
+    Puts a stub `ollama` executable first on PATH
+
+    Subprocess calls made by ModelManager and OllamaClient (which copy
+    os.environ) then reach the stub instead of a real installation.
+    """
+
+    def __init__(self, token_rate: float = 200.0, latency: float = 0.05, tokens: int = 64):
+        """
+        Initialize the CLI stand-in
+
+        Args:
+            token_rate: Tokens per second
+            latency: Seconds before the first token
+            tokens: Tokens per response
+        """
+        self.settings = {
+            "IRINTAI_STUB_TOKEN_RATE": str(token_rate),
+            "IRINTAI_STUB_LATENCY": str(latency),
+            "IRINTAI_STUB_TOKENS": str(tokens),
+        }
+        self.directory = None
+        self._saved_env = {}
+
+    def install(self) -> "StubOllamaCLI":
+        """Write the shims and update the environment"""
+        self.directory = tempfile.mkdtemp(prefix="irintai_stub_ollama_")
+        script = os.path.abspath(__file__)
+
+        if os.name == "nt":
+            with open(os.path.join(self.directory, "ollama.cmd"), "w", encoding="utf-8") as f:
+                f.write(f'@"{sys.executable}" "{script}" %*\n')
+        else:
+            shim = os.path.join(self.directory, "ollama")
+            with open(shim, "w", encoding="utf-8") as f:
+                f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+            os.chmod(shim, 0o755)
+
+        updates = dict(self.settings)
+        updates["PATH"] = self.directory + os.pathsep + os.environ.get("PATH", "")
+        for key, value in updates.items():
+            self._saved_env[key] = os.environ.get(key)
+            os.environ[key] = value
+        return self
+
+    def uninstall(self) -> None:
+        """Restore the environment and remove the shims"""
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._saved_env = {}
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+
+
+def _cli_run(args) -> int:
+    """Emulate `ollama run <model> [prompt]`"""
+    if not args:
+        print("Error: requires a model name", file=sys.stderr)
+        return 1
+
+    # Skip flags such as --temperature 0.7
+    positional = []
+    skip = False
+    for arg in args[1:]:
+        if skip:
+            skip = False
+            continue
+        if arg.startswith("--"):
+            skip = "=" not in arg
+            continue
+        positional.append(arg)
+
+    settings = stub_settings()
+    if positional:
+        for token in generate_tokens(positional[-1], **settings):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
+        return 0
+
+    # Interactive mode: answer each stdin line, then print the prompt marker
+    sys.stdout.write(">>> \n")
+    sys.stdout.flush()
+    for line in sys.stdin:
+        for token in generate_tokens(line, **settings):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        sys.stdout.write("\n>>> \n")
+        sys.stdout.flush()
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    """CLI entry point"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command = argv[0] if argv else ""
+
+    if command == "list":
+        print("NAME                ID              SIZE      MODIFIED")
+        for model in STUB_MODELS:
+            print(f"{model:<20}{'0' * 12:<16}{'1.0 GB':<10}just now")
+        return 0
+    if command in ("--version", "version"):
+        print("ollama version is 0.0.0-stub")
+        return 0
+    if command == "run":
+        return _cli_run(argv[1:])
+    if command == "serve":
+        port = int(argv[argv.index("--port") + 1]) if "--port" in argv else 11435
+        settings = stub_settings()
+        server = StubOllamaServer(port=port, **settings)
+        print(f"Stub Ollama listening on {server.url}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    print(f"Error: unsupported command: {command}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
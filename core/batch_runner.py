@@ -0,0 +1,326 @@
+"""
+Batch Runner - Headless driver pushing JSONL prompt files through ChatEngine
+"""
+import os
+import json
+import queue
+import threading
+import time
+from typing import Dict, List, Any, Optional, Callable, Iterator
+
+from core.generation_scheduler import PRIORITY_BACKGROUND
+
+# Sentinel telling a conversation worker that the input is exhausted
+_END_OF_INPUT = object()
+
+
+def read_prompts(input_path: str, logger: Optional[Callable] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream prompt records from a JSONL file
+
+    Each line is either a JSON object with a "prompt" field (optional "id"
+    and "conversation" fields) or a bare JSON string.
+
+    Args:
+        input_path: Path to the JSONL file
+        logger: Optional logging function
+
+    Yields:
+        Prompt record dictionaries
+    """
+    log = logger or print
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                log(f"[Batch Warning] Skipping invalid JSON on line {line_number}: {e}")
+                continue
+
+            if isinstance(record, str):
+                record = {"prompt": record}
+            if not isinstance(record, dict) or not record.get("prompt"):
+                log(f"[Batch Warning] Skipping line {line_number}: missing prompt")
+                continue
+
+            record.setdefault("id", str(line_number))
+            yield record
+
+
+class BatchRunner:
+    """
+    Runs prompts from a JSONL file through N concurrent conversations
+
+    Each conversation is a separate ChatEngine sharing one ModelManager (and
+    therefore one generation scheduler) and one MemorySystem. Records with the
+    same "conversation" value always go to the same ChatEngine in input order;
+    other records are spread round-robin.
+    """
+
+    def __init__(self,
+                 model_manager,
+                 memory_system=None,
+                 concurrency: int = 4,
+                 memory_mode: str = "auto",
+                 system_prompt: Optional[str] = None,
+                 session_dir: str = "data/batch/sessions",
+                 priority: int = PRIORITY_BACKGROUND,
+                 stream: bool = True,
+                 logger: Optional[Callable] = None):
+        """
+        Initialize the batch runner
+
+        Args:
+            model_manager: ModelManager instance with a current model set
+            memory_system: Optional MemorySystem instance
+            concurrency: Number of concurrent conversations
+            memory_mode: Memory mode for each ChatEngine (off, manual, auto)
+            system_prompt: Optional system prompt override
+            session_dir: Directory for per-conversation chat histories
+            priority: Generation priority used for batch requests
+            stream: Whether to stream responses (required for TTFT timings)
+            logger: Optional logging function
+        """
+        self.model_manager = model_manager
+        self.memory_system = memory_system
+        self.concurrency = max(1, int(concurrency))
+        self.memory_mode = memory_mode
+        self.system_prompt = system_prompt
+        self.session_dir = session_dir
+        self.priority = priority
+        self.stream = stream
+        self.log = logger or print
+
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.results_written = 0
+        self.failures = 0
+
+    def _create_chat_engine(self, index: int):
+        """
+        Create the ChatEngine backing one conversation worker
+
+        Args:
+            index: Worker index
+
+        Returns:
+            ChatEngine instance with an empty history
+        """
+        from core.chat_engine import ChatEngine
+
+        session_file = os.path.join(self.session_dir, f"conversation_{index}.json")
+        if os.path.exists(session_file):
+            os.remove(session_file)
+
+        engine = ChatEngine(
+            model_manager=self.model_manager,
+            memory_system=self.memory_system,
+            session_file=session_file,
+            logger=self.log
+        )
+        engine.memory_mode = self.memory_mode
+        if self.system_prompt:
+            engine.system_prompt = self.system_prompt
+        return engine
+
+    def run(self, input_path: str, output_path: str) -> Dict[str, Any]:
+        """
+        Run every prompt in the input file and write results as JSONL
+
+        Args:
+            input_path: JSONL file of prompts
+            output_path: JSONL file receiving responses and timings
+
+        Returns:
+            Summary dictionary with counts, throughput and latency percentiles
+        """
+        os.makedirs(self.session_dir, exist_ok=True)
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Bounded per-worker queues keep memory flat for arbitrarily large inputs
+        worker_queues = [queue.Queue(maxsize=4) for _ in range(self.concurrency)]
+        latencies: List[Dict[str, Any]] = []
+        start_time = time.time()
+
+        # Each conversation has at most one request in the generation queue;
+        # make room for all of them on top of the interactive capacity
+        scheduler = getattr(self.model_manager, "scheduler", None)
+        if scheduler is not None:
+            scheduler.max_queue_size += self.concurrency
+
+        try:
+            with open(output_path, "w", encoding="utf-8") as output_file:
+                workers = []
+                for index in range(self.concurrency):
+                    worker = threading.Thread(
+                        target=self._conversation_worker,
+                        args=(index, worker_queues[index], output_file, latencies),
+                        name=f"BatchConversation-{index}",
+                        daemon=True
+                    )
+                    workers.append(worker)
+                    worker.start()
+
+                submitted = 0
+                conversations: Dict[str, int] = {}
+                for record in read_prompts(input_path, self.log):
+                    conversation = record.get("conversation")
+                    if conversation is not None:
+                        key = str(conversation)
+                        if key not in conversations:
+                            conversations[key] = len(conversations) % self.concurrency
+                        target = conversations[key]
+                    else:
+                        target = submitted % self.concurrency
+                    worker_queues[target].put(record)
+                    submitted += 1
+
+                for worker_queue in worker_queues:
+                    worker_queue.put(_END_OF_INPUT)
+                for worker in workers:
+                    worker.join()
+        finally:
+            if scheduler is not None:
+                scheduler.max_queue_size -= self.concurrency
+
+        elapsed = time.time() - start_time
+        summary = {
+            "prompts": submitted,
+            "completed": self.results_written - self.failures,
+            "failed": self.failures,
+            "concurrency": self.concurrency,
+            "elapsed": elapsed,
+            "throughput": (submitted / elapsed) if elapsed > 0 else 0.0,
+        }
+        for stage in ("queue_wait", "retrieval", "ttft", "total"):
+            values = sorted(t[stage] for t in latencies if t.get(stage) is not None)
+            if values:
+                summary[f"{stage}_p50"] = values[len(values) // 2]
+                summary[f"{stage}_p95"] = values[min(len(values) - 1, int(len(values) * 0.95))]
+
+        self.log(f"[Batch] {submitted} prompts in {elapsed:.2f}s "
+                 f"({summary['throughput']:.2f} prompts/s, {self.failures} failed)")
+        return summary
+
+    def _conversation_worker(self, index: int, worker_queue: queue.Queue,
+                             output_file, latencies: List[Dict[str, Any]]) -> None:
+        """
+        Serve the prompts routed to one conversation
+
+        Args:
+            index: Worker index
+            worker_queue: Queue of prompt records for this worker
+            output_file: Open JSONL output file
+            latencies: Shared list collecting timings for the summary
+        """
+        engine = self._create_chat_engine(index)
+        owner = f"batch-{index}"
+
+        while True:
+            record = worker_queue.get()
+            if record is _END_OF_INPUT:
+                break
+
+            timings: Dict[str, Any] = {}
+            error = None
+            try:
+                response = engine.send_message(
+                    record["prompt"],
+                    on_chunk=(lambda text: None) if self.stream else None,
+                    timings=timings,
+                    priority=self.priority,
+                    owner=owner
+                )
+                if not engine.last_success:
+                    error = response
+            except Exception as e:
+                response = None
+                error = str(e)
+                self.log(f"[Batch Error] Prompt {record.get('id')} failed: {e}")
+
+            result = {
+                "id": record.get("id"),
+                "conversation": record.get("conversation", index),
+                "prompt": record["prompt"],
+                "response": None if error else response,
+                "error": error,
+                "timings": timings,
+            }
+
+            with self._write_lock:
+                output_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output_file.flush()
+            with self._stats_lock:
+                self.results_written += 1
+                if error:
+                    self.failures += 1
+                latencies.append(timings)
+
+
+def build_headless_core(config_path: str = "data/config.json",
+                        model_name: Optional[str] = None,
+                        use_memory: bool = True,
+                        index_path: str = "data/vector_store/vector_store.json",
+                        logger: Optional[Callable] = None) -> Dict[str, Any]:
+    """
+    Build the core components without any UI
+
+    Args:
+        config_path: Path to the configuration file
+        model_name: Model to run the prompts against
+        use_memory: Whether to load the MemorySystem
+        index_path: Path to the vector store
+        logger: Logging function
+
+    Returns:
+        Dictionary of core components (config_manager, model_manager,
+        memory_system, event_bus)
+    """
+    from core.config_manager import ConfigManager
+    from core.model_manager import ModelManager
+    from plugins.plugin_event_bus import EventBus
+
+    log = logger or print
+
+    config_manager = ConfigManager(path=config_path)
+
+    event_bus = EventBus(logger=None)
+    event_bus.start()
+
+    model_manager = ModelManager(
+        model_path=config_manager.get("model_path", "data/models"),
+        logger=log,
+        config=config_manager,
+        use_8bit=config_manager.get("model.use_8bit", False),
+        event_bus=event_bus
+    )
+    model_manager.current_model = model_name
+
+    memory_system = None
+    if use_memory:
+        from core.memory_system import MemorySystem
+        memory_system = MemorySystem(
+            index_path=index_path,
+            logger=log,
+            search_mode=config_manager.get("memory.search_mode", "vector"),
+            quantization=config_manager.get("memory.quantization", "none"),
+            rerank=config_manager.get("memory.rerank", False),
+            cache_size=config_manager.get("memory.query_cache_size", 256),
+            recency_weight=config_manager.get("memory.recency_weight", 0.1),
+            importance_weight=config_manager.get("memory.importance_weight", 0.1),
+            recency_half_life=config_manager.get("memory.recency_half_life_days", 30.0),
+            mmr_lambda=config_manager.get("memory.mmr_lambda", 0.7),
+            deduplicate=config_manager.get("memory.deduplicate", True)
+        )
+
+    return {
+        "config_manager": config_manager,
+        "model_manager": model_manager,
+        "memory_system": memory_system,
+        "event_bus": event_bus,
+    }
@@ -5,6 +5,9 @@ import time
 import json
 import os
 from typing import List, Dict, Any, Optional, Callable
+from core.generation_scheduler import PRIORITY_INTERACTIVE, REQUEST_STATUS
+from core.memory_prefetcher import MemoryPrefetcher
+from core.reflection_store import ReflectionStore, ReflectionEmbedder
 
 class ChatEngine:
     """Manages chat history, prompt formatting, and conversation context"""
@@ -32,6 +35,15 @@ class ChatEngine:
         self.system_prompt = "You are Irintai, a helpful and knowledgeable assistant."
         self.memory_mode = "Off"  # Off, Manual, Auto, Background
         
+        # Background retrieval on draft prompts so send-time search is a cache hit
+        self.memory_prefetcher = MemoryPrefetcher(memory_system, logger=self.log) if memory_system else None
+        self.last_retrieval_time = 0.0
+        self.last_success = False  # Whether the last send_message got a response from the model
+        
+        # Append-only reflection logs (one per path) and optional memory embedding
+        self.reflection_stores = {}
+        self.reflection_embedder = None
+        
         # Create directory for session file if it doesn't exist
         os.makedirs(os.path.dirname(session_file), exist_ok=True)
         
@@ -68,6 +80,52 @@ class ChatEngine:
             
         self.log(f"[Memory Mode] Set to: {self.memory_mode.capitalize()}")
         
+    def _memory_context_enabled(self) -> bool:
+        """
+        Check whether prompts are automatically enriched with memory context
+        
+        Returns:
+            True in Auto or Background memory mode with a memory system attached
+        """
+        return bool(self.memory_system) and str(self.memory_mode).lower() in ("auto", "background")
+        
+    def prefetch_memory(self, draft: str) -> bool:
+        """
+        Start a speculative memory search for a prompt that is still being typed
+        
+        Args:
+            draft: Current text of the chat input
+            
+        Returns:
+            True if a background search was scheduled, False otherwise
+        """
+        if not self.memory_prefetcher or not self._memory_context_enabled():
+            return False
+        return self.memory_prefetcher.prefetch(draft)
+        
+    def _search_memory(self, prompt: str) -> List[Dict[str, Any]]:
+        """
+        Search memory for a prompt, reusing prefetched results when available
+        
+        Args:
+            prompt: User prompt
+            
+        Returns:
+            List of matching document metadata dictionaries
+        """
+        search_start = time.time()
+        if not self.memory_prefetcher:
+            matches = self.memory_system.search(prompt)
+        else:
+            matches = self.memory_prefetcher.get(prompt)
+            if matches is None:
+                matches = self.memory_system.search(prompt)
+                self.memory_prefetcher.store(prompt, matches)
+            else:
+                self.log("[Memory] Using prefetched context")
+        self.last_retrieval_time = time.time() - search_start
+        return matches
+        
     def format_prompt(self, prompt: str, model_name: str) -> str:
         """
         Format a prompt for the given model
@@ -91,8 +149,8 @@ class ChatEngine:
         
         # Check memory mode and add relevant context if enabled
         context = ""
-        if self.memory_mode in ["Auto", "Background"] and self.memory_system:
-            matches = self.memory_system.search(prompt)
+        if self._memory_context_enabled():
+            matches = self._search_memory(prompt)
             if matches:
                 context = "\n\nRelevant context from documents:\n"
                 for m in matches:
@@ -192,24 +250,41 @@ class ChatEngine:
         }
         self.chat_history.append(message)
     
-    def send_message(self, content: str, on_response: Optional[Callable] = None) -> str:
+    def send_message(self, content: str, on_response: Optional[Callable] = None,
+                     on_chunk: Optional[Callable[[str], None]] = None,
+                     timings: Optional[Dict[str, Any]] = None,
+                     priority: int = PRIORITY_INTERACTIVE,
+                     owner: str = "chat") -> str:
         """
         Send a message and get a response
         
         Args:
             content: Message content
             on_response: Optional callback for when response is ready
+            on_chunk: Optional callback receiving response text as it streams in
+            timings: Optional dictionary filled with per-stage timings in seconds
+                (retrieval, queue_wait, ttft, generation, total)
+            priority: Generation priority (see core.generation_scheduler)
+            owner: Identifier used for fair scheduling between conversations
             
         Returns:
             Response text
         """
+        started = time.time()
+        if timings is None:
+            timings = {}
+        timings.update({"retrieval": 0.0, "queue_wait": None, "ttft": None,
+                        "generation": None, "total": None})
+        
         # Add user message to history
         self.add_user_message(content)
+        self.last_success = False
         
         # Check if model is running
         if not self.model_manager.current_model:
             error_msg = "Model is not running. Please start a model first."
             self.log(f"[Error] {error_msg}")
+            timings["total"] = time.time() - started
             return error_msg
         
         try:
@@ -221,7 +296,9 @@ class ChatEngine:
             
             # Format the prompt
             model_name = self.model_manager.current_model
+            self.last_retrieval_time = 0.0
             formatted_prompt = self.format_prompt(content, model_name)
+            timings["retrieval"] = self.last_retrieval_time
             
             # Get model parameters if available
             params = getattr(self.model_manager, 'current_parameters', {})
@@ -229,14 +306,50 @@ class ChatEngine:
             # Log that we're sending the prompt
             self.log(f"[Prompt] Sending to model: {content[:100]}...")
             
-            # Send to model using direct Ollama API
-            success, response = ollama.generate(model_name, formatted_prompt, params)
+            def generate(request=None):
+                generation_start = time.time()
+                
+                def chunk_received(text):
+                    if timings["ttft"] is None:
+                        timings["ttft"] = time.time() - started
+                    if on_chunk:
+                        on_chunk(text)
+                
+                if on_chunk:
+                    result = ollama.generate_stream(
+                        model_name, formatted_prompt, params,
+                        on_chunk=chunk_received,
+                        should_stop=(lambda: request.cancelled) if request is not None else None
+                    )
+                else:
+                    result = ollama.generate(model_name, formatted_prompt, params)
+                timings["generation"] = time.time() - generation_start
+                return result
+            
+            # Send to model using direct Ollama API, queued behind any other
+            # request that currently holds the model
+            if hasattr(self.model_manager, 'submit_generation'):
+                request = self.model_manager.submit_generation(generate, priority=priority, owner=owner)
+                request.wait()
+                timings["queue_wait"] = request.get_timings()["queue_wait"]
+                if request.status == REQUEST_STATUS["DONE"]:
+                    success, response = request.result
+                else:
+                    success, response = False, request.error or f"Request {request.status}"
+            else:
+                success, response = generate()
         except Exception as e:
             success = False
             response = f"Error occurred: {str(e)}"
             self.log(f"[Error] Exception while generating response: {e}")
         
+        timings["total"] = time.time() - started
+        if timings["ttft"] is None and success:
+            timings["ttft"] = timings["total"]
+        
         if success and response:
+            self.last_success = True
+            
             # Add assistant message to history
             self.add_assistant_message(response, model_name)
             
@@ -316,12 +429,51 @@ class ChatEngine:
                 
         return None
         
-    def generate_reflection(self, reflection_path: str = "data/reflections/session_reflections.json") -> Dict[str, Any]:
+    def enable_reflection_embedding(self, batch_size: int = 8, flush_interval: float = 2.0) -> bool:
+        """
+        Embed generated reflections into the memory system in the background
+        
+        Args:
+            batch_size: Maximum reflections per embedding call
+            flush_interval: Seconds to wait for a batch to fill
+            
+        Returns:
+            True if enabled, False if there is no memory system
+        """
+        if not self.memory_system:
+            self.log("[Reflection Warning] Cannot embed reflections without a memory system")
+            return False
+            
+        if not self.reflection_embedder:
+            self.reflection_embedder = ReflectionEmbedder(
+                self.memory_system,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                logger=self.log
+            )
+            self.reflection_embedder.start()
+        return True
+        
+    def get_reflection_store(self, reflection_path: str = "data/reflections/session_reflections.jsonl") -> ReflectionStore:
+        """
+        Get the reflection log for a path, opening it on first use
+        
+        Args:
+            reflection_path: Path to the JSONL reflection log
+            
+        Returns:
+            ReflectionStore instance
+        """
+        if reflection_path not in self.reflection_stores:
+            self.reflection_stores[reflection_path] = ReflectionStore(reflection_path, logger=self.log)
+        return self.reflection_stores[reflection_path]
+        
+    def generate_reflection(self, reflection_path: str = "data/reflections/session_reflections.jsonl") -> Dict[str, Any]:
         """
         Generate a reflection on the current chat session
         
         Args:
-            reflection_path: Path to save the reflection
+            reflection_path: Path of the JSONL log to append the reflection to
             
         Returns:
             Reflection data dictionary
@@ -343,35 +495,14 @@ class ChatEngine:
                 reflection["summary"].append(f"Assistant responded: {content_preview}")
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(reflection_path), exist_ok=True)
+            # Append a single line; earlier reflections are never re-read or rewritten
+            self.get_reflection_store(reflection_path).append(reflection)
             
-            # Load existing reflections if any
-            existing_reflections = []
-            if os.path.exists(reflection_path):
-                try:
-                    with open(reflection_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if content.strip():
-                            # Handle trailing comma if present
-                            if content.strip().endswith(','):
-                                content = f"[{content.strip()[:-1]}]"
-                            else:
-                                content = f"[{content}]"
-                            existing_reflections = json.loads(content)
-                except:
-                    # If there's an issue with the file format, start fresh
-                    existing_reflections = []
-            
-            # Append new reflection
-            existing_reflections.append(reflection)
-            
-            # Save reflections
-            with open(reflection_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_reflections, f, indent=2)
+            if self.reflection_embedder and reflection["summary"]:
+                self.reflection_embedder.submit("conversation", "\n".join(reflection["summary"]))
                 
             self.log(f"[Reflection] Saved to {reflection_path}")
             return reflection
         except Exception as e:
             self.log(f"[Reflection Error] Failed to save reflection: {e}")
-            return reflection
\ No newline at end of file
+            return reflection
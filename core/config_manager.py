@@ -4,23 +4,45 @@ Configuration management for the Irintai Assistant
 import os
 import json
 import threading
-from typing import Any, Dict, Optional, List, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, List, Tuple, Callable, Iterator
+
+from file_operations.json_store import get_json_store, write_json_atomic
+
+# Seconds an automatic save waits for further changes before writing
+DEFAULT_SAVE_DELAY = 0.5
 
 class ConfigManager:
-    """Manages application configuration and settings"""
+    """
+    Manages application configuration and settings
+    
+    The configuration is published as a snapshot dictionary that is never
+    modified once published; every change builds a new one. Reads therefore
+    need no lock, and a reader always sees a consistent configuration.
+    Automatic saves are debounced and written atomically in the background,
+    so a burst of changes costs one write.
+    """
     
-    def __init__(self, path: str = "data/config.json", auto_save: bool = True):
+    def __init__(self, path: str = "data/config.json", auto_save: bool = True,
+                 save_delay: float = DEFAULT_SAVE_DELAY):
         """
         Initialize the configuration manager
         
         Args:
             path: Path to the configuration file
             auto_save: Whether to automatically save changes
+            save_delay: Seconds an automatic save waits for further changes
         """
         self.config_path = path
         self.auto_save = auto_save
-        self.config = {}
-        self.lock = threading.RLock()  # Reentrant lock for thread safety
+        self.save_delay = save_delay
+        self._config: Dict[str, Any] = {}
+        self.lock = threading.RLock()  # Serializes writers; readers use the snapshot
+        
+        # Working copy of an open transaction, and the thread that owns it
+        self._transaction: Optional[Dict[str, Any]] = None
+        self._transaction_owner: Optional[int] = None
+        self._transaction_save = False
         
         # Create parent directory if it doesn't exist
         os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -28,6 +50,76 @@ class ConfigManager:
         # Load configuration
         self.load_config()
         
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        Current configuration snapshot
+        
+        The dictionary must not be modified; use set(), update() or
+        transaction() to change the configuration.
+        """
+        if self._transaction is not None and self._transaction_owner == threading.get_ident():
+            return self._transaction
+        return self._config
+        
+    @config.setter
+    def config(self, new_config: Dict[str, Any]) -> None:
+        """Replace the whole configuration (without saving it)"""
+        self._apply(lambda config: (config.clear(), config.update(new_config)), save=False)
+        
+    def _apply(self, change: Callable[[Dict[str, Any]], Any], save: bool = True) -> None:
+        """
+        Apply a change to a copy of the configuration and publish it
+        
+        Args:
+            change: Function modifying the configuration dictionary in place
+            save: Whether the change should be auto-saved
+        """
+        with self.lock:
+            if self._transaction is not None:
+                # The lock is held by the transaction's owner, so this is its thread
+                change(self._transaction)
+                self._transaction_save = self._transaction_save or save
+                return
+            config = dict(self._config)
+            change(config)
+            self._publish(config, save)
+            
+    def _publish(self, config: Dict[str, Any], save: bool) -> None:
+        """Make a new snapshot current and schedule an automatic save (lock held)"""
+        self._config = config
+        if save and self.auto_save:
+            # Serialized at write time, so only the latest snapshot is written
+            get_json_store().save(self.config_path, lambda: self._config, indent=2, delay=self.save_delay)
+            
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        """
+        Group changes into one snapshot and one save
+        
+        Changes made inside the block are visible to the calling thread only,
+        and published together when it ends; other threads keep seeing the
+        previous snapshot. If the block raises, the changes are discarded.
+        Nested transactions join the outer one.
+        
+        Yields:
+            The working configuration of the transaction
+        """
+        with self.lock:
+            if self._transaction is not None:
+                yield self._transaction
+                return
+            self._transaction = dict(self._config)
+            self._transaction_owner = threading.get_ident()
+            self._transaction_save = False
+            try:
+                yield self._transaction
+                config, save = self._transaction, self._transaction_save
+            finally:
+                self._transaction = None
+                self._transaction_owner = None
+            self._publish(config, save)
+        
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get a configuration value
@@ -39,8 +131,7 @@ class ConfigManager:
         Returns:
             Configuration value
         """
-        with self.lock:
-            return self.config.get(key, default)
+        return self.config.get(key, default)
         
     def set(self, key: str, value: Any) -> None:
         """
@@ -50,12 +141,7 @@ class ConfigManager:
             key: Configuration key
             value: Configuration value
         """
-        with self.lock:
-            self.config[key] = value
-            
-            # Auto-save if enabled
-            if self.auto_save:
-                self.save_config()
+        self._apply(lambda config: config.__setitem__(key, value))
         
     def load_config(self) -> bool:
         """
@@ -65,34 +151,42 @@ class ConfigManager:
             True if configuration loaded successfully, False otherwise
         """
         with self.lock:
+            # Let a pending save land first so the file is current
+            self.flush()
             if not os.path.exists(self.config_path):
                 return False
             
             try:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
-                    self.config = json.load(f)
+                    config = json.load(f)
+                self._publish(config, save=False)
                 return True
             except Exception:
                 return False
             
     def save_config(self) -> bool:
         """
-        Save configuration to file
+        Save configuration to file now
         
         Returns:
             True if configuration saved successfully, False otherwise
         """
         with self.lock:
-            try:
-                with open(self.config_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.config, f, indent=2)
-                return True
-            except Exception:
-                return False
+            # Replaced atomically, so a crash mid-save cannot truncate the config
+            return get_json_store().save(self.config_path, self._config, indent=2, wait=True)
+            
+    def flush(self) -> bool:
+        """
+        Write a pending automatic save now
+        
+        Returns:
+            True if nothing is left to write
+        """
+        return get_json_store().flush(self.config_path)
             
     def reset_to_defaults(self) -> None:
         """Reset configuration to default values"""
-        self.config = {}
+        self._apply(dict.clear, save=False)
         
     def get_all(self) -> Dict[str, Any]:
         """
@@ -101,8 +195,7 @@ class ConfigManager:
         Returns:
             Dictionary of all configuration values
         """
-        with self.lock:
-            return self.config.copy()
+        return self.config.copy()
         
     def update(self, new_config: Dict[str, Any]) -> None:
         """
@@ -111,12 +204,7 @@ class ConfigManager:
         Args:
             new_config: Dictionary of configuration values to update
         """
-        with self.lock:
-            self.config.update(new_config)
-            
-            # Auto-save if enabled
-            if self.auto_save:
-                self.save_config()
+        self._apply(lambda config: config.update(new_config))
         
     def set_system_environment(self, model_path: Optional[str] = None) -> bool:
         """
@@ -197,9 +285,7 @@ class ConfigManager:
             os.makedirs(os.path.dirname(export_path), exist_ok=True)
             
             # Export configuration
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2)
-                
+            write_json_atomic(export_path, self.config, indent=2)
             return True
         except Exception:
             return False
@@ -228,10 +314,10 @@ class ConfigManager:
                 return False
                 
             # Replace or merge configuration
-            if merge:
-                self.config.update(import_config)
-            else:
-                self.config = import_config
+            with self.transaction() as config:
+                if not merge:
+                    config.clear()
+                config.update(import_config)
                 
             self.save_config()  # Save the imported configuration
             return True
@@ -271,17 +357,18 @@ class ConfigManager:
             True if value was set successfully, False otherwise
         """
         parts = path.split('.')
-        current = self.config
         
-        try:
-            # Navigate to the parent of the target key
+        def change(config: Dict[str, Any]) -> None:
+            # Copy the dictionaries along the path; published ones are never modified
+            current = config
             for part in parts[:-1]:
-                if part not in current or not isinstance(current[part], dict):
-                    current[part] = {}
+                child = current.get(part)
+                current[part] = dict(child) if isinstance(child, dict) else {}
                 current = current[part]
-                
-            # Set the value
             current[parts[-1]] = value
+            
+        try:
+            self._apply(change, save=False)
             return True
         except Exception:
             return False
@@ -342,7 +429,7 @@ class ConfigManager:
             key: Configuration key
             value: Configuration value
         """
-        self.config[key] = value
+        self._apply(lambda config: config.__setitem__(key, value), save=False)
         
         # Add to secure keys set if not already
         if not hasattr(self, '_secure_keys'):
@@ -415,7 +502,6 @@ class ConfigManager:
         """
         prefix = category + "."
         
-        for key, value in values.items():
-            # Combine category prefix with key
-            full_key = prefix + key
-            self.config[full_key] = value
\ No newline at end of file
+        # Combine category prefix with each key
+        self._apply(lambda config: config.update((prefix + key, value) for key, value in values.items()),
+                    save=False)
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+Duplicate Index - Exact and near-duplicate detection for memory documents
+"""
+import re
+import zlib
+import hashlib
+from array import array
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# MinHash permutations are (a * x + b) mod a Mersenne prime, with fixed
+# coefficients so signatures stay comparable across runs and when persisted
+_PRIME = np.uint64((1 << 31) - 1)
+_SEED = 0x5EED
+
+
+class DuplicateIndex:
+    """
+    Finds documents whose text already exists in the store
+
+    Exact duplicates are found by a digest of the normalized text. Near
+    duplicates are found with MinHash signatures over word shingles and an
+    LSH table that splits each signature into bands; documents sharing any
+    band are candidates, and a candidate matches when the estimated Jaccard
+    similarity of the two shingle sets reaches the threshold.
+
+    Signatures are kept in a flat array aligned with MemorySystem row ids
+    so they can be persisted and reloaded without re-hashing every document;
+    the digest and band tables are rebuilt from them.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64,
+                 bands: int = 8, shingle_size: int = 3):
+        """
+        Initialize the duplicate index
+
+        Args:
+            threshold: Estimated Jaccard similarity at which texts are near-duplicates
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (num_perm must be divisible by it)
+            shingle_size: Words per shingle
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.band_width = num_perm // bands
+        self.shingle_size = shingle_size
+
+        generator = np.random.RandomState(_SEED)
+        self._a = generator.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = generator.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+        self.signatures = array("I")
+        self.clear()
+
+    def clear(self, keep_signatures: bool = False) -> None:
+        """
+        Empty the lookup tables
+
+        Args:
+            keep_signatures: Keep the stored signatures so re-adding the same
+                rows does not hash their text again
+        """
+        self.digests: Dict[bytes, int] = {}
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        if not keep_signatures:
+            self.signatures = array("I")
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """
+        Digest of text with case and whitespace normalized
+
+        Args:
+            text: Document text
+
+        Returns:
+            16-byte digest
+        """
+        normalized = " ".join((text or "").lower().split())
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text
+
+        Args:
+            text: Document text
+
+        Returns:
+            uint32 array of length num_perm, or None for text without words
+        """
+        words = _WORD_PATTERN.findall((text or "").lower())
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _stored_signature(self, row: int) -> Optional[np.ndarray]:
+        """Get a row's stored signature (None when the row has no words)"""
+        start = row * self.num_perm
+        if start + self.num_perm > len(self.signatures):
+            return None
+        signature = np.frombuffer(self.signatures, dtype=np.uint32)[start:start + self.num_perm]
+        return signature if signature.any() else None
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """Split a signature into its LSH bucket keys"""
+        width = self.band_width
+        return [(band, signature[band * width:(band + 1) * width].tobytes()) for band in range(self.bands)]
+
+    def add(self, row: int, text: str, signature: Optional[np.ndarray] = None) -> None:
+        """
+        Index one document
+
+        Args:
+            row: Row id (rows must be added in increasing order)
+            text: Document text
+            signature: Precomputed signature of text, if available
+        """
+        stored = len(self.signatures) // self.num_perm
+        if row >= stored:
+            # Rows without words keep an all-zero placeholder
+            if row > stored:
+                self.signatures.extend([0] * ((row - stored) * self.num_perm))
+            if signature is None:
+                signature = self.signature(text)
+            self.signatures.extend(signature.tolist() if signature is not None else [0] * self.num_perm)
+        signature = self._stored_signature(row)
+
+        self.digests.setdefault(self.digest(text), row)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                self.buckets.setdefault(key, []).append(row)
+
+    def remove(self, row: int, text: str) -> None:
+        """
+        Stop matching against a document
+
+        Args:
+            row: Row id
+            text: Document text
+        """
+        key = self.digest(text)
+        if self.digests.get(key) == row:
+            del self.digests[key]
+        signature = self._stored_signature(row)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            rows = self.buckets.get(key)
+            if rows is not None and row in rows:
+                rows.remove(row)
+                if not rows:
+                    del self.buckets[key]
+
+    def take(self, rows: List[int]) -> None:
+        """
+        Keep only the signatures of the given rows, renumbered in order
+
+        Args:
+            rows: Row ids to keep
+        """
+        matrix = np.frombuffer(self.signatures, dtype=np.uint32).reshape(-1, self.num_perm)
+        rows = [row for row in rows if row < len(matrix)]
+        self.signatures = array("I", matrix[rows].tobytes()) if rows else array("I")
+        self.clear(keep_signatures=True)
+
+    def find_exact(self, text: str) -> Optional[int]:
+        """
+        Find an indexed document with the same normalized text
+
+        Args:
+            text: Text to look up
+
+        Returns:
+            Row id or None
+        """
+        return self.digests.get(self.digest(text))
+
+    def find_similar(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Tuple[int, float]]:
+        """
+        Find the indexed document most similar to a text
+
+        Args:
+            text: Text to look up
+            signature: Precomputed signature of text, if available
+
+        Returns:
+            (row, estimated Jaccard similarity) of the best match at or above
+            the threshold, or None
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return None
+
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+
+        best = None
+        for candidate in candidates:
+            similarity = float(np.mean(self._stored_signature(candidate) == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def save(self, path: str) -> None:
+        """
+        Write the signatures to a file
+
+        Args:
+            path: Output path
+        """
+        with open(path, "wb") as f:
+            self.signatures.tofile(f)
+
+    def load(self, path: str, rows: int) -> bool:
+        """
+        Read signatures written by save
+
+        Args:
+            path: Input path
+            rows: Number of rows the signatures must cover
+
+        Returns:
+            True if signatures for exactly that many rows were loaded
+        """
+        signatures = array("I")
+        try:
+            with open(path, "rb") as f:
+                signatures.frombytes(f.read())
+        except OSError:
+            return False
+        if len(signatures) != rows * self.num_perm:
+            return False
+        self.signatures = signatures
+        return True
@@ -0,0 +1,610 @@
+"""
+Generation Scheduler - Serializes and prioritizes requests to the running model
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Callable
+
+# Request priorities (lower value is served first)
+PRIORITY_INTERACTIVE = 0   # Chat messages typed by the user
+PRIORITY_NORMAL = 1        # Plugin requests made on behalf of the user
+PRIORITY_BACKGROUND = 2    # Reflections, background memory jobs, batch runs
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Request status constants
+REQUEST_STATUS = {
+    "QUEUED": "queued",
+    "RUNNING": "running",
+    "DONE": "done",
+    "FAILED": "failed",
+    "CANCELLED": "cancelled",
+    "EXPIRED": "expired"
+}
+
+
+class GenerationQueueFull(Exception):
+    """Raised when the scheduler queue has reached its capacity"""
+    pass
+
+
+class GenerationRequest:
+    """A unit of work waiting for (or holding) the model"""
+
+    def __init__(self,
+                 func: Callable,
+                 priority: int = PRIORITY_NORMAL,
+                 owner: str = "default",
+                 deadline: Optional[float] = None):
+        """
+        Initialize a generation request
+
+        Args:
+            func: Callable invoked with this request once it is scheduled
+            priority: Request priority (PRIORITY_* constant)
+            owner: Identifier used for fair scheduling (conversation, plugin ID...)
+            deadline: Optional absolute time (time.time()) after which the
+                request must not be started
+        """
+        self.request_id = str(uuid.uuid4())
+        self.func = func
+        self.priority = priority
+        self.owner = owner or "default"
+        self.deadline = deadline
+
+        self.status = REQUEST_STATUS["QUEUED"]
+        self.result = None
+        self.error = None
+
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+
+        # Whether the request still waits in the scheduler queue; cancelled
+        # and expired requests are dropped from the count right away and
+        # skipped when a worker reaches them
+        self._queued = False
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested"""
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self) -> bool:
+        """Whether the request reached a final state"""
+        return self._done_event.is_set()
+
+    def cancel(self) -> bool:
+        """
+        Request cancellation
+
+        Queued requests are dropped before they reach the model. Running
+        requests are expected to poll `cancelled` and stop early.
+
+        Returns:
+            True if the request had not finished yet, False otherwise
+        """
+        if self.done:
+            return False
+        self._cancel_event.set()
+        return True
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        """
+        Check whether the deadline has passed
+
+        Args:
+            now: Optional current time
+
+        Returns:
+            True if the request has a deadline that already passed
+        """
+        if self.deadline is None:
+            return False
+        return (now or time.time()) >= self.deadline
+
+    def time_remaining(self) -> Optional[float]:
+        """
+        Get the number of seconds left before the deadline
+
+        Returns:
+            Seconds remaining, or None if the request has no deadline
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the request to finish
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the request finished, False on timeout
+        """
+        return self._done_event.wait(timeout)
+
+    def get_timings(self) -> Dict[str, Optional[float]]:
+        """
+        Get queue-wait and service-time measurements
+
+        Returns:
+            Dictionary with queue_wait and service_time in seconds
+        """
+        queue_wait = None
+        service_time = None
+        if self.started_at is not None:
+            queue_wait = self.started_at - self.submitted_at
+            if self.finished_at is not None:
+                service_time = self.finished_at - self.started_at
+        elif self.finished_at is not None:
+            queue_wait = self.finished_at - self.submitted_at
+        return {"queue_wait": queue_wait, "service_time": service_time}
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        """Move the request to a final state and wake up waiters"""
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self._done_event.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe the request without its callable
+
+        Returns:
+            Dictionary of request information
+        """
+        info = {
+            "request_id": self.request_id,
+            "priority": PRIORITY_NAMES.get(self.priority, str(self.priority)),
+            "owner": self.owner,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "deadline": self.deadline,
+        }
+        info.update(self.get_timings())
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class GenerationScheduler:
+    """
+    Bounded, priority-ordered request queue in front of the model
+
+    Requests are served strictly by priority. Within a priority level,
+    owners are served round-robin so one busy conversation or plugin cannot
+    starve the others. Requests waiting longer than `starvation_timeout` are
+    served ahead of higher priorities so background work still progresses.
+    """
+
+    def __init__(self,
+                 max_queue_size: int = 32,
+                 max_concurrent: int = 1,
+                 starvation_timeout: float = 30.0,
+                 logger: Optional[Callable] = None,
+                 event_bus=None):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_queue_size: Maximum number of queued (not running) requests
+            max_concurrent: Number of requests allowed to hold the model at once
+            starvation_timeout: Seconds after which a waiting request is
+                promoted regardless of its priority
+            logger: Optional logging function
+            event_bus: Optional event bus for queue metrics
+        """
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.starvation_timeout = starvation_timeout
+        self.log = logger or print
+        self.event_bus = event_bus
+
+        # priority -> OrderedDict(owner -> deque of requests)
+        self._queues: Dict[int, "OrderedDict[str, deque]"] = {}
+        self._requests: Dict[str, GenerationRequest] = {}
+        self._pending = 0
+        self._running = 0
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._reaper: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "expired": 0,
+            "rejected": 0,
+            "total_queue_wait": 0.0,
+            "total_service_time": 0.0,
+        }
+
+    def set_event_bus(self, event_bus) -> None:
+        """
+        Set the event bus used to publish queue metrics
+
+        Args:
+            event_bus: EventBus instance
+        """
+        self.event_bus = event_bus
+
+    def start(self) -> None:
+        """Start the worker threads if they are not running yet"""
+        with self._condition:
+            self._stopping = False
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.max_concurrent:
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"GenerationScheduler-{len(self._workers)}",
+                    daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+            if self._reaper is None or not self._reaper.is_alive():
+                self._reaper = threading.Thread(target=self._reaper_loop, name="GenerationScheduler-reaper",
+                                                daemon=True)
+                self._reaper.start()
+
+    def stop(self, cancel_pending: bool = True, timeout: float = 2.0) -> None:
+        """
+        Stop the worker threads
+
+        Args:
+            cancel_pending: Whether to cancel requests still in the queue
+            timeout: Time to wait for each worker to exit
+        """
+        with self._condition:
+            self._stopping = True
+            if cancel_pending:
+                for owners in self._queues.values():
+                    for requests in owners.values():
+                        for request in requests:
+                            if request._queued:
+                                request.cancel()
+                                self._drop(request, "cancelled")
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers = []
+        if self._reaper is not None:
+            self._reaper.join(timeout=timeout)
+            self._reaper = None
+
+    def submit(self,
+               func: Callable,
+               priority: int = PRIORITY_NORMAL,
+               owner: str = "default",
+               deadline: Optional[float] = None,
+               timeout: Optional[float] = None) -> GenerationRequest:
+        """
+        Queue a request for the model
+
+        Args:
+            func: Callable invoked with the GenerationRequest once scheduled;
+                its return value becomes the request result
+            priority: Request priority (PRIORITY_* constant)
+            owner: Identifier used for fair scheduling
+            deadline: Optional absolute time after which the request is dropped
+            timeout: Optional relative alternative to `deadline`, in seconds
+
+        Returns:
+            The queued GenerationRequest
+
+        Raises:
+            GenerationQueueFull: If the queue is at capacity
+        """
+        if deadline is None and timeout is not None:
+            deadline = time.time() + timeout
+
+        request = GenerationRequest(func, priority=priority, owner=owner, deadline=deadline)
+
+        with self._condition:
+            if self._pending >= self.max_queue_size:
+                # Make room taken by requests that already missed their deadline
+                self._expire_overdue()
+            if self._pending >= self.max_queue_size:
+                self.stats["rejected"] += 1
+                self.log(f"[Scheduler] Queue full ({self._pending} pending), rejecting request from {request.owner}")
+                raise GenerationQueueFull(f"Generation queue is full ({self.max_queue_size} pending requests)")
+
+            owners = self._queues.setdefault(priority, OrderedDict())
+            owners.setdefault(request.owner, deque()).append(request)
+            self._requests[request.request_id] = request
+            request._queued = True
+            self._pending += 1
+            self.stats["submitted"] += 1
+            queue_depth = self._pending
+            # Wake a worker, and the reaper so it sees the new deadline
+            self._condition.notify_all()
+
+        # Make sure there is someone to serve the request
+        if not self._workers or not all(w.is_alive() for w in self._workers):
+            self.start()
+
+        self._publish("model.request_queued", {
+            "request_id": request.request_id,
+            "priority": PRIORITY_NAMES.get(priority, str(priority)),
+            "owner": request.owner,
+            "queue_depth": queue_depth
+        })
+        return request
+
+    def cancel(self, request_id: str) -> bool:
+        """
+        Cancel a queued or running request
+
+        Args:
+            request_id: ID of the request to cancel
+
+        Returns:
+            True if the request was found and not finished yet
+        """
+        with self._condition:
+            request = self._requests.get(request_id)
+            if not request:
+                return False
+            cancelled = request.cancel()
+            if cancelled and request._queued:
+                # Free its queue slot and release waiters now; the worker
+                # skips the entry when it reaches it
+                self._drop(request, "cancelled")
+            self._condition.notify_all()
+        if cancelled:
+            self.log(f"[Scheduler] Cancellation requested for {request_id}")
+        return cancelled
+
+    def cancel_owner(self, owner: str) -> int:
+        """
+        Cancel every unfinished request submitted by an owner
+
+        Args:
+            owner: Owner identifier
+
+        Returns:
+            Number of requests cancelled
+        """
+        with self._condition:
+            targets = [r for r in self._requests.values() if r.owner == owner]
+        return sum(1 for r in targets if self.cancel(r.request_id))
+
+    def get_request(self, request_id: str) -> Optional[GenerationRequest]:
+        """
+        Look up an unfinished request
+
+        Args:
+            request_id: ID of the request
+
+        Returns:
+            The request, or None if unknown or already finished
+        """
+        with self._condition:
+            return self._requests.get(request_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics
+
+        Returns:
+            Dictionary of queue depth, counters and average timings
+        """
+        with self._condition:
+            stats = dict(self.stats)
+            stats["pending"] = self._pending
+            stats["running"] = self._running
+            stats["max_queue_size"] = self.max_queue_size
+            stats["pending_by_priority"] = {
+                PRIORITY_NAMES.get(p, str(p)): sum(1 for q in owners.values() for r in q if r._queued)
+                for p, owners in self._queues.items()
+            }
+
+        finished = stats["completed"] + stats["failed"]
+        stats["avg_queue_wait"] = stats["total_queue_wait"] / finished if finished else 0.0
+        stats["avg_service_time"] = stats["total_service_time"] / finished if finished else 0.0
+        return stats
+
+    def _next_request(self) -> Optional[GenerationRequest]:
+        """
+        Pop the next request to serve (caller must hold the condition)
+
+        Returns:
+            The next request or None if nothing is queued
+        """
+        self._purge_heads()
+        if not self._pending:
+            return None
+
+        now = time.time()
+
+        # Starved requests first: the oldest head-of-line request that has
+        # waited past the starvation timeout, whatever its priority
+        starved_key = None
+        if self.starvation_timeout:
+            oldest = None
+            for priority, owners in self._queues.items():
+                for owner, requests in owners.items():
+                    if requests and now - requests[0].submitted_at >= self.starvation_timeout:
+                        if oldest is None or requests[0].submitted_at < oldest:
+                            oldest = requests[0].submitted_at
+                            starved_key = (priority, owner)
+
+        if starved_key:
+            priority, owner = starved_key
+        else:
+            priority = min(p for p, owners in self._queues.items() if owners)
+            # Round-robin: serve the owner at the front, then rotate it to the back
+            owner = next(iter(self._queues[priority]))
+
+        owners = self._queues[priority]
+        requests = owners.pop(owner)
+        request = requests.popleft()
+        if requests:
+            owners[owner] = requests
+        if not owners:
+            del self._queues[priority]
+
+        request._queued = False
+        self._pending -= 1
+        return request
+
+    def _purge_heads(self) -> None:
+        """Discard dropped requests from the front of every queue (caller must hold the condition)"""
+        for priority in list(self._queues):
+            owners = self._queues[priority]
+            for owner in list(owners):
+                requests = owners[owner]
+                while requests and not requests[0]._queued:
+                    requests.popleft()
+                if not requests:
+                    del owners[owner]
+            if not owners:
+                del self._queues[priority]
+
+    def _drop(self, request: GenerationRequest, outcome: str) -> None:
+        """
+        Finish a queued request without running it (caller must hold the condition)
+
+        The request stays in its queue until a worker skips it, but no
+        longer counts towards the queue size, and its waiters are woken.
+
+        Args:
+            request: Queued request
+            outcome: "cancelled" or "expired"
+        """
+        request._queued = False
+        self._pending -= 1
+        self._requests.pop(request.request_id, None)
+        if outcome == "expired":
+            request._finish(REQUEST_STATUS["EXPIRED"], error="Request deadline passed before it was scheduled")
+        else:
+            request._finish(REQUEST_STATUS["CANCELLED"], error="Request cancelled")
+        self._record(request, outcome)
+
+    def _expire_overdue(self) -> Optional[float]:
+        """
+        Drop queued requests whose deadline passed (caller must hold the condition)
+
+        Returns:
+            Seconds until the next queued deadline, or None if none is set
+        """
+        now = time.time()
+        next_deadline = None
+        for owners in self._queues.values():
+            for requests in owners.values():
+                for request in requests:
+                    if not request._queued or request.deadline is None:
+                        continue
+                    if request.expired(now):
+                        self._drop(request, "expired")
+                    elif next_deadline is None or request.deadline < next_deadline:
+                        next_deadline = request.deadline
+        return None if next_deadline is None else max(0.0, next_deadline - now)
+
+    def _worker_loop(self) -> None:
+        """Serve queued requests until the scheduler is stopped"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait(timeout=1.0)
+                if self._stopping and not self._pending:
+                    return
+                request = self._next_request()
+                if request is None:
+                    continue
+                self._running += 1
+
+            try:
+                self._serve(request)
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._requests.pop(request.request_id, None)
+
+    def _reaper_loop(self) -> None:
+        """Expire queued requests at their deadline, even while every worker is busy"""
+        with self._condition:
+            while not self._stopping:
+                until_deadline = self._expire_overdue()
+                self._condition.wait(timeout=until_deadline)
+
+    def _serve(self, request: GenerationRequest) -> None:
+        """
+        Run a request, unless it was cancelled or missed its deadline
+
+        Args:
+            request: Request to run
+        """
+        if request.cancelled:
+            request._finish(REQUEST_STATUS["CANCELLED"], error="Request cancelled")
+            self._record(request, "cancelled")
+            return
+
+        if request.expired():
+            request._finish(REQUEST_STATUS["EXPIRED"], error="Request deadline passed before it was scheduled")
+            self._record(request, "expired")
+            return
+
+        request.started_at = time.time()
+        request.status = REQUEST_STATUS["RUNNING"]
+        self._publish("model.request_started", {
+            "request_id": request.request_id,
+            "owner": request.owner,
+            "queue_wait": request.started_at - request.submitted_at
+        })
+
+        try:
+            result = request.func(request)
+            if request.cancelled:
+                request._finish(REQUEST_STATUS["CANCELLED"], result=result, error="Request cancelled")
+                self._record(request, "cancelled")
+            else:
+                request._finish(REQUEST_STATUS["DONE"], result=result)
+                self._record(request, "completed")
+        except Exception as e:
+            self.log(f"[Scheduler] Request {request.request_id} failed: {e}")
+            request._finish(REQUEST_STATUS["FAILED"], error=str(e))
+            self._record(request, "failed")
+
+    def _record(self, request: GenerationRequest, outcome: str) -> None:
+        """
+        Update counters and publish the final metrics for a request
+
+        Args:
+            request: Finished request
+            outcome: Stats counter to increment
+        """
+        timings = request.get_timings()
+        with self._condition:
+            self.stats[outcome] += 1
+            if outcome in ("completed", "failed"):
+                self.stats["total_queue_wait"] += timings["queue_wait"] or 0.0
+                self.stats["total_service_time"] += timings["service_time"] or 0.0
+
+        self._publish("model.request_finished", request.to_dict())
+
+    def _publish(self, event_name: str, data: Dict[str, Any]) -> None:
+        """Publish a metrics event if an event bus is available"""
+        if self.event_bus is None:
+            return
+        try:
+            self.event_bus.publish(event_name, data, async_mode=True)
+        except Exception as e:
+            self.log(f"[Scheduler] Failed to publish {event_name}: {e}")
@@ -0,0 +1,191 @@
+"""
+Lexical Index - BM25 inverted index over memory documents
+"""
+import re
+import math
+import bisect
+from array import array
+from typing import List, Dict, Tuple, Optional, Iterable
+
+import numpy as np
+
+# Identifiers, numbers and words; dots/underscores keep code symbols intact
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+(?:\.[A-Za-z0-9_]+)*")
+_CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-cased index terms
+
+    Compound identifiers are indexed whole and by their parts, so
+    "MemorySystem.add_to_index" matches both the exact symbol and "index".
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repetitions)
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall(text or ""):
+        terms.append(token.lower())
+        if "." in token or "_" in token or not (token.islower() or token.isupper()):
+            parts = [p for piece in re.split(r"[._]", token) for p in _CAMEL_PATTERN.findall(piece)]
+            if len(parts) > 1:
+                terms.extend(p.lower() for p in parts)
+    return terms
+
+
+class LexicalIndex:
+    """
+    Incremental BM25 index keyed by MemorySystem row ids
+
+    Postings are compact arrays of row ids and term frequencies appended in
+    row order. Removed rows are dropped from their terms' postings, so
+    document frequencies only count live rows.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the lexical index
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove everything from the index"""
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.doc_lengths = array("I")
+        self.live_docs = 0
+        self.total_length = 0
+
+    def add(self, row: int, text: str) -> None:
+        """
+        Index one document
+
+        Args:
+            row: Row id (rows must be added in increasing order)
+            text: Document text
+        """
+        terms = tokenize(text)
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+
+        for term, count in counts.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array("I"), array("I"))
+            posting[0].append(row)
+            posting[1].append(count)
+
+        if row >= len(self.doc_lengths):
+            self.doc_lengths.extend([0] * (row + 1 - len(self.doc_lengths)))
+        self.doc_lengths[row] = len(terms)
+        self.live_docs += 1
+        self.total_length += len(terms)
+
+    def remove(self, row: int, text: str) -> None:
+        """
+        Remove a document from the postings and collection statistics
+
+        Args:
+            row: Row id
+            text: Document text, as passed to add
+        """
+        if row >= len(self.doc_lengths):
+            return
+        for term in set(tokenize(text)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            # Rows are appended in increasing order, so postings stay sorted
+            position = bisect.bisect_left(posting[0], row)
+            if position < len(posting[0]) and posting[0][position] == row:
+                del posting[0][position]
+                del posting[1][position]
+                if not posting[0]:
+                    del self.postings[term]
+        self.live_docs = max(0, self.live_docs - 1)
+        self.total_length -= self.doc_lengths[row]
+        self.doc_lengths[row] = 0
+
+    def lookup(self, term: str) -> List[int]:
+        """
+        Get the rows containing a term
+
+        Args:
+            term: Term (matched case-insensitively)
+
+        Returns:
+            List of row ids
+        """
+        posting = self.postings.get(term.lower())
+        return posting[0].tolist() if posting else []
+
+    def score(self, query: str, exclude: Optional[Iterable[int]] = None,
+              candidates: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Compute BM25 scores for every row
+
+        Args:
+            query: Query text
+            exclude: Rows that must score zero (e.g. removed rows)
+            candidates: Optional rows to restrict scoring to
+
+        Returns:
+            Array of scores indexed by row id
+        """
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float32)
+        if not self.live_docs:
+            return scores
+
+        doc_lengths = np.frombuffer(self.doc_lengths, dtype=np.uintc).astype(np.float32)
+        average_length = max(self.total_length / self.live_docs, 1.0)
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows = np.frombuffer(posting[0], dtype=np.uintc)
+            tf = np.frombuffer(posting[1], dtype=np.uintc).astype(np.float32)
+            df = len(rows)
+            idf = math.log(1.0 + (self.live_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[rows] / average_length)
+            scores[rows] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        if candidates is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            mask[np.asarray(candidates, dtype=np.int64)] = True
+            scores[~mask] = 0.0
+        if exclude:
+            scores[np.fromiter(exclude, dtype=np.int64)] = 0.0
+        return scores
+
+    def top_k(self, query: str, k: int, exclude: Optional[Iterable[int]] = None,
+              candidates: Optional[List[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Get the best matching rows for a query
+
+        Args:
+            query: Query text
+            k: Number of rows to return
+            exclude: Rows to skip
+            candidates: Optional rows to restrict the search to
+
+        Returns:
+            List of (row, score) pairs, best first, with score > 0
+        """
+        scores = self.score(query, exclude, candidates)
+        if k <= 0 or not len(scores):
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(row), float(scores[row])) for row in top if scores[row] > 0]
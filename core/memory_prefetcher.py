@@ -0,0 +1,188 @@
+"""
+Memory Prefetcher - Speculative memory retrieval on draft prompts
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+# Characters ignored when matching a draft against the final prompt
+_TRAILING_PUNCTUATION = " \t\n.,;:!?"
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class MemoryPrefetcher:
+    """
+    Runs MemorySystem searches on draft text in the background
+
+    The chat panel feeds the text being typed into `prefetch()`; only the
+    most recent draft is searched. When the prompt is finally sent, `get()`
+    returns the cached results for it (or waits briefly for a search of the
+    same text that is still in flight) so retrieval is off the critical path.
+    """
+
+    def __init__(self,
+                 memory_system,
+                 top_k: int = 5,
+                 ttl: float = 120.0,
+                 max_entries: int = 32,
+                 min_chars: int = 8,
+                 logger: Optional[Callable] = None):
+        """
+        Initialize the prefetcher
+
+        Args:
+            memory_system: MemorySystem instance to search
+            top_k: Number of results to retrieve per search
+            ttl: Seconds a cached result stays valid
+            max_entries: Maximum number of cached drafts
+            min_chars: Drafts shorter than this are not prefetched
+            logger: Optional logging function
+        """
+        self.memory_system = memory_system
+        self.top_k = top_k
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_chars = min_chars
+        self.log = logger or print
+
+        # normalized text -> (results, index_version, timestamp)
+        self._cache: "OrderedDict[str, Tuple[List[Dict[str, Any]], Any, float]]" = OrderedDict()
+        self._lock = threading.Condition()
+        self._latest_draft = None
+        self._inflight = None
+        self._worker = None
+
+        self.stats = {"prefetches": 0, "hits": 0, "misses": 0, "joined": 0}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize text for cache lookups
+
+        Args:
+            text: Draft or prompt text
+
+        Returns:
+            Lower-cased text with collapsed whitespace and no trailing punctuation
+        """
+        return _WHITESPACE_PATTERN.sub(" ", text or "").strip().rstrip(_TRAILING_PUNCTUATION).lower()
+
+    def _index_version(self) -> Any:
+        """Get a value that changes whenever the memory index changes"""
+        return getattr(self.memory_system, "generation", None)
+
+    def prefetch(self, draft: str) -> bool:
+        """
+        Schedule a background search for a draft prompt
+
+        Args:
+            draft: Text currently in the chat input
+
+        Returns:
+            True if a search was scheduled, False if skipped
+        """
+        key = self.normalize(draft)
+        if len(key) < self.min_chars or not self.memory_system:
+            return False
+
+        with self._lock:
+            if self._lookup(key) is not None or key == self._inflight:
+                return False
+            self._latest_draft = (key, draft)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+                self._worker.start()
+            self._lock.notify_all()
+        return True
+
+    def get(self, prompt: str, wait: float = 1.0) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get prefetched results for a prompt
+
+        Args:
+            prompt: Final prompt text
+            wait: Seconds to wait for an in-flight search of the same text
+
+        Returns:
+            Cached search results, or None if the caller has to search itself
+        """
+        key = self.normalize(prompt)
+        deadline = time.time() + wait
+
+        with self._lock:
+            results = self._lookup(key)
+            if results is None and key == self._inflight:
+                self.stats["joined"] += 1
+                while key == self._inflight and time.time() < deadline:
+                    self._lock.wait(timeout=max(0.0, deadline - time.time()))
+                results = self._lookup(key)
+
+            if results is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+            return results
+
+    def store(self, prompt: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Cache results retrieved by the caller
+
+        Args:
+            prompt: Prompt text the results belong to
+            results: Search results
+        """
+        key = self.normalize(prompt)
+        with self._lock:
+            self._store(key, results)
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._cache.clear()
+            self._latest_draft = None
+
+    def _lookup(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a fresh cache entry for key (caller must hold the lock)"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        results, version, stored_at = entry
+        if version != self._index_version() or time.time() - stored_at > self.ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return results
+
+    def _store(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Insert a cache entry (caller must hold the lock)"""
+        self._cache[key] = (results, self._index_version(), time.time())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _worker_loop(self) -> None:
+        """Search the most recent draft until there is nothing left to do"""
+        while True:
+            with self._lock:
+                if self._latest_draft is None:
+                    self._lock.wait(timeout=5.0)
+                    if self._latest_draft is None:
+                        self._worker = None
+                        return
+                key, draft = self._latest_draft
+                self._latest_draft = None
+                self._inflight = key
+
+            try:
+                results = self.memory_system.search(draft, top_k=self.top_k)
+                with self._lock:
+                    self._store(key, results)
+                    self.stats["prefetches"] += 1
+            except Exception as e:
+                self.log(f"[Memory Prefetch] Search failed: {e}")
+            finally:
+                with self._lock:
+                    self._inflight = None
+                    self._lock.notify_all()
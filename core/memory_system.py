@@ -3,11 +3,50 @@ Memory System - Vector embeddings and semantic search for context retrieval
 """
 import os
 import json
+import bisect
+import zlib
 import torch
 import numpy as np
-from typing import List, Dict, Any, Optional, Callable, Union
+from typing import List, Dict, Any, Optional, Callable, Union, Iterable, Iterator
 from sentence_transformers import SentenceTransformer, util
 import time
+import threading
+from collections import OrderedDict
+
+from core.lexical_index import LexicalIndex
+from core.duplicate_index import DuplicateIndex
+from core.text_chunker import iter_chunks, iter_chunk_spans, CHUNK_UNITS
+from core.vector_quantization import (
+    QuantizedIndex, ProductQuantizedIndex, QUANTIZATION_MODES, create_quantized_index, load_quantized_index
+)
+
+# Metadata keys accepted by search(filters=...)
+FILTER_KEYS = ("source", "category", "path", "file_type", "since", "until", "min_importance")
+
+# Importance assumed for documents that do not carry one (add_reflection's default)
+DEFAULT_IMPORTANCE = 0.5
+
+# Ranking modes accepted by search(mode=...)
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+
+# Reciprocal rank fusion constant and per-ranker candidate pool for hybrid search
+RRF_K = 60
+HYBRID_POOL = 50
+
+# Minimum number of quantized candidates re-scored with exact embeddings
+RERANK_POOL = 20
+
+# Chunks embedded per add_to_index call when streaming a file into the index
+INGEST_BATCH = 256
+
+# Share of removed rows above which a save compacts the store; below it,
+# saves keep the tombstoned rows and the delta log that marks them
+COMPACTION_THRESHOLD = 0.3
+
+# Minimum number of candidates considered when diversifying results, and the
+# similarity above which a candidate counts as a near-duplicate of a selected one
+DIVERSIFY_POOL = 30
+DUPLICATE_SIMILARITY = 0.95
 
 class MemorySystem:
     """Manages vector embeddings and semantic search for context retrieval"""
@@ -15,7 +54,16 @@ class MemorySystem:
     def __init__(self, 
                  model_name: str = "all-MiniLM-L6-v2", 
                  index_path: str = "data/vector_store/vector_store.json",
-                 logger: Optional[Callable] = None):
+                 logger: Optional[Callable] = None,
+                 search_mode: str = "vector",
+                 quantization: str = "none",
+                 rerank: bool = False,
+                 cache_size: int = 256,
+                 recency_weight: float = 0.1,
+                 importance_weight: float = 0.1,
+                 recency_half_life: float = 30.0,
+                 mmr_lambda: float = 0.7,
+                 deduplicate: bool = True):
         """
         Initialize the memory system
         
@@ -23,16 +71,73 @@ class MemorySystem:
             model_name: Name of the sentence transformer model to use
             index_path: Path to the vector store JSON file
             logger: Optional logging function
+            search_mode: Default ranking for search (vector, keyword or hybrid)
+            quantization: Embedding storage: "none" (float32), "int8" (scalar
+                quantization, ~4x smaller) or "pq" (product quantization, ~15x smaller)
+            rerank: Re-score the best quantized candidates with exact embeddings
+                (re-embeds up to max(4 * top_k, 20) texts per query)
+            cache_size: Number of recent search results to keep (0 disables caching)
+            recency_weight: Share of a diversified result's relevance that comes
+                from how recent it is
+            importance_weight: Share that comes from its importance
+            recency_half_life: Age in days at which the recency bonus halves
+            mmr_lambda: Relevance vs. novelty trade-off when diversifying
+                (1.0 ignores redundancy, lower values favour distinct content)
+            deduplicate: Skip exact and near-duplicate documents at ingest
         """
         self.model_name = model_name
         self.index_path = index_path
         self.log = logger or print
+        self.search_mode = search_mode if search_mode in SEARCH_MODES else "vector"
+        self.quantization = quantization if quantization in QUANTIZATION_MODES else "none"
+        self.rerank = rerank
+        self.recency_weight = max(0.0, float(recency_weight))
+        self.importance_weight = max(0.0, float(importance_weight))
+        self.recency_half_life = max(float(recency_half_life), 1e-6)
+        self.mmr_lambda = min(max(float(mmr_lambda), 0.0), 1.0)
+        self.deduplicate = deduplicate
         
         self.log(f"[Memory] Initializing memory system with model: {model_name}")
         self.model = None
-        self.index = []
+        self.index = self._new_index()
         self.documents = []
         
+        # Secondary indexes over row ids (positions in self.index/self.documents)
+        self.source_index: Dict[str, List[int]] = {}
+        self.path_index: Dict[str, set] = {}
+        self.file_type_index: Dict[str, set] = {}
+        self.category_index: Dict[str, List[tuple]] = {}  # category -> sorted (timestamp, row)
+        self.timestamp_index: List[tuple] = []  # sorted (timestamp, row)
+        self._importance_column = None  # (row count, tensor) cache for importance filters
+        
+        # BM25 inverted index over document text, maintained alongside the vectors
+        self.lexical_index = LexicalIndex()
+        
+        # MinHash/LSH index for duplicate detection; its signatures are saved
+        # next to the store so loading does not re-hash every document
+        self.duplicate_index = DuplicateIndex()
+        self.signatures_path = index_path + ".minhash"
+        self.last_ingest = {"added": 0, "exact_duplicates": 0, "near_duplicates": 0}
+        self.ingest_stats = dict(self.last_ingest)
+        
+        # Guards the rows and every index over them: compaction renumbers rows
+        # while background threads search and add documents
+        self.lock = threading.RLock()
+        
+        # Removed rows stay in place until a save compacts them away; until
+        # then removals are persisted as a delta log next to the index
+        self.deleted = set()
+        self.delta_path = index_path + ".delta"
+        
+        # Bumped on every change to the indexed rows; cached search results
+        # are only served while the generation they were computed at is current
+        self.generation = 0
+        self.cache_size = max(0, int(cache_size))
+        self._result_cache: OrderedDict = OrderedDict()
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {"hits": 0, "misses": 0}
+        
         # Ensure the directory exists
         os.makedirs(os.path.dirname(index_path), exist_ok=True)
         
@@ -41,6 +146,11 @@ class MemorySystem:
         
         # Try to load the index
         self.load_index()
+        
+        # Small product-quantized stores are not compressed yet; say so
+        if self.quantization == "pq" and (self._untrained_rows() or not self.index):
+            self.log(f"[Memory] Product quantization starts at {self.index.train_size} embeddings "
+                     f"({len(self.index)} stored as float32 so far)")
     
     def load_model(self) -> bool:
         """
@@ -58,6 +168,472 @@ class MemorySystem:
             self.log(f"[Memory Error] Failed to load model: {e}")
             return False
     
+    @staticmethod
+    def _file_type(meta: Dict[str, Any]) -> str:
+        """Get a document's file extension, falling back to its path or source"""
+        return (meta.get("file_type")
+                or os.path.splitext(meta.get("path") or "")[1]
+                or os.path.splitext(meta.get("source") or "")[1]).lower()
+    
+    @staticmethod
+    def _sorted_remove(entries: List[tuple], key: tuple) -> None:
+        """Remove a key from a sorted list of tuples"""
+        position = bisect.bisect_left(entries, key)
+        if position < len(entries) and entries[position] == key:
+            del entries[position]
+    
+    def _index_row(self, row: int, meta: Dict[str, Any], keep_sorted: bool = True) -> None:
+        """
+        Add one row to the secondary indexes
+        
+        Args:
+            row: Row id
+            meta: Document metadata
+            keep_sorted: Insert into sorted indexes in place (False when the
+                caller sorts them afterwards)
+        """
+        insert = bisect.insort if keep_sorted else list.append
+        timestamp = meta.get("timestamp", "")
+        
+        self.source_index.setdefault(meta.get("source", "Unknown"), []).append(row)
+        if meta.get("path"):
+            self.path_index.setdefault(meta["path"], set()).add(row)
+        for link in meta.get("duplicate_sources", ()):
+            self._index_link(row, link, (meta.get("duplicate_paths") or {}).get(link))
+        self.file_type_index.setdefault(self._file_type(meta), set()).add(row)
+        if meta.get("category"):
+            insert(self.category_index.setdefault(meta["category"], []), (timestamp, row))
+        insert(self.timestamp_index, (timestamp, row))
+        self.lexical_index.add(row, meta.get("text", ""))
+        self.duplicate_index.add(row, meta.get("text", ""))
+        self.generation += 1
+    
+    def _unindex_row(self, row: int, meta: Dict[str, Any]) -> None:
+        """
+        Remove one row from the path, file type, category, timestamp and lexical indexes
+        
+        Args:
+            row: Row id
+            meta: Document metadata
+        """
+        link_paths = (meta.get("duplicate_paths") or {}).values()
+        for index, key in [(self.path_index, meta.get("path")),
+                           (self.file_type_index, self._file_type(meta))] + [
+                           (self.path_index, path) for path in link_paths]:
+            self._discard_row(index, key, row)
+        
+        timestamp_key = (meta.get("timestamp", ""), row)
+        entries = self.category_index.get(meta.get("category"))
+        if entries is not None:
+            self._sorted_remove(entries, timestamp_key)
+            if not entries:
+                del self.category_index[meta["category"]]
+        self._sorted_remove(self.timestamp_index, timestamp_key)
+        self.lexical_index.remove(row, meta.get("text", ""))
+        self.duplicate_index.remove(row, meta.get("text", ""))
+        self.generation += 1
+    
+    @staticmethod
+    def _discard_row(index: Dict[str, set], key: Optional[str], row: int) -> None:
+        """Remove a row from one key of a set-valued index"""
+        rows = index.get(key)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del index[key]
+    
+    def _drop_source_row(self, source: str, row: int) -> None:
+        """Remove a row from one source's entry in the source index"""
+        rows = self.source_index.get(source)
+        if rows is not None and row in rows:
+            rows.remove(row)
+            if not rows:
+                del self.source_index[source]
+    
+    def _index_link(self, row: int, source: str, path: Optional[str]) -> None:
+        """
+        Index a row under a source linked to it as a duplicate
+        
+        Args:
+            row: Row id
+            source: Linked source name
+            path: Linked file path, if known
+        """
+        rows = self.source_index.setdefault(source, [])
+        if row not in rows:
+            rows.append(row)
+        if path:
+            self.path_index.setdefault(path, set()).add(row)
+    
+    def _release_source(self, row: int, meta: Dict[str, Any], source: str,
+                        gone: Callable[[str], bool]) -> bool:
+        """
+        Detach a removed source from a row that other sources share
+        
+        A source that is only linked to the row is unlinked. When the owner
+        is removed, the row passes to the first linked source that is not
+        being removed as well, so identical files keep their chunks.
+        
+        Args:
+            row: Row id
+            meta: Document metadata
+            source: Source being removed
+            gone: Tells whether a linked source is being removed too
+            
+        Returns:
+            True if the row stays live, False if it must be tombstoned
+        """
+        links = meta.get("duplicate_sources") or []
+        link_paths = meta.get("duplicate_paths") or {}
+        if source != meta.get("source", "Unknown"):
+            if source in links:
+                links.remove(source)
+            path = link_paths.pop(source, None)
+            if path and path != meta.get("path") and path not in link_paths.values():
+                self._discard_row(self.path_index, path, row)
+            self._drop_source_row(source, row)
+            self.generation += 1
+            return True
+            
+        heirs = [link for link in links if not gone(link)]
+        if not heirs:
+            return False
+            
+        heir = heirs[0]
+        self._discard_row(self.path_index, meta.get("path"), row)
+        self._discard_row(self.file_type_index, self._file_type(meta), row)
+        self._drop_source_row(source, row)
+        links.remove(heir)
+        meta["source"] = heir
+        meta.pop("path", None)
+        meta.pop("file_type", None)
+        heir_path = link_paths.pop(heir, None)
+        if heir_path:
+            meta["path"] = heir_path
+            meta["file_type"] = os.path.splitext(heir_path)[1].lower()
+            self.path_index.setdefault(heir_path, set()).add(row)
+        self.file_type_index.setdefault(self._file_type(meta), set()).add(row)
+        self.generation += 1
+        return True
+    
+    def _new_index(self):
+        """
+        Create empty embedding storage for the configured quantization
+        
+        Returns:
+            QuantizedIndex, or a plain list of tensors when unquantized
+        """
+        index = create_quantized_index(self.quantization)
+        return [] if index is None else index
+    
+    def _untrained_rows(self) -> int:
+        """
+        Count rows a product-quantized store still keeps as float32
+        
+        Returns:
+            Number of rows waiting for codebook training (0 once trained)
+        """
+        if isinstance(self.index, ProductQuantizedIndex) and not self.index.trained:
+            return len(self.index)
+        return 0
+    
+    def _convert_index(self, index):
+        """
+        Convert loaded embeddings to the configured storage
+        
+        Args:
+            index: List of tensors or QuantizedIndex
+            
+        Returns:
+            Embedding storage matching self.quantization
+        """
+        current = index.kind if isinstance(index, QuantizedIndex) else "none"
+        if current == self.quantization:
+            return index
+            
+        self.log(f"[Memory] Converting embeddings from {current} to {self.quantization} storage")
+        if self.quantization == "none":
+            return list(index)
+            
+        converted = self._new_index()
+        block = []
+        for vector in index:
+            block.append(vector.detach().float().cpu())
+            if len(block) == 4096:
+                converted.extend(torch.stack(block))
+                block = []
+        if block:
+            converted.extend(torch.stack(block))
+        return converted
+    
+    def rebuild_indexes(self) -> None:
+        """Rebuild the secondary indexes from self.documents"""
+        with self.lock:
+            self.source_index = {}
+            self.path_index = {}
+            self.file_type_index = {}
+            self.category_index = {}
+            self.timestamp_index = []
+            self._importance_column = None
+            self.lexical_index.clear()
+            self.duplicate_index.clear(keep_signatures=True)
+            self.generation += 1
+            for row, meta in enumerate(self.documents):
+                if row not in self.deleted:
+                    self._index_row(row, meta, keep_sorted=False)
+            for entries in self.category_index.values():
+                entries.sort()
+            self.timestamp_index.sort()
+    
+    def iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over live (not removed) document metadata
+        
+        Yields:
+            Document metadata dictionaries
+        """
+        # Compaction and reloads replace self.documents instead of reordering
+        # it, so a snapshot stays consistent while other threads modify the store
+        with self.lock:
+            documents, deleted = self.documents, set(self.deleted)
+        if not deleted:
+            yield from documents
+            return
+        for row, meta in enumerate(documents):
+            if row not in deleted:
+                yield meta
+    
+    def count_documents(self) -> int:
+        """
+        Get the number of live documents
+        
+        Returns:
+            Number of documents that have not been removed
+        """
+        return len(self.documents) - len(self.deleted)
+    
+    def get_documents_by_source(self, source: str) -> List[Dict[str, Any]]:
+        """
+        Get all chunks of a source
+        
+        Args:
+            source: Source name
+            
+        Returns:
+            List of document metadata dictionaries in insertion order
+        """
+        with self.lock:
+            return [self.documents[row] for row in self.source_index.get(source, [])]
+    
+    def get_documents_by_path(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Get all chunks indexed from a file path
+        
+        Args:
+            path: File path
+            
+        Returns:
+            List of document metadata dictionaries in insertion order
+        """
+        with self.lock:
+            return [self.documents[row] for row in sorted(self.path_index.get(path, ()))]
+    
+    def remove_documents(self, sources: Iterable[str]) -> int:
+        """
+        Remove every chunk of the given sources
+        
+        Rows are tombstoned through the source index, so the cost is
+        proportional to the number of removed chunks. The removal is appended
+        to the delta log; the vector store itself is rewritten at the next
+        full save.
+        
+        Args:
+            sources: Source names to remove
+            
+        Returns:
+            Number of chunks removed
+        """
+        with self.lock:
+            sources = set(sources)
+            removed = []
+            released = 0
+            for source in sources:
+                for row in self.source_index.pop(source, []):
+                    if row in self.deleted:
+                        continue
+                    meta = self.documents[row]
+                    # Rows shared with other sources stay for them
+                    if self._release_source(row, meta, source, sources.__contains__):
+                        released += 1
+                        continue
+                    self.deleted.add(row)
+                    self._unindex_row(row, meta)
+                    removed.append([row, source, self._row_checksum(meta)])
+            return self._record_removal(removed, released)
+    
+    def remove_paths(self, paths: Iterable[str]) -> int:
+        """
+        Remove every chunk loaded from the given file paths
+        
+        Unlike remove_documents this leaves other files with the same base
+        name (and therefore the same source) alone.
+        
+        Args:
+            paths: File paths as stored in the "path" metadata
+            
+        Returns:
+            Number of chunks removed
+        """
+        with self.lock:
+            paths = set(paths)
+            removed = []
+            released = 0
+            for path in paths:
+                for row in sorted(self.path_index.get(path, ())):
+                    meta = self.documents[row]
+                    link_paths = meta.get("duplicate_paths") or {}
+                    if meta.get("path") == path:
+                        source = meta.get("source", "Unknown")
+                    else:
+                        source = next((link for link, link_path in link_paths.items() if link_path == path), None)
+                        if source is None:
+                            continue
+                    # Rows shared with other files stay for them
+                    if self._release_source(row, meta, source, lambda link: link_paths.get(link) in paths):
+                        released += 1
+                        continue
+                    for owner in [source] + list(meta.get("duplicate_sources") or []):
+                        self._drop_source_row(owner, row)
+                    self.deleted.add(row)
+                    self._unindex_row(row, meta)
+                    removed.append([row, source, self._row_checksum(meta)])
+            return self._record_removal(removed, released)
+    
+    def _record_removal(self, removed: List[list], released: int = 0) -> int:
+        """
+        Persist tombstoned rows to the delta log
+        
+        Args:
+            removed: [row, source, checksum] entries that were just tombstoned
+            released: Shared rows that were kept but detached from a removed
+                source (their metadata changed, so the index is saved)
+            
+        Returns:
+            Number of chunks removed, including released shared rows
+        """
+        if not removed and not released:
+            return 0
+            
+        if removed:
+            try:
+                with open(self.delta_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"removed": removed}) + "\n")
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to record removal, saving full index: {e}")
+                self.save_index()
+                return len(removed) + released
+            self.log(f"[Memory] Removed {len(removed)} chunks from {len(set(entry[1] for entry in removed))} sources")
+        if released:
+            self.log(f"[Memory] Kept {released} shared chunks for their remaining sources")
+        
+        # Compact once enough of the store is dead weight
+        if released or self._needs_compaction():
+            self.save_index()
+        return len(removed) + released
+    
+    def remove_document(self, source: str) -> bool:
+        """
+        Remove every chunk of a single source
+        
+        Args:
+            source: Source name
+            
+        Returns:
+            True if anything was removed, False otherwise
+        """
+        return self.remove_documents([source]) > 0
+    
+    @staticmethod
+    def _row_checksum(meta: Dict[str, Any]) -> int:
+        """
+        Checksum identifying a row's content in the delta log
+        
+        Args:
+            meta: Document metadata
+            
+        Returns:
+            CRC-32 of the row's source, path, chunk, timestamp and text
+        """
+        key = "\0".join(str(meta.get(field, "")) for field in ("source", "path", "chunk", "timestamp", "text"))
+        return zlib.crc32(key.encode("utf-8"))
+    
+    def _needs_compaction(self) -> bool:
+        """
+        Check whether removed rows make up enough of the store to compact it
+        
+        Returns:
+            True if the share of tombstoned rows exceeds COMPACTION_THRESHOLD
+        """
+        return bool(self.deleted) and len(self.deleted) > COMPACTION_THRESHOLD * len(self.documents)
+    
+    def compact(self) -> int:
+        """
+        Drop tombstoned rows from memory and renumber the indexes
+        
+        Returns:
+            Number of rows dropped
+        """
+        with self.lock:
+            if not self.deleted:
+                return 0
+            dropped = len(self.deleted)
+            keep = [row for row in range(len(self.documents)) if row not in self.deleted]
+            if isinstance(self.index, QuantizedIndex):
+                self.index = self.index.take(keep)
+            else:
+                self.index = [self.index[row] for row in keep]
+            self.documents = [self.documents[row] for row in keep]
+            self.deleted = set()
+            self.duplicate_index.take(keep)
+            self.rebuild_indexes()
+            return dropped
+    
+    def _apply_delta(self) -> int:
+        """
+        Re-apply removals recorded since the last full save
+        
+        Returns:
+            Number of rows tombstoned
+        """
+        if not os.path.exists(self.delta_path):
+            return 0
+            
+        applied = 0
+        with open(self.delta_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line means that removal never completed
+                    continue
+                for item in entry.get("removed", []):
+                    row, source = item[0], item[1]
+                    # Only honour entries that still describe the same row; the
+                    # checksum catches rows renumbered by a compaction whose
+                    # save completed without clearing the log
+                    if row >= len(self.documents) or self.documents[row].get("source") != source:
+                        continue
+                    if len(item) > 2 and item[2] != self._row_checksum(self.documents[row]):
+                        continue
+                    self.deleted.add(row)
+                    applied += 1
+        return applied
+    
+    def _clear_delta(self) -> None:
+        """Remove the delta log after a full save"""
+        if os.path.exists(self.delta_path):
+            os.remove(self.delta_path)
+    
     def embed_texts(self, texts: List[str]) -> List[torch.Tensor]:
         """
         Embed a list of texts
@@ -90,87 +666,666 @@ class MemorySystem:
             self.log(f"[Memory Error] Failed to embed texts: {e}")
             return []
     
-    def add_to_index(self, docs: List[str], metadata: List[Dict[str, Any]]) -> bool:
+    def add_to_index(self, docs: List[str], metadata: List[Dict[str, Any]],
+                     deduplicate: Optional[bool] = None, save: bool = True) -> bool:
         """
         Add documents to the index
         
+        Duplicate documents are skipped before embedding; how many were added
+        and skipped is left in self.last_ingest.
+        
         Args:
             docs: List of document text strings
             metadata: List of metadata dictionaries
+            deduplicate: Skip exact and near-duplicate documents (defaults to
+                self.deduplicate)
+            save: Save the index afterwards (callers adding several batches
+                can save once at the end)
             
         Returns:
-            True if documents were added successfully, False otherwise
+            True if documents were added successfully (or all were duplicates),
+            False otherwise
+        """
+        return self._add_documents(docs, metadata, deduplicate, save) is not None
+    
+    def _add_documents(self, docs: List[str], metadata: List[Dict[str, Any]],
+                       deduplicate: Optional[bool] = None, save: bool = True) -> Optional[List[int]]:
+        """
+        Add documents to the index (see add_to_index)
+        
+        Args:
+            docs: List of document text strings
+            metadata: List of metadata dictionaries
+            deduplicate: Skip exact and near-duplicate documents
+            save: Save the index afterwards
+            
+        Returns:
+            Positions in docs of the documents stored (empty if all were
+            duplicates), or None on failure
         """
         if not docs or not metadata:
             self.log("[Memory Warning] No documents to add")
-            return False
+            return None
             
         if len(docs) != len(metadata):
             self.log("[Memory Error] Number of documents and metadata entries must match")
-            return False
+            return None
             
         try:
-            # Get embeddings
+            with self.lock:
+                if self.deduplicate if deduplicate is None else deduplicate:
+                    keep = self._skip_duplicates(docs, metadata)
+                    if not keep:
+                        return []
+                    docs = [docs[i] for i in keep]
+                    metadata = [metadata[i] for i in keep]
+                else:
+                    keep = list(range(len(docs)))
+                    self._record_ingest(len(docs), 0, 0)
+                
+            # Get embeddings (without holding the lock, so searches continue)
             embeddings = self.embed_texts(docs)
             
             if len(embeddings) == 0:
-                return False
+                return None
                 
-            # Add to index
-            for emb, meta in zip(embeddings, metadata):
-                if "timestamp" not in meta:
-                    meta["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S")
-                self.index.append(emb)
-                self.documents.append(meta)
-            
-            self.log(f"[Memory] Added {len(docs)} documents to index")
-            
-            # Save updated index
-            return self.save_index()
+            with self.lock:
+                untrained = isinstance(self.index, ProductQuantizedIndex) and not self.index.trained
+                
+                # Add to index
+                for emb, meta in zip(embeddings, metadata):
+                    if "timestamp" not in meta:
+                        meta["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                    self.index.append(emb)
+                    self.documents.append(meta)
+                    self._index_row(len(self.documents) - 1, meta)
+                
+                self.log(f"[Memory] Added {len(docs)} documents to index")
+                if untrained and self.index.trained:
+                    self.log(f"[Memory] Trained product quantization codebooks on {len(self.index)} embeddings")
+                
+                # Save updated index
+                if save and not self.save_index():
+                    return None
+                return keep
         except Exception as e:
             self.log(f"[Memory Error] Failed to add documents to index: {e}")
-            return False
+            return None
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def _skip_duplicates(self, docs: List[str], metadata: List[Dict[str, Any]]) -> List[int]:
+        """
+        Decide which documents of a batch are new
+        
+        A document is skipped when its text matches an indexed document or an
+        earlier document of the same batch exactly, or is a near-duplicate of
+        one from another source. When the match comes from another source,
+        that source (and its path, under "duplicate_paths") is linked to the
+        kept document under "duplicate_sources" and indexed with it.
+        
+        Args:
+            docs: Document texts
+            metadata: Metadata dictionaries
+            
+        Returns:
+            Positions of the documents to add
+        """
+        batch = DuplicateIndex(self.duplicate_index.threshold, self.duplicate_index.num_perm,
+                               self.duplicate_index.bands, self.duplicate_index.shingle_size)
+        keep = []
+        exact = near = 0
+        linked = False
+        for position, (doc, meta) in enumerate(zip(docs, metadata)):
+            signature = self.duplicate_index.signature(doc)
+            
+            source = meta.get("source")
+            
+            # Check the store first, then the documents kept from this batch;
+            # original_row is only set for documents already in the store.
+            # Near-duplicates within one source (e.g. overlapping chunks) are kept.
+            original = original_row = None
+            row = self.duplicate_index.find_exact(doc)
+            if row is not None:
+                original, original_row, exact = self.documents[row], row, exact + 1
+            else:
+                row = batch.find_exact(doc)
+                if row is not None:
+                    original, exact = metadata[keep[row]], exact + 1
+                else:
+                    match = self.duplicate_index.find_similar(doc, signature)
+                    if match is not None and self.documents[match[0]].get("source") != source:
+                        original, original_row, near = self.documents[match[0]], match[0], near + 1
+                    else:
+                        match = batch.find_similar(doc, signature)
+                        if match is not None and metadata[keep[match[0]]].get("source") != source:
+                            original, near = metadata[keep[match[0]]], near + 1
+                    
+            if original is None:
+                batch.add(len(keep), doc, signature)
+                keep.append(position)
+                continue
+                
+            if source and source != original.get("source"):
+                links = original.setdefault("duplicate_sources", [])
+                if source not in links:
+                    links.append(source)
+                    if meta.get("path"):
+                        original.setdefault("duplicate_paths", {})[source] = meta["path"]
+                    if original_row is not None:
+                        self._index_link(original_row, source, meta.get("path"))
+                        self.generation += 1
+                    linked = True
+                    
+        self._record_ingest(len(keep), exact, near)
+        if exact or near:
+            self.log(f"[Memory] Skipped {exact + near} duplicate documents ({exact} exact, {near} near-duplicate)")
+            # Links on existing documents only reach disk with a save
+            if linked and not keep:
+                self.save_index()
+        return keep
+    
+    def _record_ingest(self, added: int, exact: int, near: int) -> None:
+        """
+        Record the outcome of an ingest
+        
+        Args:
+            added: Documents added
+            exact: Exact duplicates skipped
+            near: Near-duplicates skipped
+        """
+        self.last_ingest = {"added": added, "exact_duplicates": exact, "near_duplicates": near}
+        for key, value in self.last_ingest.items():
+            self.ingest_stats[key] += value
+    
+    def _importance_mask(self, min_importance: float) -> torch.Tensor:
+        """
+        Get a boolean mask of rows whose importance is at least min_importance
+        
+        Args:
+            min_importance: Minimum importance
+            
+        Returns:
+            Boolean tensor with one entry per row
+        """
+        cached = self._importance_column
+        if cached is None or cached[0] != len(self.documents):
+            column = torch.tensor([float(meta.get("importance", DEFAULT_IMPORTANCE))
+                                   for meta in self.documents])
+            self._importance_column = cached = (len(self.documents), column)
+        return cached[1] >= min_importance
+    
+    def _filter_rows(self, filters: Dict[str, Any]) -> List[int]:
+        """
+        Resolve metadata filters to the live rows that satisfy all of them
+        
+        Equality filters (source, category, path, file_type) are answered from
+        the secondary indexes, timestamp ranges from the sorted timestamp index
+        and importance from a vectorized mask, so only matching rows are scored.
+        
+        Args:
+            filters: Filter dictionary (see search)
+            
+        Returns:
+            Sorted list of candidate row ids
+        """
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            self.log(f"[Memory Warning] Ignoring unknown search filters: {', '.join(sorted(unknown))}")
+            
+        candidates = None
+        
+        def narrow(rows: Iterable[int]) -> None:
+            nonlocal candidates
+            rows = set(rows)
+            candidates = rows if candidates is None else candidates & rows
+            
+        for key, index in (("source", self.source_index), ("category", self.category_index),
+                           ("path", self.path_index), ("file_type", self.file_type_index)):
+            value = filters.get(key)
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else value
+            rows = set()
+            for item in values:
+                if key == "file_type":
+                    item = item.lower() if item.startswith(".") else f".{item.lower()}"
+                entries = index.get(item, ())
+                if key == "category":
+                    rows.update(row for _, row in entries)
+                else:
+                    rows.update(entries)
+            narrow(rows)
+            
+        since, until = filters.get("since"), filters.get("until")
+        if since is not None or until is not None:
+            low = bisect.bisect_left(self.timestamp_index, (since, -1)) if since is not None else 0
+            high = (bisect.bisect_right(self.timestamp_index, (until, float("inf")))
+                    if until is not None else len(self.timestamp_index))
+            narrow(row for _, row in self.timestamp_index[low:high])
+            
+        min_importance = filters.get("min_importance")
+        if min_importance is not None and self.documents:
+            mask = self._importance_mask(float(min_importance))
+            if candidates is None:
+                narrow(torch.nonzero(mask).flatten().tolist())
+            else:
+                candidates = {row for row in candidates if mask[row]}
+                
+        if candidates is None:
+            candidates = range(len(self.documents))
+        return sorted(row for row in candidates if row not in self.deleted)
+    
+    def search(self, query: str, top_k: int = 5,
+               filters: Optional[Dict[str, Any]] = None,
+               mode: Optional[str] = None,
+               diversify: bool = False) -> List[Dict[str, Any]]:
         """
         Search the index for documents similar to the query
         
         Args:
             query: Search query string
             top_k: Number of results to return
+            filters: Optional metadata filters applied before scoring:
+                source, category, path, file_type (a value or a list of values),
+                since / until (inclusive "YYYY-MM-DD HH:MM:SS" bounds) and
+                min_importance (documents without one count as 0.5)
+            mode: "vector" (embedding similarity), "keyword" (BM25) or
+                "hybrid" (reciprocal rank fusion of both); defaults to
+                self.search_mode. "score" is always the cosine similarity
+                except in keyword mode, where it is the BM25 score; keyword and
+                hybrid results also carry "keyword_score"
+            diversify: Re-rank a larger candidate pool by relevance blended
+                with recency and importance, then pick results by maximal
+                marginal relevance so near-duplicates do not crowd out
+                distinct content; results also carry "rank_score"
             
         Returns:
-            List of document metadata dictionaries
+            List of document metadata dictionaries (copies carrying the scores)
         """
-        if not self.index:
-            self.log("[Memory Warning] Index is empty")
-            return []
+        results = self.search_many([query], top_k=top_k, filters=filters, mode=mode, diversify=diversify)
+        return results[0] if results else []
+    
+    def search_many(self, queries: List[str], top_k: int = 5,
+                    filters: Optional[Dict[str, Any]] = None,
+                    mode: Optional[str] = None,
+                    diversify: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        Search the index for several queries at once
+        
+        All queries are embedded in one model batch and scored with a single
+        query x document matrix product and a batched top-k, which is much
+        cheaper than calling search() in a loop. Results of recent queries are
+        kept in an LRU cache and served until the index next changes.
+        
+        Args:
+            queries: Search query strings
+            top_k: Number of results per query
+            filters: Optional metadata filters shared by all queries (see search)
+            mode: Ranking mode (see search)
+            diversify: Blend recency/importance and diversify (see search)
             
-        try:
-            # Get query embedding
-            query_vec = self.embed_texts([query])
+        Returns:
+            One list of document metadata dictionaries per query, in order
+        """
+        if not queries:
+            return []
+        empty = [[] for _ in queries]
+        
+        if not self.index or not self.count_documents():
+            self.log("[Memory Warning] Index is empty")
+            return empty
             
-            if not query_vec:
-                return []
-                
-            # Calculate similarity scores
-            scores = util.cos_sim(query_vec[0], torch.stack(self.index))[0]
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            self.log(f"[Memory Warning] Unknown search mode '{mode}', using vector search")
+            mode = "vector"
             
-            # Get top K results
-            top_scores, top_indices = torch.topk(scores, k=min(top_k, len(scores)))
+        # Serve repeated queries from the cache; search the rest as one batch
+        keys = [self._cache_key(query, top_k, filters, mode, diversify) for query in queries]
+        results = [self._cache_get(key) for key in keys]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if missing:
+            generation = self.generation
+            fresh = self._search_batch([queries[i] for i in missing], top_k, filters, mode, diversify)
+            if fresh is None:
+                return empty
+            for i, found in zip(missing, fresh):
+                results[i] = found
+                self._cache_put(keys[i], found, generation)
+        return results
+    
+    def _search_batch(self, queries: List[str], top_k: int,
+                      filters: Optional[Dict[str, Any]],
+                      mode: str, diversify: bool = False) -> Optional[List[List[Dict[str, Any]]]]:
+        """
+        Run a batched search without consulting the result cache
+        
+        Args:
+            queries: Search query strings
+            top_k: Number of results per query
+            filters: Optional metadata filters
+            mode: Resolved ranking mode
+            diversify: Re-rank and diversify a larger candidate pool
             
-            # Return metadata for top matches
-            results = []
-            for i, score in zip(top_indices, top_scores):
-                meta = self.documents[i]
-                meta["score"] = float(score)  # Convert tensor to float for serialization
-                results.append(meta)
+        Returns:
+            One result list per query, or None if the search failed
+        """
+        empty = [[] for _ in queries]
+        limit = top_k
+        if diversify:
+            top_k = max(top_k * 4, DIVERSIFY_POOL)
+        try:
+            # Embed the queries in one batch before taking the lock, so
+            # ingestion and other searches are not held up by the model
+            query_matrix = None
+            if mode != "keyword":
+                query_vecs = self.embed_texts(queries)
+                if len(query_vecs) != len(queries):
+                    return None
+                query_matrix = torch.stack(query_vecs)
+                
+            with self.lock:
+                # Narrow to the rows matching the filters before any scoring
+                rows = self._filter_rows(filters) if filters else None
+                if rows is not None and not rows:
+                    return empty
+                    
+                # Hits are (row, score, keyword score) triples, best first
+                if mode == "keyword":
+                    hits = [
+                        [(row, score, score)
+                         for row, score in self.lexical_index.top_k(query, top_k, exclude=self.deleted, candidates=rows)]
+                        for query in queries
+                    ]
+                else:
+                    # Calculate similarity scores (one row per query)
+                    scores = self._vector_scores(query_matrix, rows)
+                    candidate_count = self.count_documents() if rows is None else len(rows)
+                    
+                    # Quantized scores are approximate; re-score the best candidates exactly
+                    if self.rerank and isinstance(self.index, QuantizedIndex):
+                        self._rerank_scores(query_matrix, scores, rows, limit)
+                    
+                    if mode == "hybrid":
+                        hits = [self._fuse_rankings(query, scores[i], rows, candidate_count, top_k)
+                                for i, query in enumerate(queries)]
+                    else:
+                        # Get top K results for every query at once
+                        top_scores, top_indices = torch.topk(scores, k=min(top_k, candidate_count), dim=1)
+                        hits = [
+                            [(i if rows is None else rows[i], score, None)
+                             for i, score in zip(indices, row_scores)]
+                            for indices, row_scores in zip(top_indices.tolist(), top_scores.tolist())
+                        ]
                 
-            self.log(f"[Memory] Found {len(results)} matches for query: {query[:50]}...")
-            return results
+                if diversify:
+                    results = [self._diversify(query_hits, limit, mode) for query_hits in hits]
+                else:
+                    results = [[self._result(*hit) for hit in query_hits] for query_hits in hits]
+                        
+                if len(queries) == 1:
+                    self.log(f"[Memory] Found {len(results[0])} matches for query: {queries[0][:50]}...")
+                else:
+                    self.log(f"[Memory] Searched {len(queries)} queries ({sum(len(r) for r in results)} matches)")
+                return results
         except Exception as e:
             self.log(f"[Memory Error] Search failed: {e}")
+            return None
+    
+    def _cache_key(self, query: str, top_k: int, filters: Optional[Dict[str, Any]],
+                   mode: str, diversify: bool = False) -> tuple:
+        """
+        Build the result cache key for a search
+        
+        Args:
+            query: Search query string (whitespace is normalized)
+            top_k: Number of results
+            filters: Optional metadata filters
+            mode: Resolved ranking mode
+            diversify: Whether results are diversified
+            
+        Returns:
+            Hashable cache key
+        """
+        frozen = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+        return (" ".join(query.split()), top_k, frozen, mode, diversify)
+    
+    def _cache_get(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results for the current index generation
+        
+        Args:
+            key: Cache key from _cache_key
+            
+        Returns:
+            Copies of the cached results, or None on a miss
+        """
+        if not self.cache_size:
+            return None
+        with self._cache_lock:
+            # Everything cached before the index last changed is stale
+            if self._cache_generation != self.generation:
+                self._result_cache.clear()
+                self._cache_generation = self.generation
+            results = self._result_cache.get(key)
+            if results is None:
+                self.cache_stats["misses"] += 1
+                return None
+            self._result_cache.move_to_end(key)
+            self.cache_stats["hits"] += 1
+        return [dict(result) for result in results]
+    
+    def _cache_put(self, key: tuple, results: List[Dict[str, Any]], generation: int) -> None:
+        """
+        Store search results in the cache
+        
+        Args:
+            key: Cache key from _cache_key
+            results: Results to cache (copied, so callers may modify theirs)
+            generation: Index generation the results were computed at
+        """
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            # Results computed while the index changed underneath are not kept
+            if generation != self.generation or self._cache_generation != generation:
+                return
+            self._result_cache[key] = [dict(result) for result in results]
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+    
+    def _diversify(self, hits: List[tuple], top_k: int, mode: str) -> List[Dict[str, Any]]:
+        """
+        Re-rank candidate hits and select a diverse top_k
+        
+        Each candidate's relevance blends its search score with an exponential
+        recency decay and its importance. Results are then picked greedily by
+        maximal marginal relevance: relevance minus the highest similarity to
+        an already selected result, weighted by mmr_lambda. Near-duplicates of
+        selected results only fill slots no distinct candidate can.
+        
+        Args:
+            hits: Candidate (row, score, keyword score) hits, best first
+            top_k: Number of results to return
+            mode: Ranking mode the hits came from
+            
+        Returns:
+            List of document metadata dictionaries carrying "rank_score"
+        """
+        if not hits:
             return []
+        rows = [hit[0] for hit in hits]
+        scores = torch.tensor([float(hit[1]) for hit in hits])
+        if mode == "keyword":
+            # BM25 is unbounded; scale it to [0, 1] so the weights stay meaningful
+            scores = scores / scores.max().clamp_min(1e-12)
+            
+        now = time.time()
+        ages = []
+        for row in rows:
+            try:
+                stamp = time.mktime(time.strptime(self.documents[row].get("timestamp", ""), "%Y-%m-%d %H:%M:%S"))
+                ages.append(max(now - stamp, 0.0) / 86400.0)
+            except (TypeError, ValueError, OverflowError):
+                ages.append(float("inf"))
+        recency = torch.pow(0.5, torch.tensor(ages) / self.recency_half_life)
+        importance = torch.tensor([
+            float(self.documents[row].get("importance", DEFAULT_IMPORTANCE)) for row in rows
+        ])
+        
+        similarity_weight = max(0.0, 1.0 - self.recency_weight - self.importance_weight)
+        relevance = (similarity_weight * scores + self.recency_weight * recency
+                     + self.importance_weight * importance)
+        
+        # Pairwise similarity between candidates (decoded when quantized)
+        if isinstance(self.index, QuantizedIndex):
+            vectors = self.index.decode(rows)
+        else:
+            vectors = torch.stack([self.index[row] for row in rows])
+        vectors = vectors.float().cpu()
+        vectors = vectors / vectors.norm(dim=1, keepdim=True).clamp_min(1e-12)
+        pairwise = vectors @ vectors.T
+        
+        selected = []
+        redundancy = torch.zeros(len(rows))
+        available = torch.ones(len(rows), dtype=torch.bool)
+        for _ in range(min(top_k, len(rows))):
+            marginal = self.mmr_lambda * relevance - (1.0 - self.mmr_lambda) * redundancy
+            # Marginal relevance lies in [-1, 1], so this ranks duplicates last
+            marginal[redundancy >= DUPLICATE_SIMILARITY] -= 2.0
+            marginal[~available] = float("-inf")
+            choice = int(torch.argmax(marginal))
+            selected.append(choice)
+            available[choice] = False
+            redundancy = torch.maximum(redundancy, pairwise[choice])
+            
+        results = []
+        for choice in selected:
+            row, score, keyword_score = hits[choice]
+            result = self._result(row, score, keyword_score)
+            result["rank_score"] = float(relevance[choice])
+            results.append(result)
+        return results
+    
+    def _result(self, row: int, score: float, keyword_score: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Build a search result for a row
+        
+        Results are copies, so concurrent or batched searches never overwrite
+        each other's scores and scores are not persisted with the index.
+        
+        Args:
+            row: Row id
+            score: Similarity score
+            keyword_score: Optional BM25 score
+            
+        Returns:
+            Document metadata dictionary with the scores added
+        """
+        result = dict(self.documents[row])
+        result["score"] = float(score)
+        if keyword_score is not None:
+            result["keyword_score"] = float(keyword_score)
+        return result
+    
+    def _vector_scores(self, query_matrix: torch.Tensor, rows: Optional[List[int]] = None) -> torch.Tensor:
+        """
+        Compute cosine similarity between query embeddings and stored rows
+        
+        Args:
+            query_matrix: Query embeddings, shape [queries, dim]
+            rows: Optional candidate rows (all rows when omitted)
+            
+        Returns:
+            Scores of shape [queries, candidates] (removed rows at -inf)
+        """
+        if isinstance(self.index, QuantizedIndex):
+            # Asymmetric distance: float queries against compressed rows
+            scores = self.index.scores(query_matrix, rows)
+        elif rows is None:
+            scores = util.cos_sim(query_matrix, torch.stack(self.index))
+        else:
+            scores = util.cos_sim(query_matrix, torch.stack([self.index[row] for row in rows]))
+            
+        # Removed rows can never be returned
+        if rows is None and self.deleted:
+            scores[:, torch.tensor(list(self.deleted))] = float("-inf")
+        return scores
+    
+    def _rerank_scores(self, query_matrix: torch.Tensor, scores: torch.Tensor,
+                       rows: Optional[List[int]], top_k: int) -> None:
+        """
+        Replace the approximate scores of the best candidates with exact ones
+        
+        The candidates' text is re-embedded (once per distinct candidate across
+        all queries), so no float copy of the corpus has to be kept in memory.
+        
+        Args:
+            query_matrix: Query embeddings, shape [queries, dim]
+            scores: Approximate scores, shape [queries, candidates] (updated in place)
+            rows: Candidate rows scores refers to, or None for all rows
+            top_k: Number of results the caller needs
+        """
+        available = int(torch.isfinite(scores[0]).sum())
+        pool = min(max(top_k * 4, RERANK_POOL), available)
+        if pool <= 0:
+            return
+            
+        pools = torch.topk(scores, k=pool, dim=1)[1].tolist()
+        columns: Dict[int, int] = {}
+        texts = []
+        for positions in pools:
+            for position in positions:
+                if position not in columns:
+                    text = self.documents[position if rows is None else rows[position]].get("text", "")
+                    columns[position] = len(texts) if text else -1
+                    if text:
+                        texts.append(text)
+        if not texts:
+            return
+            
+        exact = self.embed_texts(texts)
+        if len(exact) != len(texts):
+            return
+        similarities = util.cos_sim(query_matrix.cpu(), torch.stack(exact).cpu())
+        for query, positions in enumerate(pools):
+            for position in positions:
+                column = columns[position]
+                if column >= 0:
+                    scores[query, position] = similarities[query, column]
+    
+    def _fuse_rankings(self, query: str, scores: torch.Tensor, rows: Optional[List[int]],
+                       candidate_count: int, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Combine vector and BM25 rankings with reciprocal rank fusion
+        
+        Args:
+            query: Search query string
+            scores: Cosine similarities (per row, or per candidate when rows is set)
+            rows: Candidate rows scores refers to, or None for all rows
+            candidate_count: Number of rankable rows
+            top_k: Number of results to return
+            
+        Returns:
+            List of (row, cosine similarity, BM25 score) hits, best first
+        """
+        pool = min(max(top_k, HYBRID_POOL), candidate_count)
+        _, vector_top = torch.topk(scores, k=pool)
+        vector_rows = [i if rows is None else rows[i] for i in vector_top.tolist()]
+        keyword_hits = self.lexical_index.top_k(query, pool, exclude=self.deleted, candidates=rows)
+        
+        fused: Dict[int, float] = {}
+        for rank, row in enumerate(vector_rows):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+        for rank, (row, _) in enumerate(keyword_hits):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+            
+        keyword_scores = dict(keyword_hits)
+        offsets = None if rows is None else {row: i for i, row in enumerate(rows)}
+        return [
+            (row, float(scores[row if offsets is None else offsets[row]]), keyword_scores.get(row, 0.0))
+            for row in sorted(fused, key=fused.get, reverse=True)[:top_k]
+        ]
     
     def save_index(self) -> bool:
         """
@@ -179,32 +1334,54 @@ class MemorySystem:
         Returns:
             True if index saved successfully, False otherwise
         """
-        if not self.index:
-            self.log("[Memory Warning] No index to save")
-            return False
+        with self.lock:
+            # Removed rows are physically dropped once they are a large enough share
+            compacted = self.compact() if self._needs_compaction() else 0
             
-        try:
-            # Convert tensors to lists for JSON serialization
-            data = [
-                {
-                    "embedding": emb.cpu().tolist(), 
-                    "meta": meta
-                } 
-                for emb, meta in zip(self.index, self.documents)
-            ]
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-            
-            # Save to file
-            with open(self.index_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-                
-            self.log(f"[Memory] Index saved to {self.index_path}")
-            return True
-        except Exception as e:
-            self.log(f"[Memory Error] Failed to save index: {e}")
-            return False
+            if not self.index and not compacted:
+                self.log("[Memory Warning] No index to save")
+                return False
+                
+            try:
+                if isinstance(self.index, QuantizedIndex):
+                    # Compressed codes are stored as base64 next to the metadata
+                    data = {
+                        "format": "quantized",
+                        "model_name": self.model_name,
+                        "quantization": self.index.state(),
+                        "documents": self.documents
+                    }
+                else:
+                    # Convert tensors to lists for JSON serialization
+                    data = [
+                        {
+                            "embedding": emb.cpu().tolist(), 
+                            "meta": meta
+                        } 
+                        for emb, meta in zip(self.index, self.documents)
+                    ]
+                
+                # Create directory if it doesn't exist
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                
+                # Save to file
+                with open(self.index_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+                
+                # Tombstoned rows kept in the file stay marked by the delta log
+                if not self.deleted:
+                    self._clear_delta()
+                
+                try:
+                    self.duplicate_index.save(self.signatures_path)
+                except OSError as e:
+                    self.log(f"[Memory Warning] Failed to save duplicate signatures: {e}")
+                    
+                self.log(f"[Memory] Index saved to {self.index_path}")
+                return True
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to save index: {e}")
+                return False
     
     def load_index(self) -> bool:
         """
@@ -213,55 +1390,77 @@ class MemorySystem:
         Returns:
             True if index loaded successfully, False otherwise
         """
-        if not os.path.exists(self.index_path):
-            self.log(f"[Memory] No index file found at {self.index_path}")
-            return False
-            
-        try:
-            # Use utf-8-sig to handle UTF-8 BOM (Byte Order Mark)
-            with open(self.index_path, "r", encoding="utf-8-sig") as f:
-                data = json.load(f)
-                
-            # Clear current index
-            self.index = []
-            self.documents = []
-            
-            # Check if data is a list or dict
-            if isinstance(data, list):
-                # Load index (list format)
-                for item in data:
-                    if not isinstance(item, dict):
-                        self.log(f"[Memory Warning] Invalid item format in index: {type(item)}")
-                        continue
-                    if "embedding" in item and "meta" in item:
-                        self.index.append(torch.tensor(item["embedding"]))
-                        self.documents.append(item["meta"])
-                    else:
-                        self.log(f"[Memory Warning] Missing embedding or meta in item")
-            elif isinstance(data, dict):
-                # Alternative format (dict with embeddings and documents)
-                if "embeddings" in data and "documents" in data:
-                    embeddings = data["embeddings"]
-                    documents = data["documents"]
-                    if len(embeddings) == len(documents):
-                        for emb, doc in zip(embeddings, documents):
-                            self.index.append(torch.tensor(emb))
-                            self.documents.append(doc)
+        with self.lock:
+            if not os.path.exists(self.index_path):
+                self.log(f"[Memory] No index file found at {self.index_path}")
+                return False
+                
+            try:
+                # Use utf-8-sig to handle UTF-8 BOM (Byte Order Mark)
+                with open(self.index_path, "r", encoding="utf-8-sig") as f:
+                    data = json.load(f)
+                    
+                # Clear current index
+                self.index = self._new_index()
+                self.documents = []
+                self.deleted = set()
+                
+                # Check if data is a list or dict
+                if isinstance(data, list):
+                    # Load index (list format)
+                    for item in data:
+                        if not isinstance(item, dict):
+                            self.log(f"[Memory Warning] Invalid item format in index: {type(item)}")
+                            continue
+                        if "embedding" in item and "meta" in item:
+                            self.index.append(torch.tensor(item["embedding"]))
+                            self.documents.append(item["meta"])
+                        else:
+                            self.log(f"[Memory Warning] Missing embedding or meta in item")
+                elif isinstance(data, dict):
+                    if data.get("format") == "quantized":
+                        # Quantized format (compressed codes plus documents)
+                        index = load_quantized_index(data["quantization"])
+                        if len(index) != len(data.get("documents", [])):
+                            self.log("[Memory Error] Mismatched lengths of embeddings and documents")
+                            return False
+                        self.index = index
+                        self.documents = data["documents"]
+                    # Alternative format (dict with embeddings and documents)
+                    elif "embeddings" in data and "documents" in data:
+                        embeddings = data["embeddings"]
+                        documents = data["documents"]
+                        if len(embeddings) == len(documents):
+                            for emb, doc in zip(embeddings, documents):
+                                self.index.append(torch.tensor(emb))
+                                self.documents.append(doc)
+                        else:
+                            self.log("[Memory Error] Mismatched lengths of embeddings and documents")
+                            return False
                     else:
-                        self.log("[Memory Error] Mismatched lengths of embeddings and documents")
+                        self.log("[Memory Error] Invalid index format: missing embeddings or documents")
                         return False
                 else:
-                    self.log("[Memory Error] Invalid index format: missing embeddings or documents")
+                    self.log(f"[Memory Error] Invalid index data type: {type(data)}")
                     return False
-            else:
-                self.log(f"[Memory Error] Invalid index data type: {type(data)}")
-                return False
+                    
+                # Match the configured storage (e.g. quantize a float store)
+                self.index = self._convert_index(self.index)
                 
-            self.log(f"[Memory] Loaded {len(self.index)} items from index")
-            return True
-        except Exception as e:
-            self.log(f"[Memory Error] Failed to load index: {e}")
-            return False
+                # Reuse saved duplicate signatures when they match the loaded rows
+                if not self.duplicate_index.load(self.signatures_path, len(self.documents)):
+                    self.duplicate_index.clear()
+                
+                # Tombstone rows removed since the last full save
+                removed = self._apply_delta()
+                self.rebuild_indexes()
+                    
+                self.log(f"[Memory] Loaded {len(self.index)} items from index"
+                         + (f" ({removed} removed)" if removed else ""))
+                return True
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to load index: {e}")
+                return False
     
     def clear_index(self) -> bool:
         """
@@ -270,105 +1469,182 @@ class MemorySystem:
         Returns:
             True if index cleared successfully, False otherwise
         """
-        try:
-            self.index = []
-            self.documents = []
-            
-            # Remove the index file if it exists
-            if os.path.exists(self.index_path):
-                os.remove(self.index_path)
+        with self.lock:
+            try:
+                self.index = self._new_index()
+                self.documents = []
+                self.deleted = set()
+                self.duplicate_index.clear()
+                self.rebuild_indexes()
                 
-            self.log("[Memory] Index cleared")
-            return True
-        except Exception as e:
-            self.log(f"[Memory Error] Failed to clear index: {e}")
-            return False
+                # Remove the index file if it exists
+                if os.path.exists(self.index_path):
+                    os.remove(self.index_path)
+                if os.path.exists(self.signatures_path):
+                    os.remove(self.signatures_path)
+                self._clear_delta()
+                    
+                self.log("[Memory] Index cleared")
+                return True
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to clear index: {e}")
+                return False
             
     def add_file_to_index(self, file_path: str, 
                           content: Optional[str] = None, 
                           chunk_size: int = 1000, 
-                          chunk_overlap: int = 200) -> bool:
+                          chunk_overlap: int = 200,
+                          chunk_unit: str = "chars") -> bool:
         """
         Add a file to the index, optionally with chunking
         
+        Without content the file is streamed from disk, so arbitrarily large
+        files are chunked with bounded memory.
+        
         Args:
             file_path: Path to the file
             content: Optional file content if already read
             chunk_size: Size of chunks to split content into
             chunk_overlap: Overlap between chunks
+            chunk_unit: Unit of chunk_size and chunk_overlap: "chars" or "tokens"
             
         Returns:
             True if file added successfully, False otherwise
         """
         try:
-            # Get file content if not provided
-            if content is None:
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                    
-            # Check if we should chunk based on content length
-            if len(content) > chunk_size:
-                self.log(f"[Memory] Chunking file {os.path.basename(file_path)} into smaller sections")
-                return self._add_chunked_file(file_path, content, chunk_size, chunk_overlap)
-            else:
-                # Add as a single document
-                meta = {
-                    "source": os.path.basename(file_path),
-                    "path": file_path,
-                    "text": content,
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                }
+            if content is not None:
+                return self.add_stream_to_index(file_path, [content], chunk_size, chunk_overlap, chunk_unit)
                 
-                return self.add_to_index([content], [meta])
+            # Stream the file content instead of reading it all at once
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                return self.add_stream_to_index(file_path, f, chunk_size, chunk_overlap, chunk_unit)
         except Exception as e:
             self.log(f"[Memory Error] Failed to add file {file_path}: {e}")
             return False
             
-    def _add_chunked_file(self, file_path: str, content: str, 
-                          chunk_size: int, chunk_overlap: int) -> bool:
+    def add_stream_to_index(self, file_path: str, pieces: Iterable[str],
+                            chunk_size: int = 1000, chunk_overlap: int = 200,
+                            chunk_unit: str = "chars", span_key: Optional[str] = None,
+                            extra_metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
-        Add a file to the index in chunks using sentence-aware chunking
+        Chunk and add a stream of text belonging to one file
+        
+        Chunks are embedded in batches as they are produced and the index is
+        saved once at the end. Content that fits in one chunk is stored as a
+        single document.
         
         Args:
-            file_path: Path to the file
-            content: File content
+            file_path: Path the text came from
+            pieces: Iterable of text pieces (file handle, PDF pages, ...)
             chunk_size: Size of chunks to split content into
             chunk_overlap: Overlap between chunks
+            chunk_unit: Unit of chunk_size and chunk_overlap: "chars" or "tokens"
+            span_key: Metadata key recording which pieces each chunk came from
+                (e.g. "page" for PDF pages): chunks get span_key set to the
+                1-based first piece and span_key + "_end" to the last one
+            extra_metadata: Optional metadata added to every chunk
             
         Returns:
-            True if file added successfully, False otherwise
+            True if the text was added successfully, False otherwise
         """
         try:
             # Get the file name for metadata
             file_name = os.path.basename(file_path)
+            if chunk_unit not in CHUNK_UNITS:
+                self.log(f"[Memory Warning] Unknown chunk unit '{chunk_unit}', using chars")
+                chunk_unit = "chars"
+                
+            chunks = iter_chunk_spans(pieces, max_chunk_size=chunk_size, overlap=chunk_overlap,
+                                      unit=chunk_unit, token_counter=self._count_tokens)
             
-            # Use the sentence-aware chunking method
-            chunks = self._chunk_text(content, max_chunk_size=chunk_size, overlap=chunk_overlap)
-            
-            self.log(f"[Memory] Split file '{file_name}' into {len(chunks)} chunks")
+            docs: List[str] = []
+            metadata: List[Dict[str, Any]] = []
+            chunk_metadata: List[Dict[str, Any]] = []
+            totals = {"added": 0, "exact_duplicates": 0, "near_duplicates": 0}
+            success = True
             
-            # Create metadata for each chunk
-            metadata = []
-            for i, chunk in enumerate(chunks):
-                meta = {
+            def flush() -> bool:
+                added = self.add_to_index(docs, metadata, save=False)
+                for key in totals:
+                    totals[key] += self.last_ingest.get(key, 0)
+                docs.clear()
+                metadata.clear()
+                return added
+                
+            for i, (chunk, first_piece, last_piece) in enumerate(chunks):
+                if i == 1:
+                    self.log(f"[Memory] Chunking file {file_name} into smaller sections")
+                meta = dict(extra_metadata or {})
+                meta.update({
                     "source": file_name,
                     "path": file_path,
                     "text": chunk,
                     "chunk": i + 1,
-                    "total_chunks": len(chunks),
                     "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
                     # Add file extension as a hint about content type
                     "file_type": os.path.splitext(file_path)[1].lower(),
-                }
+                })
+                if span_key:
+                    meta[span_key] = first_piece + 1
+                    meta[span_key + "_end"] = last_piece + 1
+                docs.append(chunk)
                 metadata.append(meta)
+                chunk_metadata.append(meta)
+                if len(docs) >= INGEST_BATCH:
+                    success = flush() and success
+                    
+            if len(chunk_metadata) == 1 and docs:
+                # Small content is stored as a single document
+                for key in ("chunk", "file_type"):
+                    metadata[0].pop(key)
+            elif len(chunk_metadata) > 1:
+                self.log(f"[Memory] Split file '{file_name}' into {len(chunk_metadata)} chunks")
+                for meta in chunk_metadata:
+                    meta["total_chunks"] = len(chunk_metadata)
+                    
+            if docs:
+                success = flush() and success
+            if not chunk_metadata:
+                self.log(f"[Memory Warning] No text to add from {file_name}")
+                return False
                 
-            # Add chunks to index
-            return self.add_to_index(chunks, metadata)
-            
+            self.last_ingest = totals
+            return self.save_index() and success
         except Exception as e:
             self.log(f"[Memory Error] Failed to chunk file {file_path}: {e}")
             return False
             
+    def _add_chunked_file(self, file_path: str, content: str, 
+                          chunk_size: int, chunk_overlap: int) -> bool:
+        """
+        Add a file to the index in chunks using sentence-aware chunking
+        
+        Args:
+            file_path: Path to the file
+            content: File content
+            chunk_size: Size of chunks to split content into
+            chunk_overlap: Overlap between chunks
+            
+        Returns:
+            True if file added successfully, False otherwise
+        """
+        return self.add_stream_to_index(file_path, [content], chunk_size, chunk_overlap)
+        
+    def _count_tokens(self, text: str) -> int:
+        """
+        Count model tokens in a text (used for token-sized chunks)
+        
+        Args:
+            text: Text to measure
+            
+        Returns:
+            Token count from the embedding model's tokenizer, or an estimate
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None and hasattr(tokenizer, "tokenize"):
+            return len(tokenizer.tokenize(text))
+        return (len(text) + 3) // 4
+            
     def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the memory system
@@ -376,67 +1652,37 @@ class MemorySystem:
         Returns:
             Dictionary of statistics
         """
-        stats = {
-            "model": self.model_name,
-            "index_path": self.index_path,
-            "documents_count": len(self.documents),
-            "sources": {},
-            "last_updated": None
-        }
-        
-        # Get unique sources and count
-        for doc in self.documents:
-            source = doc.get("source", "Unknown")
-            if source in stats["sources"]:
-                stats["sources"][source] += 1
-            else:
-                stats["sources"][source] = 1
-                
-        # Get last updated timestamp
-        if self.documents:
-            timestamps = [doc.get("timestamp") for doc in self.documents if "timestamp" in doc]
-            if timestamps:
-                stats["last_updated"] = max(timestamps)
-                
-        return stats
+        with self.lock:
+            stats = {
+                "model": self.model_name,
+                "index_path": self.index_path,
+                "documents_count": self.count_documents(),
+                "quantization": self.quantization,
+                "quantization_pending": self._untrained_rows(),
+                "index_bytes": (self.index.nbytes() if isinstance(self.index, QuantizedIndex)
+                                else sum(emb.nelement() * emb.element_size() for emb in self.index)),
+                "generation": self.generation,
+                "deduplication": dict(self.ingest_stats),
+                "query_cache": dict(self.cache_stats, entries=len(self._result_cache)),
+                "sources": {},
+                "last_updated": None
+            }
+            
+            # Get unique sources and count
+            for source, rows in self.source_index.items():
+                stats["sources"][source] = len(rows)
+                    
+            # Get last updated timestamp
+            if self.documents:
+                timestamps = [doc.get("timestamp") for doc in self.iter_documents() if "timestamp" in doc]
+                if timestamps:
+                    stats["last_updated"] = max(timestamps)
+                    
+            return stats
     
     def _chunk_text(self, text: str, max_chunk_size: int = 1000, overlap: int = 100) -> List[str]:
         """Split text into overlapping chunks of maximum size"""
-        chunks = []
-        
-        # If text is shorter than max chunk size, return as is
-        if len(text) <= max_chunk_size:
-            return [text]
-        
-        # Split into sentences to avoid breaking sentences
-        import re
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        
-        current_chunk = ""
-        
-        for sentence in sentences:
-            # If adding this sentence would exceed max_chunk_size
-            if len(current_chunk) + len(sentence) > max_chunk_size and current_chunk:
-                # Add current chunk to chunks list
-                chunks.append(current_chunk)
-                
-                # Start new chunk with overlap
-                words = current_chunk.split()
-                overlap_words = min(len(words), int(overlap / 4))  # Approx 4 chars per word
-                overlap_text = " ".join(words[-overlap_words:]) if overlap_words > 0 else ""
-                current_chunk = overlap_text + " " + sentence
-            else:
-                # Add sentence to current chunk
-                if current_chunk:
-                    current_chunk += " " + sentence
-                else:
-                    current_chunk = sentence
-        
-        # Add the last chunk if it's not empty
-        if current_chunk:
-            chunks.append(current_chunk)
-        
-        return chunks
+        return list(iter_chunks(text, max_chunk_size=max_chunk_size, overlap=overlap))
     
     def add_reflection(self, category: str, content: str, importance: float = 0.5) -> Optional[str]:
         """
@@ -450,39 +1696,73 @@ class MemorySystem:
         Returns:
             ID of the added reflection or None if failed
         """
+        ids = self.add_reflections([{"category": category, "content": content, "importance": importance}])
+        return ids[0] if ids else None
+        
+    def add_reflections(self, reflections: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Add several reflections with one embedding call and one index save
+        
+        Args:
+            reflections: List of dictionaries with category, content and
+                optional importance keys
+            
+        Returns:
+            List of reflection IDs (None entries for failures and for
+            reflections skipped as duplicates)
+        """
+        if not reflections:
+            return []
+            
         if not self.model:
             self.log("[Memory Warning] Cannot add reflection: model not loaded")
-            return None
+            return [None] * len(reflections)
             
         try:
-            # Generate a unique ID
-            reflection_id = f"refl_{int(time.time())}_{category}"
-            
-            # Create metadata
-            metadata = {
-                "id": reflection_id,
-                "source": "reflection",
-                "category": category,
-                "importance": importance,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "text": content
-            }
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            docs = []
+            metadata = []
+            ids = []
+            for i, reflection in enumerate(reflections):
+                category = reflection.get("category", "conversation")
+                content = reflection["content"]
+                
+                # Generate a unique ID (suffixed when several share a second)
+                reflection_id = f"refl_{int(time.time())}_{category}"
+                if len(reflections) > 1:
+                    reflection_id += f"_{i}"
+                
+                docs.append(content)
+                metadata.append({
+                    "id": reflection_id,
+                    "source": "reflection",
+                    "category": category,
+                    "importance": reflection.get("importance", 0.5),
+                    "timestamp": timestamp,
+                    "text": content
+                })
+                ids.append(reflection_id)
             
-            # Add to index
-            success = self.add_to_index([content], [metadata])
+            # Add to index; embedding runs without the lock, so searches continue
+            stored = self._add_documents(docs, metadata)
             
-            if success:
-                self.log(f"[Memory] Added {category} reflection to memory: {content[:50]}...")
-                return reflection_id
+            if stored is not None:
+                stored = set(stored)
+                for position in sorted(stored):
+                    meta = metadata[position]
+                    self.log(f"[Memory] Added {meta['category']} reflection to memory: {meta['text'][:50]}...")
+                return [reflection_id if i in stored else None for i, reflection_id in enumerate(ids)]
             else:
-                return None
+                return [None] * len(reflections)
                 
         except Exception as e:
             self.log(f"[Memory Error] Failed to add reflection: {e}")
-            return None
+            return [None] * len(reflections)
         
     def get_context_for_query(self, query: str, max_tokens: int = 1500, 
-                             top_k: int = 5, min_score: float = 0.3) -> str:
+                             top_k: int = 5, min_score: float = 0.3,
+                             filters: Optional[Dict[str, Any]] = None,
+                             diversify: bool = True) -> str:
         """
         Get a formatted context string for a query from memory
         
@@ -491,18 +1771,21 @@ class MemorySystem:
             max_tokens: Maximum approximate tokens to include in context
             top_k: Maximum number of results to include
             min_score: Minimum similarity score to include
+            filters: Optional metadata filters (see search)
+            diversify: Prefer recent, important and distinct content over
+                overlapping chunks (see search)
         
         Returns:
             Formatted context string
         """
         # Search for relevant items
-        results = self.search(query, top_k=top_k)
+        results = self.search(query, top_k=top_k, filters=filters, diversify=diversify)
         
         if not results:
             return ""
             
-        # Filter by minimum score
-        results = [r for r in results if r.get("score", 0) >= min_score]
+        # Filter by minimum score (exact keyword matches are always relevant)
+        results = [r for r in results if r.get("score", 0) >= min_score or r.get("keyword_score", 0) > 0]
         
         if not results:
             return ""
@@ -551,22 +1834,18 @@ class MemorySystem:
         Returns:
             List of items matching the category
         """
-        if not self.documents:
-            return []
-            
-        try:
-            # Find all documents with matching category
-            matches = [doc for doc in self.documents if doc.get("category") == category]
-            
-            # Sort by timestamp (newest first)
-            matches.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            
-            # Limit to top_k
-            return matches[:top_k]
+        with self.lock:
+            if not self.documents:
+                return []
                 
-        except Exception as e:
-            self.log(f"[Memory Error] Failed to search by category: {e}")
-            return []
+            try:
+                # The category index is kept sorted by timestamp; walk it newest first
+                entries = self.category_index.get(category, [])
+                return [self.documents[row] for _, row in reversed(entries[-top_k:])] if top_k > 0 else []
+                    
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to search by category: {e}")
+                return []
     
     def export_memory(self, export_path: str) -> bool:
         """
@@ -578,28 +1857,30 @@ class MemorySystem:
         Returns:
             True if export successful, False otherwise
         """
-        try:
-            # Create data to export
-            export_data = {
-                "model_name": self.model_name,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "documents": self.documents,
-                "embeddings": [emb.cpu().tolist() for emb in self.index]
-            }
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(export_path), exist_ok=True)
-            
-            # Save to file
-            with open(export_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=2)
+        with self.lock:
+            try:
+                # Create data to export
+                export_data = {
+                    "model_name": self.model_name,
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "documents": list(self.iter_documents()),
+                    "embeddings": [emb.cpu().tolist() for row, emb in enumerate(self.index)
+                                   if row not in self.deleted]
+                }
                 
-            self.log(f"[Memory] Exported memory to {export_path}")
-            return True
-            
-        except Exception as e:
-            self.log(f"[Memory Error] Failed to export memory: {e}")
-            return False
+                # Create directory if it doesn't exist
+                os.makedirs(os.path.dirname(export_path), exist_ok=True)
+                
+                # Save to file
+                with open(export_path, "w", encoding="utf-8") as f:
+                    json.dump(export_data, f, indent=2)
+                    
+                self.log(f"[Memory] Exported memory to {export_path}")
+                return True
+                
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to export memory: {e}")
+                return False
             
     def import_memory(self, import_path: str, merge: bool = False) -> bool:
         """
@@ -612,37 +1893,55 @@ class MemorySystem:
         Returns:
             True if import successful, False otherwise
         """
-        if not os.path.exists(import_path):
-            self.log(f"[Memory Error] Import file not found: {import_path}")
-            return False
-            
-        try:
-            # Load from file
-            with open(import_path, "r", encoding="utf-8") as f:
-                import_data = json.load(f)
-                
-            # Validate data
-            if "documents" not in import_data or "embeddings" not in import_data:
-                self.log(f"[Memory Error] Invalid memory export file: {import_path}")
+        with self.lock:
+            if not os.path.exists(import_path):
+                self.log(f"[Memory Error] Import file not found: {import_path}")
                 return False
                 
-            # Clear existing memory if not merging
-            if not merge:
-                self.index = []
-                self.documents = []
+            try:
+                # Load from file
+                with open(import_path, "r", encoding="utf-8") as f:
+                    import_data = json.load(f)
+                    
+                # Validate data
+                if "documents" not in import_data or "embeddings" not in import_data:
+                    self.log(f"[Memory Error] Invalid memory export file: {import_path}")
+                    return False
+                    
+                # Clear existing memory if not merging
+                if not merge:
+                    self.index = self._new_index()
+                    self.documents = []
+                    self.deleted = set()
+                    self.duplicate_index.clear()
+                    self.rebuild_indexes()
+                    
+                embeddings = import_data["embeddings"]
+                documents = import_data["documents"][:len(embeddings)]
+                if self.deduplicate:
+                    # Only documents with text can be compared; the rest are all kept
+                    texts = [position for position, doc in enumerate(documents) if doc.get("text")]
+                    checked = self._skip_duplicates([documents[position]["text"] for position in texts],
+                                                    [documents[position] for position in texts])
+                    keep = sorted(set(range(len(documents))) - set(texts)
+                                  | {texts[position] for position in checked})
+                else:
+                    keep = list(range(len(documents)))
+                    self._record_ingest(len(keep), 0, 0)
+                    
+                # Import data
+                for position in keep:
+                    emb = torch.tensor(embeddings[position])
+                    self.index.append(emb)
+                    self.documents.append(documents[position])
+                    self._index_row(len(self.documents) - 1, documents[position])
+                    
+                self.log(f"[Memory] Imported {len(keep)} items from {import_path}")
                 
-            # Import data
-            for emb_data, doc in zip(import_data["embeddings"], import_data["documents"]):
-                emb = torch.tensor(emb_data)
-                self.index.append(emb)
-                self.documents.append(doc)
+                # Save to index
+                self.save_index()
+                return True
                 
-            self.log(f"[Memory] Imported {len(import_data['documents'])} items from {import_path}")
-            
-            # Save to index
-            self.save_index()
-            return True
-            
-        except Exception as e:
-            self.log(f"[Memory Error] Failed to import memory: {e}")
-            return False
\ No newline at end of file
+            except Exception as e:
+                self.log(f"[Memory Error] Failed to import memory: {e}")
+                return False
\ No newline at end of file
@@ -9,6 +9,12 @@ import re
 import time
 from typing import Dict, List, Optional, Callable, Tuple, Any
 import shutil   # Add this if not already imported
+from core.generation_scheduler import (
+    GenerationScheduler,
+    GenerationQueueFull,
+    PRIORITY_INTERACTIVE,
+    REQUEST_STATUS
+)
 
 # ------------------------------------------------------------------------------
 # At module top you should have something like:
@@ -54,7 +60,8 @@ RECOMMENDED_MODELS = {
 class ModelManager:
     """Manages Ollama models: installation, running, and status tracking"""
     
-    def __init__(self, model_path: str, logger: Callable, use_8bit: bool = False, config=None):
+    def __init__(self, model_path: str, logger: Callable, use_8bit: bool = False, config=None,
+                 event_bus=None):
         """
         Initialize the model manager
         
@@ -63,6 +70,7 @@ class ModelManager:
             logger: Logging function
             use_8bit: Whether to use 8-bit quantization
             config: Optional configuration manager
+            event_bus: Optional event bus for request queue metrics
         """        
         self.model_path = model_path
         self.log = logger
@@ -76,6 +84,14 @@ class ModelManager:
         # Default context size (can be overridden by config)
         self.context_size = config.get("model.context_size", 4096) if config else 4096
         
+        # Serialize access to the model: only one request may talk to it at a time
+        self.scheduler = GenerationScheduler(
+            max_queue_size=config.get("model.request_queue_size", 32) if config else 32,
+            max_concurrent=config.get("model.max_concurrent_requests", 1) if config else 1,
+            logger=logger,
+            event_bus=event_bus
+        )
+        
         # Initialize environment
         self._update_environment()
         # Populate available models dynamically
@@ -128,7 +144,83 @@ class ModelManager:
             callback: Function to call when model status changes
         """
         self.on_status_changed = callback
-            
+
+    def set_event_bus(self, event_bus) -> None:
+        """
+        Set the event bus used for request queue metrics
+
+        Args:
+            event_bus: EventBus instance
+        """
+        self.scheduler.set_event_bus(event_bus)
+
+    def submit_generation(self, func: Callable, priority: int = PRIORITY_INTERACTIVE,
+                          owner: str = "chat", deadline: Optional[float] = None,
+                          timeout: Optional[float] = None):
+        """
+        Queue a job that needs exclusive access to the model
+
+        Args:
+            func: Callable invoked with the GenerationRequest once scheduled
+            priority: Request priority (see core.generation_scheduler)
+            owner: Identifier used for fair scheduling between callers
+            deadline: Optional absolute time after which the job is dropped
+            timeout: Optional relative alternative to `deadline`, in seconds
+
+        Returns:
+            GenerationRequest handle (supports cancel() and wait())
+
+        Raises:
+            GenerationQueueFull: If the request queue is at capacity
+        """
+        return self.scheduler.submit(func, priority=priority, owner=owner,
+                                     deadline=deadline, timeout=timeout)
+
+    def run_generation(self, func: Callable, priority: int = PRIORITY_INTERACTIVE,
+                       owner: str = "chat", deadline: Optional[float] = None) -> Tuple[bool, Any]:
+        """
+        Queue a job for the model and block until it finishes
+
+        Args:
+            func: Callable invoked with the GenerationRequest once scheduled
+            priority: Request priority (see core.generation_scheduler)
+            owner: Identifier used for fair scheduling between callers
+            deadline: Optional absolute time after which the job is dropped
+
+        Returns:
+            Tuple of (finished, result or error message)
+        """
+        try:
+            request = self.submit_generation(func, priority=priority, owner=owner, deadline=deadline)
+        except GenerationQueueFull as e:
+            return False, str(e)
+
+        request.wait()
+        if request.status == REQUEST_STATUS["DONE"]:
+            return True, request.result
+        return False, request.error or f"Request {request.status}"
+
+    def cancel_request(self, request_id: str) -> bool:
+        """
+        Cancel a queued or running generation request
+
+        Args:
+            request_id: ID of the request to cancel
+
+        Returns:
+            True if the request was found and not finished yet
+        """
+        return self.scheduler.cancel(request_id)
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        Get generation queue statistics
+
+        Returns:
+            Dictionary of queue depth, counters and average timings
+        """
+        return self.scheduler.get_stats()
+
     def _update_model_status(self, model_name: str, status: str) -> None:
         """
         Update the status of a model
@@ -927,14 +1019,49 @@ class ModelManager:
             self.log(f"[Error Stopping Model] {e}")
             return False
             
-    def send_prompt(self, prompt: str, format_function: Callable, timeout: int = 60) -> Tuple[bool, str]:
+    def send_prompt(self, prompt: str, format_function: Callable, timeout: int = 60,
+                    priority: int = PRIORITY_INTERACTIVE, owner: str = "chat",
+                    deadline: Optional[float] = None) -> Tuple[bool, str]:
         """
         Send a prompt to the running model
         
+        The prompt is queued in the generation scheduler so concurrent callers
+        never interleave writes on the model's stdin.
+        
+        Args:
+            prompt: Prompt to send
+            format_function: Function to format the prompt for the model
+            timeout: Timeout in seconds for the response once the prompt is sent
+            priority: Request priority (see core.generation_scheduler)
+            owner: Identifier used for fair scheduling between callers
+            deadline: Optional absolute time after which the queued prompt is dropped
+            
+        Returns:
+            Tuple containing success flag and response text
+        """
+        finished, result = self.run_generation(
+            lambda request: self._send_prompt_now(prompt, format_function, timeout, request),
+            priority=priority,
+            owner=owner,
+            deadline=deadline
+        )
+        if not finished:
+            self.log(f"[Warning] Prompt was not processed: {result}")
+            return False, result
+        return result
+        
+    def _send_prompt_now(self, prompt: str, format_function: Callable, timeout: int = 60,
+                         request=None) -> Tuple[bool, str]:
+        """
+        Write a prompt to the model process and collect the response
+        
+        Must only be called from a generation scheduler worker.
+        
         Args:
             prompt: Prompt to send
             format_function: Function to format the prompt for the model
             timeout: Timeout in seconds
+            request: Optional GenerationRequest used for cancellation
             
         Returns:
             Tuple containing success flag and response text
@@ -978,6 +1105,11 @@ class ModelManager:
             
             # Read from stdout with a timeout
             while time.time() - start_time < timeout:
+                # Stop early if the caller gave up on this request
+                if request is not None and request.cancelled:
+                    self.log("[Prompt] Request cancelled while generating")
+                    break
+                
                 # Check if the process is still running
                 if self.model_process.poll() is not None:
                     exit_code = self.model_process.poll()
@@ -1009,6 +1141,9 @@ class ModelManager:
             # Update status when done generating
             self._update_model_status(model_name, MODEL_STATUS["RUNNING"])
             
+            if request is not None and request.cancelled:
+                return False, "Request cancelled"
+            
             # Return success and response
             return True, response.strip()
             
@@ -1271,23 +1406,71 @@ class ModelManager:
             return False
         
     def chat_stream(self, prompt: str, format_function: Callable, 
-                   callback: Callable[[str, str], None]) -> bool:
+                   callback: Callable[[str, str], None],
+                   priority: int = PRIORITY_INTERACTIVE, owner: str = "chat",
+                   deadline: Optional[float] = None) -> bool:
         """
         Send a prompt to the model and stream back the response
         
+        The prompt is queued in the generation scheduler; callback receives
+        ("queued", request_id) first, then "chunk", "complete" or "error" events.
+        
         Args:
             prompt: Prompt to send
             format_function: Function to format the prompt for the model
             callback: Function to call with chunks of the response
+            priority: Request priority (see core.generation_scheduler)
+            owner: Identifier used for fair scheduling between callers
+            deadline: Optional absolute time after which the queued prompt is dropped
             
         Returns:
-            True if chat completed successfully, False otherwise
+            True if the prompt was queued, False otherwise
         """
         if not self.model_process or self.model_process.poll() is not None:
             self.log("[Error] Model is not running")
             callback("error", "Model is not running")
             return False
         
+        def stream_job(request):
+            self._stream_response_now(prompt, format_function, callback, request)
+        
+        try:
+            request = self.submit_generation(stream_job, priority=priority, owner=owner, deadline=deadline)
+        except GenerationQueueFull as e:
+            self.log(f"[Chat Error] {e}")
+            callback("error", str(e))
+            return False
+        
+        callback("queued", request.request_id)
+        
+        # Report requests that never reached the model
+        def report_dropped():
+            request.wait()
+            if request.status in (REQUEST_STATUS["CANCELLED"], REQUEST_STATUS["EXPIRED"]) and request.started_at is None:
+                callback("error", request.error or f"Request {request.status}")
+        
+        threading.Thread(target=report_dropped, daemon=True).start()
+        return True
+        
+    def _stream_response_now(self, prompt: str, format_function: Callable,
+                             callback: Callable[[str, str], None], request=None) -> None:
+        """
+        Write a prompt to the model process and stream the response chunks
+        
+        Must only be called from a generation scheduler worker.
+        
+        Args:
+            prompt: Prompt to send
+            format_function: Function to format the prompt for the model
+            callback: Function to call with chunks of the response
+            request: Optional GenerationRequest used for cancellation
+        """
+        model_process = self.model_process
+        if not model_process or model_process.poll() is not None:
+            self.log("[Error] Model is not running")
+            callback("error", "Model is not running")
+            return
+        
         # Update status to generating
         model_name = self.current_model
         self._update_model_status(model_name, MODEL_STATUS["GENERATING"])
@@ -1300,57 +1483,48 @@ class ModelManager:
             input_text = formatted + "\n"
             
             # Write to stdin and flush immediately
-            self.model_process.stdin.write(input_text)
-            self.model_process.stdin.flush()
+            model_process.stdin.write(input_text)
+            model_process.stdin.flush()
             
-            # Create a thread for reading the response
-            def read_response():
-                response_buffer = ""
-                
-                try:
-                    while True:
-                        if self.model_process.poll() is not None:
-                            # Process ended unexpectedly
-                            callback("error", "Model process terminated unexpectedly")
-                            break
-                            
-                        line = self.model_process.stdout.readline()
-                        if not line:
-                            time.sleep(0.1)
-                            continue
-                            
-                        # Clean the line
-                        chunk = line.strip()
-                        if not chunk:
-                            continue
-                            
-                        # Check if response is complete
-                        if "> " in chunk or "▌" in chunk:
-                            # Send final complete flag
-                            callback("complete", response_buffer.strip())
-                            break
-                            
-                        # Add to buffer and send the chunk
-                        response_buffer += chunk + "\n"
-                        callback("chunk", chunk)
-                        
-                    # Update status when done
-                    self._update_model_status(model_name, MODEL_STATUS["RUNNING"])
-                    
-                except Exception as e:
-                    self.log(f"[Stream Error] {e}")
-                    callback("error", str(e))
-                    self._update_model_status(model_name, MODEL_STATUS["ERROR"])
+            response_buffer = ""
             
-            # Start the response thread
-            threading.Thread(target=read_response, daemon=True).start()
-            return True
+            while True:
+                if request is not None and request.cancelled:
+                    callback("error", "Request cancelled")
+                    break
+                    
+                if model_process.poll() is not None:
+                    # Process ended unexpectedly
+                    callback("error", "Model process terminated unexpectedly")
+                    break
+                    
+                line = model_process.stdout.readline()
+                if not line:
+                    time.sleep(0.1)
+                    continue
+                    
+                # Clean the line
+                chunk = line.strip()
+                if not chunk:
+                    continue
+                    
+                # Check if response is complete
+                if "> " in chunk or "▌" in chunk:
+                    # Send final complete flag
+                    callback("complete", response_buffer.strip())
+                    break
+                    
+                # Add to buffer and send the chunk
+                response_buffer += chunk + "\n"
+                callback("chunk", chunk)
+                
+            # Update status when done
+            self._update_model_status(model_name, MODEL_STATUS["RUNNING"])
             
         except Exception as e:
-            self.log(f"[Chat Error] {e}")
-            self._update_model_status(model_name, MODEL_STATUS["ERROR"])
+            self.log(f"[Stream Error] {e}")
             callback("error", str(e))
-            return False
+            self._update_model_status(model_name, MODEL_STATUS["ERROR"])
         
     def get_model_config(self, model_name):
         """
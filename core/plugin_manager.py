@@ -10,6 +10,7 @@ import threading
 import time
 from typing import Dict, List, Any, Optional, Callable, Type
 from utils.version import VERSION
+from core.plugin_metadata import PluginMetadataCache, read_static_metadata, source_fingerprint
 
 class PluginError(Exception):
     """Base exception for plugin-related errors"""
@@ -45,7 +46,8 @@ class PluginManager:
         plugin_dir: str = "plugins",
         config_dir: str = "data/plugins",
         logger: Optional[Callable] = None,
-        core_system: Any = None
+        core_system: Any = None,
+        lazy_loading: bool = True
     ):
         """
         Initialize the plugin manager
@@ -55,6 +57,8 @@ class PluginManager:
             config_dir: Directory for plugin configurations
             logger: Optional logging function
             core_system: Reference to the main application system
+            lazy_loading: Defer importing a loaded plugin until it is first
+                used (activated, configured or called)
         """
         self.plugin_dir = plugin_dir
         self.config_dir = config_dir
@@ -67,13 +71,24 @@ class PluginManager:
         self.plugin_metadata: Dict[str, Dict[str, Any]] = {}
         self.error_handler = None
         
-        # Thread safety
-        self._lock = threading.Lock()
+        # Lazy loading: loaded plugins not imported yet (name -> config path),
+        # and plugin classes already imported
+        self.lazy_loading = lazy_loading
+        self.deferred_plugins: Dict[str, str] = {}
+        self._plugin_classes: Dict[str, Type] = {}
+        
+        # Thread safety; re-entrant because a deferred plugin is instantiated
+        # with the lock held and may look up other plugins while it starts
+        self._lock = threading.RLock()
         
         # Ensure directories exist
         os.makedirs(self.plugin_dir, exist_ok=True)
         os.makedirs(self.config_dir, exist_ok=True)
         
+        # Metadata of plugins, so it can be shown without importing them
+        self.metadata_cache = PluginMetadataCache(os.path.join(self.config_dir, "metadata_cache.json"),
+                                                  logger=self.log)
+        
         # Add plugin directory to path if not already there
         if os.path.abspath(self.plugin_dir) not in sys.path:
             sys.path.append(os.path.abspath(self.plugin_dir))
@@ -98,6 +113,11 @@ class PluginManager:
                 if os.path.isdir(item_path) and os.path.exists(init_path):
                     discovered.append(item)
                     self.plugin_statuses[item] = self.PLUGIN_STATUS["NOT_LOADED"]
+                    
+                    # Metadata from the cache or the source, never by importing
+                    metadata = self._read_metadata(item, allow_import=False)
+                    if metadata is not None:
+                        self.plugin_metadata[item] = metadata
                     self.log(f"[Plugin Discovery] Found plugin: {item}")
         except Exception as e:
             self.log(f"[Plugin Error] Discovery failed: {e}")
@@ -123,7 +143,7 @@ class PluginManager:
         Returns:
             bool: True if plugin was unloaded successfully, False otherwise
         """
-        if plugin_name not in self.plugins:
+        if plugin_name not in self.plugins and plugin_name not in self.deferred_plugins:
             self.log(f"[Plugin] Cannot unload '{plugin_name}': plugin not found")
             return False
             
@@ -134,6 +154,8 @@ class PluginManager:
         # Remove from plugins dict
         if plugin_name in self.plugins:
             del self.plugins[plugin_name]
+        self.deferred_plugins.pop(plugin_name, None)
+        self._plugin_classes.pop(plugin_name, None)
             
         # Update status
         self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["NOT_LOADED"]
@@ -148,7 +170,7 @@ class PluginManager:
         Returns:
             int: Number of plugins unloaded
         """
-        plugin_names = list(self.plugins.keys())
+        plugin_names = list(self.plugins.keys()) + list(self.deferred_plugins.keys())
         count = 0
         
         for plugin_name in plugin_names:
@@ -180,7 +202,7 @@ class PluginManager:
         self.log(f"[Plugin] Auto-loading {len(autoload_plugins)} plugins: {', '.join(autoload_plugins)}")
         
         # First discover plugins if not already done
-        if not self.plugins:
+        if not self.plugins and not self.deferred_plugins:
             self.discover_plugins()
             
         # Load and activate each plugin
@@ -269,29 +291,10 @@ class PluginManager:
             self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["LOADING"]
             
             try:
-                # Import the plugin module
-                spec = importlib.util.spec_from_file_location(
-                    f"plugins.{plugin_name}", 
-                    init_path
-                )
-                if spec is None or spec.loader is None:
-                    raise ImportError(f"Could not load spec for {plugin_name}")
-                    
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                # Check for required plugin class
-                if not hasattr(module, "IrintaiPlugin"):
-                    raise PluginLoadError(f"Missing IrintaiPlugin class in {plugin_name}")
-                
-                # Get plugin class
-                plugin_class = getattr(module, "IrintaiPlugin")
-                
-                # Extract and validate metadata
-                if not hasattr(plugin_class, "METADATA"):
+                # Metadata from the cache or the source; imports only if neither has it
+                metadata = self._read_metadata(plugin_name, allow_import=True)
+                if metadata is None:
                     raise PluginLoadError(f"Missing METADATA in {plugin_name}")
-                    
-                metadata = getattr(plugin_class, "METADATA")
                 self.plugin_metadata[plugin_name] = metadata
                 
                 # Create config path for this plugin
@@ -299,16 +302,14 @@ class PluginManager:
                 os.makedirs(plugin_config_dir, exist_ok=True)
                 config_path = os.path.join(plugin_config_dir, "config.json")
                 
-                # Initialize plugin instance
-                plugin_instance = plugin_class(
-                    plugin_id=plugin_name,  # Pass plugin name as the plugin_id
-                    core_system=self.core_system,
-                    config_path=config_path,
-                    logger=self.log
-                )
-                
-                # Store the plugin instance
-                self.plugins[plugin_name] = plugin_instance
+                if self.lazy_loading:
+                    # Imported and instantiated on first use
+                    self.deferred_plugins[plugin_name] = config_path
+                    self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["LOADED"]
+                    self.log(f"[Plugin] Loaded: {plugin_name} (deferred until activation)")
+                    return True
+                    
+                self._instantiate_plugin(plugin_name, config_path)
                 
                 # Update status
                 self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["LOADED"]
@@ -320,6 +321,140 @@ class PluginManager:
                 self.log(f"[Plugin Error] Failed to load {plugin_name}: {e}")
                 self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["ERROR"]
                 return False
+                
+    def _import_plugin_class(self, plugin_name: str) -> Type:
+        """
+        Import a plugin's module and get its IrintaiPlugin class
+        
+        Args:
+            plugin_name: Name of the plugin
+            
+        Returns:
+            The plugin class
+            
+        Raises:
+            PluginLoadError: If the module has no valid plugin class
+            ImportError: If the module cannot be imported
+        """
+        if plugin_name in self._plugin_classes:
+            return self._plugin_classes[plugin_name]
+            
+        init_path = os.path.join(self.plugin_dir, plugin_name, "__init__.py")
+        
+        # Import the plugin module
+        spec = importlib.util.spec_from_file_location(
+            f"plugins.{plugin_name}", 
+            init_path
+        )
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Could not load spec for {plugin_name}")
+            
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        
+        # Check for required plugin class
+        if not hasattr(module, "IrintaiPlugin"):
+            raise PluginLoadError(f"Missing IrintaiPlugin class in {plugin_name}")
+        
+        # Get plugin class
+        plugin_class = getattr(module, "IrintaiPlugin")
+        
+        # Extract and validate metadata
+        if not hasattr(plugin_class, "METADATA"):
+            raise PluginLoadError(f"Missing METADATA in {plugin_name}")
+            
+        self._plugin_classes[plugin_name] = plugin_class
+        return plugin_class
+        
+    def _read_metadata(self, plugin_name: str, allow_import: bool) -> Optional[Dict[str, Any]]:
+        """
+        Get a plugin's metadata as cheaply as possible
+        
+        The metadata cache is tried first, then a literal METADATA in the
+        plugin's __init__.py; only when neither has it (and allow_import is
+        set) is the plugin imported. Whatever is found is cached.
+        
+        Args:
+            plugin_name: Name of the plugin
+            allow_import: Whether the plugin may be imported as a last resort
+            
+        Returns:
+            Metadata dictionary, or None if it could not be read
+        """
+        plugin_path = os.path.join(self.plugin_dir, plugin_name)
+        files = source_fingerprint(plugin_path)
+        
+        metadata = self.metadata_cache.get(plugin_name, plugin_path, files)
+        if metadata is not None:
+            return metadata
+            
+        metadata = read_static_metadata(os.path.join(plugin_path, "__init__.py"))
+        if metadata is not None:
+            self.metadata_cache.put(plugin_name, plugin_path, metadata, "static", files)
+            return metadata
+            
+        if not allow_import:
+            return None
+            
+        metadata = getattr(self._import_plugin_class(plugin_name), "METADATA")
+        self.metadata_cache.put(plugin_name, plugin_path, metadata, "import", files)
+        return metadata
+        
+    def _instantiate_plugin(self, plugin_name: str, config_path: str) -> Any:
+        """
+        Import a plugin if needed and create its instance (lock held)
+        
+        Args:
+            plugin_name: Name of the plugin
+            config_path: Path of the plugin's configuration file
+            
+        Returns:
+            The plugin instance
+        """
+        plugin_class = self._import_plugin_class(plugin_name)
+        
+        # The class is authoritative; refresh what was read without importing
+        metadata = getattr(plugin_class, "METADATA")
+        self.plugin_metadata[plugin_name] = metadata
+        self.metadata_cache.put(plugin_name, os.path.join(self.plugin_dir, plugin_name), metadata, "import")
+        
+        # Initialize plugin instance
+        plugin_instance = plugin_class(
+            plugin_id=plugin_name,  # Pass plugin name as the plugin_id
+            core_system=self.core_system,
+            config_path=config_path,
+            logger=self.log
+        )
+        
+        # Store the plugin instance
+        self.plugins[plugin_name] = plugin_instance
+        self.deferred_plugins.pop(plugin_name, None)
+        return plugin_instance
+        
+    def _get_instance(self, plugin_name: str) -> Any:
+        """
+        Get a loaded plugin's instance, importing a deferred plugin (lock held)
+        
+        Args:
+            plugin_name: Name of the plugin
+            
+        Returns:
+            The plugin instance, or None if the plugin is not loaded or fails to import
+        """
+        if plugin_name in self.plugins:
+            return self.plugins[plugin_name]
+        if plugin_name not in self.deferred_plugins:
+            return None
+            
+        try:
+            plugin = self._instantiate_plugin(plugin_name, self.deferred_plugins[plugin_name])
+            self.log(f"[Plugin] Imported: {plugin_name}")
+            return plugin
+        except Exception as e:
+            self.log(f"[Plugin Error] Failed to load {plugin_name}: {e}")
+            self.deferred_plugins.pop(plugin_name, None)
+            self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["ERROR"]
+            return None
     
     def load_all_plugins(self) -> Dict[str, bool]:
         """
@@ -348,12 +483,14 @@ class PluginManager:
         """
         with self._lock:
             # Check if plugin is loaded
-            if plugin_name not in self.plugins:
+            if plugin_name not in self.plugins and plugin_name not in self.deferred_plugins:
                 self.log(f"[Plugin Error] Cannot activate unloaded plugin: {plugin_name}")
                 return False
                 
-            # Get the plugin instance
-            plugin = self.plugins[plugin_name]
+            # Get the plugin instance, importing the plugin if it was deferred
+            plugin = self._get_instance(plugin_name)
+            if plugin is None:
+                return False
             
             try:
                 # Call plugin's activate method
@@ -448,13 +585,17 @@ class PluginManager:
         """
         Get the instance of a loaded plugin
         
+        With lazy loading, a plugin that has not been used yet is imported
+        and instantiated here (it is not activated).
+        
         Args:
             plugin_id: Name/ID of the plugin
             
         Returns:
-            The plugin instance or None if not found or not loaded
+            The plugin instance or None if not found, not loaded or it fails to import
         """
-        return self.plugins.get(plugin_id)
+        with self._lock:
+            return self._get_instance(plugin_id)
     
     def get_all_plugins(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -492,12 +633,14 @@ class PluginManager:
         """
         with self._lock:
             # Check if plugin is loaded
-            if plugin_name not in self.plugins:
+            if plugin_name not in self.plugins and plugin_name not in self.deferred_plugins:
                 self.log(f"[Plugin Error] Cannot configure unloaded plugin: {plugin_name}")
                 return False
                 
             # Get the plugin instance
-            plugin = self.plugins[plugin_name]
+            plugin = self._get_instance(plugin_name)
+            if plugin is None:
+                return False
             
             try:
                 # Call plugin's update_configuration method
@@ -537,9 +680,11 @@ class PluginManager:
                 if not self.deactivate_plugin(plugin_name):
                     return False
                     
-            # Remove from loaded plugins
+            # Remove from loaded plugins, so the module is imported afresh
             if plugin_name in self.plugins:
                 del self.plugins[plugin_name]
+            self.deferred_plugins.pop(plugin_name, None)
+            self._plugin_classes.pop(plugin_name, None)
                 
             # Mark as not loaded
             self.plugin_statuses[plugin_name] = self.PLUGIN_STATUS["NOT_LOADED"]
@@ -571,12 +716,10 @@ class PluginManager:
             PluginError: If the plugin or method doesn't exist
         """
         with self._lock:
-            # Check if plugin is loaded
-            if plugin_name not in self.plugins:
+            # Get the plugin instance, importing the plugin if it was deferred
+            plugin = self._get_instance(plugin_name)
+            if plugin is None:
                 raise PluginError(f"Plugin not loaded: {plugin_name}")
-                
-            # Get the plugin instance
-            plugin = self.plugins[plugin_name]
             
             # Check if method exists
             if not hasattr(plugin, method_name) or not callable(getattr(plugin, method_name)):
@@ -898,6 +1041,9 @@ class PluginManager:
                         
                     # Remove from loaded plugins
                     del self.plugins[plugin_name]
+                self.deferred_plugins.pop(plugin_name, None)
+                self._plugin_classes.pop(plugin_name, None)
+                self.metadata_cache.remove(plugin_name)
                 
                 # Remove configuration directory
                 plugin_config_dir = os.path.join(self.config_dir, plugin_name)
@@ -993,13 +1139,13 @@ class PluginManager:
         Returns:
             True if configuration updated successfully, False otherwise
         """
-        if plugin_id not in self.plugins:
+        if plugin_id not in self.plugins and plugin_id not in self.deferred_plugins:
             self.log(f"[Plugin Manager] Cannot set config for unknown plugin: {plugin_id}")
             return False
             
         try:
-            # Get the plugin instance
-            plugin_instance = self.plugins[plugin_id].get("instance")
+            # Get the plugin instance, importing the plugin if it was deferred
+            plugin_instance = self.get_plugin_instance(plugin_id)
             if not plugin_instance:
                 self.log(f"[Plugin Manager] Plugin not loaded: {plugin_id}")
                 return False
@@ -0,0 +1,226 @@
+"""
+Plugin metadata - Read plugin metadata without importing plugins
+"""
+import os
+import ast
+import json
+import hashlib
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+from file_operations.file_walker import walk_entries
+from file_operations.json_store import get_json_store
+
+# Bumped whenever the cache layout changes
+METADATA_CACHE_VERSION = 1
+
+# Source files whose changes can change a plugin's metadata
+_SOURCE_EXTENSIONS = (".py",)
+_IGNORED = ["__pycache__", "tests", ".*"]
+
+
+def read_static_metadata(init_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read IrintaiPlugin.METADATA from a plugin's __init__.py without running it
+
+    Works when METADATA is a literal dictionary in the class body, or a
+    module-level name bound to one.
+
+    Args:
+        init_path: Path to the plugin's __init__.py
+
+    Returns:
+        Metadata dictionary, or None if it is not a literal
+    """
+    try:
+        with open(init_path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=init_path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    def assigned(body: List[ast.stmt], name: str) -> Optional[ast.expr]:
+        value = None
+        for node in body:
+            if isinstance(node, ast.Assign) and any(
+                    isinstance(target, ast.Name) and target.id == name for target in node.targets):
+                value = node.value
+            elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) \
+                    and node.target.id == name and node.value is not None:
+                value = node.value
+        return value
+
+    plugin_class = None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "IrintaiPlugin":
+            plugin_class = node
+    if plugin_class is None:
+        return None
+
+    value = assigned(plugin_class.body, "METADATA")
+    if isinstance(value, ast.Name):
+        value = assigned(tree.body, value.id)
+    if value is None:
+        return None
+    try:
+        metadata = ast.literal_eval(value)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return metadata if isinstance(metadata, dict) else None
+
+
+def source_fingerprint(plugin_path: str) -> List[Tuple[str, int, int]]:
+    """
+    List a plugin's source files with their size and modification time
+
+    Args:
+        plugin_path: Plugin directory
+
+    Returns:
+        Sorted (relative path, size, mtime_ns) entries
+    """
+    files = []
+    for entry in walk_entries(plugin_path, _SOURCE_EXTENSIONS, ignore=_IGNORED):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        files.append((os.path.relpath(entry.path, plugin_path), stat.st_size, stat.st_mtime_ns))
+    files.sort()
+    return files
+
+
+def source_hash(plugin_path: str, files: List[Tuple[str, int, int]]) -> str:
+    """
+    Hash the content of a plugin's source files
+
+    Args:
+        plugin_path: Plugin directory
+        files: Entries from source_fingerprint
+
+    Returns:
+        Hex SHA-1 digest
+    """
+    digest = hashlib.sha1()
+    for relative_path, _, _ in files:
+        digest.update(relative_path.encode("utf-8") + b"\0")
+        try:
+            with open(os.path.join(plugin_path, relative_path), "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class PluginMetadataCache:
+    """
+    Caches plugin metadata on disk, keyed by the plugin's source files
+
+    An entry is valid while the sizes and modification times of the
+    plugin's source files are unchanged. When they differ, the content hash
+    decides, so a touched but unmodified plugin keeps its entry.
+    """
+
+    def __init__(self, path: str, logger=None):
+        """
+        Initialize the cache, loading it from disk if it exists
+
+        Args:
+            path: Cache file path
+            logger: Optional logging function
+        """
+        self.path = path
+        self.log = logger or print
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache file, ignoring it if unreadable or outdated"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == METADATA_CACHE_VERSION:
+                self.entries = data.get("plugins", {})
+        except Exception as e:
+            self.log(f"[Plugin Warning] Ignoring unreadable plugin metadata cache: {e}")
+
+    def _save(self) -> None:
+        """Queue a write of the cache (lock held)"""
+        data = {"version": METADATA_CACHE_VERSION, "plugins": dict(self.entries)}
+        get_json_store().save(self.path, data, compact=True)
+
+    def get(self, plugin_name: str, plugin_path: str,
+            files: Optional[List[Tuple[str, int, int]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached metadata of a plugin
+
+        Args:
+            plugin_name: Plugin name
+            plugin_path: Plugin directory
+            files: Entries from source_fingerprint, if already listed
+
+        Returns:
+            Metadata dictionary, or None if missing or stale
+        """
+        with self.lock:
+            entry = self.entries.get(plugin_name)
+        if entry is None:
+            return None
+        if files is None:
+            files = source_fingerprint(plugin_path)
+        fingerprint = [list(item) for item in files]
+        if entry["files"] == fingerprint:
+            return entry["metadata"]
+        if entry["hash"] != source_hash(plugin_path, files):
+            return None
+        # Touched but not modified
+        with self.lock:
+            entry["files"] = fingerprint
+            self._save()
+        return entry["metadata"]
+
+    def put(self, plugin_name: str, plugin_path: str, metadata: Dict[str, Any], source: str,
+            files: Optional[List[Tuple[str, int, int]]] = None) -> None:
+        """
+        Cache the metadata of a plugin
+
+        Args:
+            plugin_name: Plugin name
+            plugin_path: Plugin directory
+            metadata: Metadata dictionary
+            source: How the metadata was read ("static" or "import")
+            files: Entries from source_fingerprint, if already listed
+        """
+        try:
+            # Cached copies must survive a JSON round trip
+            metadata = json.loads(json.dumps(metadata))
+        except (TypeError, ValueError):
+            return
+        if files is None:
+            files = source_fingerprint(plugin_path)
+        entry = {
+            "files": [list(item) for item in files],
+            "hash": source_hash(plugin_path, files),
+            "metadata": metadata,
+            "source": source,
+        }
+        with self.lock:
+            if self.entries.get(plugin_name) == entry:
+                return
+            self.entries[plugin_name] = entry
+            self._save()
+
+    def remove(self, plugin_name: str) -> None:
+        """
+        Drop the cached metadata of a plugin
+
+        Args:
+            plugin_name: Plugin name
+        """
+        with self.lock:
+            if self.entries.pop(plugin_name, None) is not None:
+                self._save()
@@ -8,6 +8,8 @@ import json
 import importlib
 import inspect
 
+from file_operations.json_store import get_json_store
+
 
 class PluginSDK:
     """SDK for IrintAI Assistant plugin development"""
@@ -129,25 +131,30 @@ class PluginSDK:
         
         return plugin_dir
         
-    def save_data(self, data: Dict[str, Any], filename: str = 'plugin_data.json') -> bool:
+    def save_data(self, data: Dict[str, Any], filename: str = 'plugin_data.json', compact: bool = False,
+                  wait: bool = True) -> bool:
         """
         Save plugin data to a JSON file
         
+        The file is replaced atomically. With wait=False it is written by a
+        background writer, and saves of the same file in quick succession
+        are written once, with the latest data.
+        
         Args:
             data: Dictionary of data to save
             filename: Filename to save to
+            compact: Write without indentation, for data only the plugin reads
+            wait: Write before returning (False to write behind)
             
         Returns:
-            True if save was successful, False otherwise
+            True if save was successful (or queued), False otherwise
         """
         try:
             plugin_dir = self.get_plugin_data_dir()
             filepath = os.path.join(plugin_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-            return True
+            return get_json_store().save(filepath, data, indent=2, compact=compact,
+                                         ensure_ascii=False, wait=wait)
         except Exception as e:
             self.log(f"Failed to save plugin data: {e}", "ERROR")
             return False
@@ -167,6 +174,11 @@ class PluginSDK:
             plugin_dir = self.get_plugin_data_dir()
             filepath = os.path.join(plugin_dir, filename)
             
+            # Make sure a save still waiting to be written is read back
+            store = get_json_store()
+            if store.has_pending(filepath):
+                store.flush(filepath)
+                
             if not os.path.exists(filepath):
                 return default or {}
                 
@@ -0,0 +1,339 @@
+"""
+Reflection Store - Append-only JSONL log of session reflections
+"""
+import os
+import json
+import queue
+import struct
+import threading
+import time
+from typing import List, Dict, Any, Optional, Callable
+
+# Each entry in the offset index is one little-endian unsigned 64-bit offset
+_OFFSET = struct.Struct("<Q")
+
+
+class ReflectionStore:
+    """
+    Stores reflections as one JSON object per line
+
+    Appending never rewrites earlier entries. A sidecar ".idx" file holds the
+    byte offset of every line, so entry N (or a range of entries) is read with
+    a single seek instead of parsing the whole log.
+    """
+
+    def __init__(self,
+                 path: str = "data/reflections/session_reflections.jsonl",
+                 logger: Optional[Callable] = None):
+        """
+        Initialize the reflection store
+
+        Args:
+            path: Path to the JSONL log
+            logger: Optional logging function
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self.log = logger or print
+        self.lock = threading.RLock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._migrate_legacy()
+        self._offsets = self._load_offsets()
+
+    def _migrate_legacy(self) -> None:
+        """Import the old session_reflections.json array once, if present"""
+        legacy_path = os.path.splitext(self.path)[0] + ".json"
+        if os.path.exists(self.path) or not os.path.exists(legacy_path):
+            return
+
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            if not content:
+                return
+            if not content.startswith("["):
+                # Older versions wrote comma-separated objects without brackets
+                content = f"[{content.rstrip(',')}]"
+            reflections = json.loads(content)
+        except Exception as e:
+            self.log(f"[Reflection Warning] Could not migrate {legacy_path}: {e}")
+            return
+
+        # Appends to the old format could nest earlier arrays ([[r1], r2])
+        def flatten(items):
+            for item in items:
+                if isinstance(item, list):
+                    yield from flatten(item)
+                else:
+                    yield item
+
+        reflections = list(flatten(reflections if isinstance(reflections, list) else [reflections]))
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            for reflection in reflections:
+                f.write(json.dumps(reflection, ensure_ascii=False) + "\n")
+        self.log(f"[Reflection] Migrated {len(reflections)} reflections from {legacy_path}")
+
+    def _load_offsets(self) -> List[int]:
+        """
+        Load the offset index, rebuilding it if it is missing or stale
+
+        Returns:
+            List of line start offsets
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        log_size = os.path.getsize(self.path)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % _OFFSET.size
+            offsets = [entry[0] for entry in _OFFSET.iter_unpack(data[:usable])]
+
+            # The index is valid when its last entry is the last complete line
+            if not offsets and log_size == 0:
+                return offsets
+            if offsets and offsets[-1] < log_size:
+                with open(self.path, "rb") as f:
+                    f.seek(offsets[-1])
+                    line = f.readline()
+                    if line.endswith(b"\n") and f.tell() == log_size:
+                        return offsets
+
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> List[int]:
+        """
+        Scan the log and rewrite the offset index
+
+        A torn last line (from a crash mid-append) is truncated away.
+
+        Returns:
+            List of line start offsets
+        """
+        offsets = []
+        position = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    offsets.append(position)
+                position += len(line)
+
+        if position < os.path.getsize(self.path):
+            self.log(f"[Reflection Warning] Truncating incomplete entry in {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(position)
+
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+
+        self.log(f"[Reflection] Rebuilt offset index for {len(offsets)} reflections")
+        return offsets
+
+    def append(self, reflection: Dict[str, Any]) -> int:
+        """
+        Append a reflection to the log
+
+        Args:
+            reflection: JSON-serializable reflection dictionary
+
+        Returns:
+            Position of the new entry
+        """
+        line = (json.dumps(reflection, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            with open(self.index_path, "ab") as f:
+                f.write(_OFFSET.pack(offset))
+            self._offsets.append(offset)
+            return len(self._offsets) - 1
+
+    def count(self) -> int:
+        """
+        Get the number of stored reflections
+
+        Returns:
+            Number of entries
+        """
+        return len(self._offsets)
+
+    def get(self, position: int) -> Optional[Dict[str, Any]]:
+        """
+        Read one reflection
+
+        Args:
+            position: Entry position (negative values count from the end)
+
+        Returns:
+            Reflection dictionary or None if out of range
+        """
+        entries = self.read_range(position, position + 1 if position != -1 else None)
+        return entries[0] if entries else None
+
+    def read_range(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read a contiguous range of reflections with slice semantics
+
+        Args:
+            start: First entry position
+            stop: Position after the last entry (None for the end)
+
+        Returns:
+            List of reflection dictionaries
+        """
+        with self.lock:
+            start, stop, _ = slice(start, stop).indices(len(self._offsets))
+            if start >= stop:
+                return []
+            begin = self._offsets[start]
+            end = self._offsets[stop] if stop < len(self._offsets) else None
+
+            with open(self.path, "rb") as f:
+                f.seek(begin)
+                data = f.read() if end is None else f.read(end - begin)
+
+        reflections = []
+        for line in data.splitlines():
+            if line.strip():
+                try:
+                    reflections.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    self.log(f"[Reflection Warning] Skipping corrupt entry: {e}")
+        return reflections
+
+    def tail(self, count: int = 10) -> List[Dict[str, Any]]:
+        """
+        Read the most recent reflections
+
+        Args:
+            count: Number of entries
+
+        Returns:
+            List of reflection dictionaries, oldest first
+        """
+        return self.read_range(-count) if count > 0 else []
+
+
+class ReflectionEmbedder:
+    """
+    Embeds reflections into a MemorySystem in the background
+
+    Submitted reflections are collected for up to flush_interval seconds (or
+    until batch_size are waiting) and then embedded with a single
+    MemorySystem.add_reflections call, so the index is encoded and saved once
+    per batch instead of once per reflection.
+    """
+
+    def __init__(self,
+                 memory_system,
+                 batch_size: int = 8,
+                 flush_interval: float = 2.0,
+                 logger: Optional[Callable] = None):
+        """
+        Initialize the reflection embedder
+
+        Args:
+            memory_system: MemorySystem instance
+            batch_size: Maximum reflections per embedding call
+            flush_interval: Seconds to wait for a batch to fill
+            logger: Optional logging function
+        """
+        self.memory_system = memory_system
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.log = logger or print
+
+        self.queue = queue.Queue()
+        self.running = False
+        self.thread = None
+        self.stats = {"submitted": 0, "embedded": 0, "batches": 0, "failed": 0}
+
+    def start(self) -> None:
+        """Start the background worker"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._worker_loop, name="ReflectionEmbedder", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Flush pending reflections and stop the worker
+
+        Args:
+            timeout: Maximum seconds to wait for the final batch
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.queue.put(None)
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def submit(self, category: str, content: str, importance: float = 0.5) -> None:
+        """
+        Queue a reflection for embedding
+
+        Args:
+            category: Reflection category
+            content: Reflection text
+            importance: Importance score (0.0-1.0)
+        """
+        if not content:
+            return
+        if not self.running:
+            self.start()
+        self.stats["submitted"] += 1
+        self.queue.put({"category": category, "content": content, "importance": importance})
+
+    def _worker_loop(self) -> None:
+        """Collect and embed batches until stopped"""
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._embed_batch(batch)
+
+    def _embed_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Embed one batch of reflections
+
+        Args:
+            batch: List of reflection dictionaries
+        """
+        try:
+            ids = self.memory_system.add_reflections(batch)
+            embedded = len([i for i in ids if i])
+            self.stats["batches"] += 1
+            self.stats["embedded"] += embedded
+            self.stats["failed"] += len(batch) - embedded
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            self.log(f"[Reflection Error] Failed to embed reflections: {e}")
@@ -4,14 +4,24 @@ settings migration, and settings synchronization
 """
 import os
 import json
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, List, Any, Callable, Optional, Tuple, Set
 import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 class SettingsManager:
     """
     Centralized settings manager with observer pattern to ensure settings consistency
     throughout the application. This helps prevent duplicate or conflicting settings
     controls across different UI panels.
+    
+    Observers are notified on a dedicated background thread, after the
+    setting is stored and without holding the manager's lock. Notifications
+    that have not been delivered yet are coalesced per key, so a burst of
+    changes to one setting reaches its observers once, with the latest
+    value. Observers registered with a Tk widget are called on the Tk thread,
+    and inline observers on the updating thread before the update returns
+    (also without the lock).
     """
     
     def __init__(self, config_manager, logger: Optional[Callable] = None):
@@ -27,13 +37,40 @@ class SettingsManager:
         self.observers = {}
         self.lock = threading.RLock()  # Use RLock for thread safety
         
-    def register_observer(self, setting_key: str, observer: Callable):
+        # (setting key, observer) -> Tk widget whose thread the observer runs on
+        self.ui_observers: Dict[Tuple[str, Callable], Any] = {}
+        
+        # (setting key, observer) pairs called on the updating thread
+        self.inline_observers: Set[Tuple[str, Callable]] = set()
+        
+        # Setting key -> (observer, widget, is pattern observer, is inline) to
+        # notify, built on first use and dropped whenever observers change
+        self._observer_index: Dict[str, Tuple[Tuple[Callable, Any, bool, bool], ...]] = {}
+        
+        # Changes waiting to be delivered, latest value per key, ordered by
+        # each key's most recent change
+        self._pending: Dict[str, Any] = {}
+        self._pending_lock = threading.Lock()
+        self._dispatch_scheduled = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SettingsObservers")
+        
+    def register_observer(self, setting_key: str, observer: Callable, widget: Any = None,
+                          inline: bool = False):
         """
         Register an observer for a specific setting
         
         Args:
-            setting_key: The setting key to observe
+            setting_key: The setting key to observe, or a pattern such as
+                "memory.*" to observe every setting directly under "memory"
             observer: Callback function to be called when setting changes
+            widget: Optional Tk widget; the observer is then called on the Tk
+                thread (through widget.after) instead of the observer thread
+            inline: Call the observer on the updating thread, before
+                update_setting returns, for quick updates of state that must
+                follow the setting at once; slow observers belong on the
+                observer thread
         """
         with self.lock:
             if setting_key not in self.observers:
@@ -42,6 +79,12 @@ class SettingsManager:
             if observer not in self.observers[setting_key]:
                 self.observers[setting_key].append(observer)
                 
+            if widget is not None:
+                self.ui_observers[(setting_key, observer)] = widget
+            if inline:
+                self.inline_observers.add((setting_key, observer))
+            self._observer_index = {}
+                
     def unregister_observer(self, setting_key: str, observer: Callable):
         """
         Unregister an observer for a specific setting
@@ -53,6 +96,9 @@ class SettingsManager:
         with self.lock:
             if setting_key in self.observers and observer in self.observers[setting_key]:
                 self.observers[setting_key].remove(observer)
+                self.ui_observers.pop((setting_key, observer), None)
+                self.inline_observers.discard((setting_key, observer))
+                self._observer_index = {}
                 
     def update_setting(self, setting_key: str, value: Any):
         """
@@ -66,24 +112,140 @@ class SettingsManager:
             # Update the setting in the config manager
             self.config_manager.set(setting_key, value)
             
-            # Notify all observers for this setting
-            if setting_key in self.observers:
-                for observer in self.observers[setting_key]:
-                    try:
-                        observer(value)
-                    except Exception as e:
-                        self.log(f"[Settings] Error notifying observer for {setting_key}: {e}")
-                        
-            # Special case for patterns where settings have both specific and general observers
-            parts = setting_key.split('.')
-            if len(parts) > 1:
-                pattern = '.'.join(parts[:-1]) + '.*'
-                if pattern in self.observers:
-                    for observer in self.observers[pattern]:
+            calls = self._notify_observers({setting_key: value})
+            
+        # Observers run without the lock, so a slow one cannot hold up other updates
+        for call in calls:
+            call()
+            
+    def _observers_for(self, setting_key: str) -> Tuple[Tuple[Callable, Any, bool, bool], ...]:
+        """
+        Look up the observers of a setting in the observer index
+        
+        Args:
+            setting_key: The setting key
+            
+        Returns:
+            Tuple of (observer, widget, is pattern observer, is inline) entries
+        """
+        index = self._observer_index
+        entries = index.get(setting_key)
+        if entries is None:
+            with self.lock:
+                entries = [(observer, self.ui_observers.get((setting_key, observer)), False,
+                            (setting_key, observer) in self.inline_observers)
+                           for observer in self.observers.get(setting_key, ())]
+                    
+                # Special case for patterns where settings have both specific and general observers
+                parts = setting_key.split('.')
+                if len(parts) > 1:
+                    pattern = '.'.join(parts[:-1]) + '.*'
+                    entries.extend((observer, self.ui_observers.get((pattern, observer)), True,
+                                    (pattern, observer) in self.inline_observers)
+                                   for observer in self.observers.get(pattern, ()))
+                entries = tuple(entries)
+                # Only cache against the index the entries were built from
+                if index is self._observer_index:
+                    index[setting_key] = entries
+        return entries
+            
+    def _notify_observers(self, settings: Dict[str, Any]) -> List[Callable[[], None]]:
+        """
+        Queue notifications of changed settings for the observer thread (lock held)
+        
+        Queuing under the lock keeps the latest value of each key last; the
+        calls left for the updating thread are returned, to be made once the
+        lock is released.
+        
+        Args:
+            settings: Dictionary of changed setting keys and their new values
+            
+        Returns:
+            Inline observer calls (and, once shut down, the delivery itself)
+        """
+        calls = []
+        queued = {}
+        for setting_key, value in settings.items():
+            deferred = False
+            for observer, _, is_pattern, inline in self._observers_for(setting_key):
+                if inline:
+                    args = (setting_key, value) if is_pattern else (value,)
+                    calls.append(partial(self._call_observer, observer, setting_key, args))
+                else:
+                    deferred = True
+            if deferred:
+                queued[setting_key] = value
+                
+        with self._pending_lock:
+            for setting_key, value in queued.items():
+                # A newer value replaces one not delivered yet
+                self._pending.pop(setting_key, None)
+                self._pending[setting_key] = value
+            if not self._pending or self._dispatch_scheduled:
+                return calls
+            self._dispatch_scheduled = True
+            self._idle.clear()
+            
+        try:
+            self.executor.submit(self._dispatch)
+        except RuntimeError:
+            # Shut down; deliver on the calling thread instead
+            calls.append(self._dispatch)
+        return calls
+                
+    def _dispatch(self):
+        """Deliver queued notifications until none are left (observer thread)"""
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    self._dispatch_scheduled = False
+                    self._idle.set()
+                    return
+                pending, self._pending = self._pending, {}
+                
+            for setting_key, value in pending.items():
+                for observer, widget, is_pattern, inline in self._observers_for(setting_key):
+                    if inline:
+                        continue
+                    args = (setting_key, value) if is_pattern else (value,)
+                    if widget is not None:
                         try:
-                            observer(setting_key, value)
+                            widget.after(0, self._call_observer, observer, setting_key, args)
                         except Exception as e:
-                            self.log(f"[Settings] Error notifying pattern observer for {setting_key}: {e}")
+                            self.log(f"[Settings] Error scheduling UI observer for {setting_key}: {e}")
+                    else:
+                        self._call_observer(observer, setting_key, args)
+                        
+    def _call_observer(self, observer: Callable, setting_key: str, args: Tuple):
+        """Call one observer, logging its errors"""
+        try:
+            observer(*args)
+        except Exception as e:
+            kind = "pattern observer" if len(args) == 2 else "observer"
+            self.log(f"[Settings] Error notifying {kind} for {setting_key}: {e}")
+            
+    def wait_for_observers(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued notification has been delivered
+        
+        Notifications for UI observers are handed to the Tk thread by then,
+        but may not have run yet.
+        
+        Args:
+            timeout: Longest time to wait in seconds (None waits indefinitely)
+            
+        Returns:
+            True if no notifications are left, False on timeout
+        """
+        if threading.current_thread().name.startswith("SettingsObservers"):
+            # Called from an observer; waiting would deadlock
+            return False
+        return self._idle.wait(timeout)
+        
+    def shutdown(self):
+        """Deliver the remaining notifications and stop the observer thread"""
+        self.wait_for_observers()
+        self.executor.shutdown(wait=True)
     
     def get_setting(self, setting_key: str, default: Any = None) -> Any:
         """
@@ -102,22 +264,22 @@ class SettingsManager:
         """
         Update multiple settings at once
         
+        The settings are applied as one configuration transaction, so they
+        become visible together and are saved with a single write; observers
+        are then notified together, each key once.
+        
         Args:
             settings: Dictionary of setting keys and values
         """
         with self.lock:
             # First update all settings
-            for key, value in settings.items():
-                self.config_manager.set(key, value)
+            self.config_manager.update(settings)
                 
-            # Then notify all observers
-            for key, value in settings.items():
-                if key in self.observers:
-                    for observer in self.observers[key]:
-                        try:
-                            observer(value)
-                        except Exception as e:
-                            self.log(f"[Settings] Error notifying observer for {key}: {e}")
+            # Then notify all observers in one pass
+            calls = self._notify_observers(settings)
+            
+        for call in calls:
+            call()
     
     def migrate_legacy_settings(self, core_system):
         """
@@ -237,8 +399,9 @@ class SettingsManager:
         def on_system_prompt_change(value):
             chat_engine.set_system_prompt(value)
         
-        # Register the observer for system prompt changes
-        self.register_observer("chat.system_prompt", on_system_prompt_change)
+        # Register the observer for system prompt changes; it is quick, and
+        # the next chat must use the new prompt
+        self.register_observer("chat.system_prompt", on_system_prompt_change, inline=True)
         
         # Initialize with current settings
         current_mode = self.get_setting("memory.mode", "off")
@@ -0,0 +1,225 @@
+"""
+Text Chunker - Streaming sentence-aware chunking for memory ingestion
+"""
+import re
+import bisect
+from typing import Iterable, Iterator, List, Tuple, Union, Callable, Optional
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Units chunk sizes can be measured in
+CHUNK_UNITS = ("chars", "tokens")
+
+# Rough characters per token, used to bound sentence length in token mode
+CHARS_PER_TOKEN = 4
+
+
+def approximate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_long(text: str, limit: int, base: int = 0) -> Iterator[Tuple[int, str]]:
+    """
+    Cut text into pieces of at most limit characters, at whitespace when possible
+
+    Args:
+        text: Text to cut
+        limit: Maximum piece length
+        base: Stream offset of text
+
+    Yields:
+        (stream offset, piece) pairs, in order
+    """
+    start = 0
+    while len(text) - start > limit:
+        end = start + limit
+        # Prefer the last whitespace in the window so words stay whole
+        cut = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+        if cut <= start:
+            cut = end
+        yield base + start, text[start:cut]
+        start = cut
+        while start < len(text) and text[start].isspace():
+            start += 1
+    if start < len(text):
+        yield base + start, text[start:]
+
+
+def _drain(buffer: str, limit: int, final: bool, base: int) -> Tuple[List[Tuple[int, str]], str]:
+    """
+    Split the complete sentences off a buffer
+
+    Args:
+        buffer: Buffered text
+        limit: Maximum sentence length in characters
+        final: Whether the stream has ended (the remainder is a sentence too)
+        base: Stream offset of buffer
+
+    Returns:
+        Tuple with (stream offset, sentence) pairs for the stripped, non-empty
+        sentences and the text still waiting for the rest of its sentence
+    """
+    pieces = []
+    start = 0
+    for match in _SENTENCE_END.finditer(buffer):
+        pieces.extend(_split_long(buffer[start:match.start()], limit, base + start))
+        start = match.end()
+
+    # Overlong runs without a boundary are cut; the last piece may continue
+    pieces.extend(_split_long(buffer[start:], limit, base + start))
+    remainder = ""
+    if not final and pieces and pieces[-1][0] >= base + start:
+        remainder = pieces.pop()[1]
+    return [(offset, text.strip()) for offset, text in pieces if text.strip()], remainder
+
+
+def iter_sentences(source: Union[str, Iterable[str]], limit: int) -> Iterator[Tuple[int, str]]:
+    """
+    Split a text stream into sentences
+
+    Sentences may span pieces of the stream. Pieces are gathered until about
+    limit characters are pending and then scanned once, and runs without a
+    sentence boundary are cut at whitespace once they exceed limit, so only
+    a couple of sentences of text are buffered at a time.
+
+    Pieces are concatenated as they are (a file read in blocks may split a
+    word), so sources whose pieces are separate units, such as PDF pages,
+    end each piece with whitespace.
+
+    Args:
+        source: Text, or an iterable of text pieces (file handle, PDF pages, ...)
+        limit: Maximum sentence length in characters
+
+    Yields:
+        (piece index, sentence) pairs, where piece index is the position in
+        source of the piece the sentence starts in
+    """
+    pieces = [source] if isinstance(source, str) else source
+    piece_starts: List[int] = []
+    consumed = 0  # stream offset just past the last piece read
+    pending: List[str] = []
+    pending_length = 0
+    for piece in pieces:
+        piece_starts.append(consumed)
+        if not piece:
+            continue
+        consumed += len(piece)
+        pending.append(piece)
+        pending_length += len(piece)
+        if pending_length < limit:
+            continue
+        sentences, remainder = _drain("".join(pending), limit, False, consumed - pending_length)
+        for offset, sentence in sentences:
+            yield bisect.bisect_right(piece_starts, offset) - 1, sentence
+        pending = [remainder] if remainder else []
+        pending_length = len(remainder)
+
+    if pending:
+        sentences, _ = _drain("".join(pending), limit, True, consumed - pending_length)
+        for offset, sentence in sentences:
+            yield bisect.bisect_right(piece_starts, offset) - 1, sentence
+
+
+def iter_chunk_spans(source: Union[str, Iterable[str]],
+                     max_chunk_size: int = 1000,
+                     overlap: int = 100,
+                     unit: str = "chars",
+                     token_counter: Optional[Callable[[str], int]] = None) -> Iterator[Tuple[str, int, int]]:
+    """
+    Split a text stream into overlapping, sentence-aligned chunks
+
+    Each sentence is measured once and each chunk is joined once, so the
+    work is linear in the input and memory is bounded by the chunk size.
+    A new chunk starts with the last words of the previous one.
+
+    Args:
+        source: Text, or an iterable of text pieces (file handle, PDF pages, ...)
+        max_chunk_size: Maximum chunk size, in unit
+        overlap: Approximate overlap between consecutive chunks, in unit
+        unit: "chars" or "tokens"
+        token_counter: Function counting tokens in a text (token mode only;
+            defaults to approximate_tokens)
+
+    Yields:
+        (chunk, first piece, last piece) tuples, in order, where the piece
+        numbers are positions in source (e.g. PDF page indexes) the chunk's
+        own sentences came from
+    """
+    if unit == "tokens":
+        measure = token_counter or approximate_tokens
+        separator = 0
+        sentence_limit = max_chunk_size * CHARS_PER_TOKEN
+        overlap_words = (overlap * 3) // 4  # roughly 0.75 words per token
+        overlap_chars = 2 * overlap * CHARS_PER_TOKEN
+    else:
+        measure = len
+        separator = 1
+        sentence_limit = max_chunk_size
+        overlap_words = overlap // 4  # approx 4 chars per word
+        overlap_chars = 2 * overlap  # keeps very long "words" out of the overlap
+
+    current: List[str] = []
+    size = 0
+    first_piece = last_piece = None
+    for piece, sentence in iter_sentences(source, sentence_limit):
+        length = measure(sentence)
+        if current and size + separator + length > max_chunk_size:
+            yield " ".join(current), first_piece, last_piece
+            first_piece = None
+
+            # Start the next chunk with the tail of this one
+            tail: List[str] = []
+            tail_length = 0
+            for previous in reversed(current):
+                for word in reversed(previous.split()):
+                    if len(tail) >= overlap_words or tail_length + len(word) > overlap_chars:
+                        break
+                    tail.append(word)
+                    tail_length += len(word) + 1
+                else:
+                    continue
+                break
+            current = [" ".join(reversed(tail))] if tail else []
+            size = measure(current[0]) if current else 0
+
+        if current:
+            size += separator
+        current.append(sentence)
+        size += length
+        if first_piece is None:
+            first_piece = piece
+        last_piece = piece
+
+    if current:
+        yield " ".join(current), first_piece, last_piece
+
+
+def iter_chunks(source: Union[str, Iterable[str]],
+                max_chunk_size: int = 1000,
+                overlap: int = 100,
+                unit: str = "chars",
+                token_counter: Optional[Callable[[str], int]] = None) -> Iterator[str]:
+    """
+    Split a text stream into overlapping, sentence-aligned chunks
+
+    Args:
+        source: Text, or an iterable of text pieces (file handle, PDF pages, ...)
+        max_chunk_size: Maximum chunk size, in unit
+        overlap: Approximate overlap between consecutive chunks, in unit
+        unit: "chars" or "tokens"
+        token_counter: Function counting tokens in a text (token mode only)
+
+    Yields:
+        Chunks of text, in order
+    """
+    for chunk, _, _ in iter_chunk_spans(source, max_chunk_size, overlap, unit, token_counter):
+        yield chunk
@@ -0,0 +1,442 @@
+"""
+Vector Quantization - Compressed embedding storage for the memory system
+"""
+import abc
+import base64
+from typing import List, Dict, Any, Optional, Iterator
+
+import numpy as np
+import torch
+
+# Values accepted for MemorySystem(quantization=...)
+QUANTIZATION_MODES = ("none", "int8", "pq")
+
+# Rows scored per matrix product so temporary float copies stay small
+_SCORE_BLOCK = 65536
+
+# Rows a product-quantized index stores as float32 before training its
+# codebooks; 4x the 256 centroids per subspace keeps k-means meaningful
+PQ_TRAIN_SIZE = 1024
+
+
+def _to_base64(tensor: torch.Tensor) -> str:
+    """Serialize a tensor's raw bytes as base64"""
+    return base64.b64encode(tensor.contiguous().numpy().tobytes()).decode("ascii")
+
+
+def _from_base64(data: str, dtype: torch.dtype, shape) -> torch.Tensor:
+    """Deserialize a tensor written by _to_base64"""
+    numpy_dtype = {torch.int8: np.int8, torch.uint8: np.uint8, torch.float32: np.float32}[dtype]
+    array = np.frombuffer(base64.b64decode(data), dtype=numpy_dtype).copy()
+    return torch.from_numpy(array).reshape(shape)
+
+
+def _grow(tensor: torch.Tensor, needed: int) -> torch.Tensor:
+    """Return tensor with capacity for at least `needed` rows (doubling)"""
+    if tensor.shape[0] >= needed:
+        return tensor
+    capacity = max(needed, tensor.shape[0] * 2, 64)
+    grown = torch.zeros((capacity,) + tuple(tensor.shape[1:]), dtype=tensor.dtype)
+    grown[:tensor.shape[0]] = tensor
+    return grown
+
+
+class QuantizedIndex(abc.ABC):
+    """
+    Contiguous, compressed replacement for MemorySystem's list of tensors
+
+    Behaves like the list it replaces (len, iteration, indexing and append
+    return or accept float tensors) so existing code keeps working, and adds
+    scores() for asymmetric distance computation: the float query is compared
+    with the compressed rows directly, without decompressing the corpus.
+    """
+
+    kind = "none"
+
+    def __init__(self, dim: Optional[int] = None):
+        """
+        Initialize an empty index
+
+        Args:
+            dim: Embedding dimension (taken from the first row when omitted)
+        """
+        self.dim = dim
+        self.count = 0
+        self.norms = torch.zeros(0, dtype=torch.float32)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def __iter__(self) -> Iterator[torch.Tensor]:
+        for start in range(0, self.count, _SCORE_BLOCK):
+            yield from self.decode(list(range(start, min(start + _SCORE_BLOCK, self.count))))
+
+    def __getitem__(self, row: int) -> torch.Tensor:
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError("QuantizedIndex row out of range")
+        return self.decode([row])[0]
+
+    def append(self, vector: torch.Tensor) -> None:
+        """
+        Add one embedding
+
+        Args:
+            vector: Float embedding
+        """
+        self.extend(vector.reshape(1, -1))
+
+    @abc.abstractmethod
+    def extend(self, vectors: torch.Tensor) -> None:
+        """
+        Add a batch of embeddings
+
+        Args:
+            vectors: Float tensor of shape [n, dim]
+        """
+
+    @abc.abstractmethod
+    def decode(self, rows: List[int]) -> torch.Tensor:
+        """
+        Reconstruct float embeddings
+
+        Args:
+            rows: Row ids
+
+        Returns:
+            Float tensor of shape [len(rows), dim]
+        """
+
+    def scores(self, queries: torch.Tensor, rows: Optional[List[int]] = None) -> torch.Tensor:
+        """
+        Approximate cosine similarity between queries and stored rows
+
+        Args:
+            queries: Float query embedding, or a [queries, dim] matrix
+            rows: Optional rows to score (all rows when omitted)
+
+        Returns:
+            Scores aligned with rows; shape [rows] for a single query,
+            [queries, rows] for a matrix
+        """
+        single = queries.dim() == 1
+        queries = queries.detach().float().cpu().reshape(-1, queries.shape[-1])
+        queries = queries / queries.norm(dim=1, keepdim=True).clamp_min(1e-12)
+        selected = None if rows is None else torch.as_tensor(rows, dtype=torch.long)
+        total = self.count if selected is None else len(selected)
+
+        # Keep the temporary [block, queries] products bounded
+        block_size = max(1024, _SCORE_BLOCK // len(queries))
+        parts = []
+        for start in range(0, total, block_size):
+            stop = min(start + block_size, total)
+            block = slice(start, stop) if selected is None else selected[start:stop]
+            parts.append(self._inner_products(queries, block) / self.norms[block].clamp_min(1e-12)[:, None])
+        scores = torch.cat(parts).T if parts else torch.zeros((len(queries), 0))
+        return scores[0] if single else scores
+
+    @abc.abstractmethod
+    def _inner_products(self, queries: torch.Tensor, rows) -> torch.Tensor:
+        """Inner products [rows, queries] between normalized queries and rows (tensor or slice)"""
+
+    @abc.abstractmethod
+    def take(self, rows: List[int]) -> "QuantizedIndex":
+        """
+        Build a new index holding only the given rows, in order
+
+        Args:
+            rows: Row ids to keep
+
+        Returns:
+            New index of the same kind
+        """
+
+    @abc.abstractmethod
+    def nbytes(self) -> int:
+        """
+        Get the memory used by stored rows
+
+        Returns:
+            Size in bytes
+        """
+
+    @abc.abstractmethod
+    def state(self) -> Dict[str, Any]:
+        """
+        Serialize the index
+
+        Returns:
+            JSON-serializable dictionary
+        """
+
+
+class Int8Index(QuantizedIndex):
+    """
+    Symmetric int8 scalar quantization with one scale per row (~4x smaller)
+    """
+
+    kind = "int8"
+
+    def __init__(self, dim: Optional[int] = None):
+        super().__init__(dim)
+        self.codes = torch.zeros((0, dim or 0), dtype=torch.int8)
+        self.scales = torch.zeros(0, dtype=torch.float32)
+
+    def extend(self, vectors: torch.Tensor) -> None:
+        vectors = vectors.detach().float().cpu()
+        if self.count == 0 and self.codes.shape[1] != vectors.shape[1]:
+            self.dim = vectors.shape[1]
+            self.codes = torch.zeros((0, self.dim), dtype=torch.int8)
+
+        scales = vectors.abs().amax(dim=1).clamp_min(1e-12) / 127.0
+        codes = torch.round(vectors / scales[:, None]).clamp(-127, 127).to(torch.int8)
+
+        end = self.count + vectors.shape[0]
+        self.codes = _grow(self.codes, end)
+        self.scales = _grow(self.scales, end)
+        self.norms = _grow(self.norms, end)
+        self.codes[self.count:end] = codes
+        self.scales[self.count:end] = scales
+        self.norms[self.count:end] = vectors.norm(dim=1)
+        self.count = end
+
+    def decode(self, rows: List[int]) -> torch.Tensor:
+        rows = torch.as_tensor(rows, dtype=torch.long)
+        return self.codes[rows].float() * self.scales[rows, None]
+
+    def _inner_products(self, queries: torch.Tensor, rows) -> torch.Tensor:
+        return (self.codes[rows].float() @ queries.T) * self.scales[rows][:, None]
+
+    def take(self, rows: List[int]) -> "Int8Index":
+        rows = torch.as_tensor(rows, dtype=torch.long)
+        index = Int8Index(self.dim)
+        index.codes = self.codes[rows].clone()
+        index.scales = self.scales[rows].clone()
+        index.norms = self.norms[rows].clone()
+        index.count = len(rows)
+        return index
+
+    def nbytes(self) -> int:
+        return self.count * ((self.dim or 0) + 8)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "dim": self.dim,
+            "count": self.count,
+            "codes": _to_base64(self.codes[:self.count]),
+            "scales": _to_base64(self.scales[:self.count]),
+            "norms": _to_base64(self.norms[:self.count]),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Int8Index":
+        index = cls(state["dim"])
+        index.count = state["count"]
+        index.codes = _from_base64(state["codes"], torch.int8, (index.count, index.dim))
+        index.scales = _from_base64(state["scales"], torch.float32, (index.count,))
+        index.norms = _from_base64(state["norms"], torch.float32, (index.count,))
+        return index
+
+
+class ProductQuantizedIndex(QuantizedIndex):
+    """
+    Product quantization: each row is stored as one byte per subspace
+
+    Rows are kept as floats until train_size rows exist; the codebooks are
+    then trained with k-means on those rows and everything is encoded. With
+    the default dim/4 subspaces a 384-d row takes 100 bytes (~15x smaller).
+    """
+
+    kind = "pq"
+
+    def __init__(self, dim: Optional[int] = None, subspaces: Optional[int] = None,
+                 train_size: int = PQ_TRAIN_SIZE, iterations: int = 15):
+        """
+        Initialize an empty product-quantized index
+
+        Args:
+            dim: Embedding dimension
+            subspaces: Number of subspaces (defaults to dim / 4)
+            train_size: Rows collected before training the codebooks
+            iterations: k-means iterations per subspace
+        """
+        super().__init__(dim)
+        self.subspaces = subspaces
+        self.train_size = train_size
+        self.iterations = iterations
+        self.centroids = None  # [subspaces, 256, dim / subspaces]
+        self.codes = torch.zeros((0, 0), dtype=torch.uint8)
+        self.pending = torch.zeros((0, dim or 0), dtype=torch.float32)
+
+    @property
+    def trained(self) -> bool:
+        """Whether the codebooks have been trained"""
+        return self.centroids is not None
+
+    def _resolve_subspaces(self) -> int:
+        """Pick a subspace count that divides the dimension"""
+        subspaces = self.subspaces or max(1, self.dim // 4)
+        while self.dim % subspaces:
+            subspaces -= 1
+        return subspaces
+
+    def extend(self, vectors: torch.Tensor) -> None:
+        vectors = vectors.detach().float().cpu()
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.pending = torch.zeros((0, self.dim), dtype=torch.float32)
+
+        end = self.count + vectors.shape[0]
+        self.norms = _grow(self.norms, end)
+        self.norms[self.count:end] = vectors.norm(dim=1)
+
+        if self.trained:
+            self.codes = _grow(self.codes, end)
+            self.codes[self.count:end] = self._encode(vectors)
+        else:
+            self.pending = _grow(self.pending, end)
+            self.pending[self.count:end] = vectors
+        self.count = end
+
+        if not self.trained and self.count >= self.train_size:
+            self.train()
+
+    def train(self) -> None:
+        """Train the codebooks on the stored rows and encode them"""
+        data = self.pending[:self.count]
+        self.subspaces = self._resolve_subspaces()
+        width = self.dim // self.subspaces
+        clusters = min(256, self.count)
+        generator = torch.Generator().manual_seed(0)
+
+        centroids = torch.zeros((self.subspaces, 256, width), dtype=torch.float32)
+        for j in range(self.subspaces):
+            sub = data[:, j * width:(j + 1) * width]
+            centers = sub[torch.randperm(len(sub), generator=generator)[:clusters]].clone()
+            for _ in range(self.iterations):
+                assignment = torch.cdist(sub, centers).argmin(dim=1)
+                sums = torch.zeros_like(centers).index_add_(0, assignment, sub)
+                counts = torch.bincount(assignment, minlength=clusters).float()
+                filled = counts > 0
+                centers[filled] = sums[filled] / counts[filled, None]
+            centroids[j, :clusters] = centers
+            # Unused slots (tiny corpora) repeat the first centroid and are never chosen
+            centroids[j, clusters:] = centers[0]
+        self.centroids = centroids
+
+        self.codes = torch.zeros((self.count, self.subspaces), dtype=torch.uint8)
+        for start in range(0, self.count, _SCORE_BLOCK):
+            stop = min(start + _SCORE_BLOCK, self.count)
+            self.codes[start:stop] = self._encode(data[start:stop])
+        self.pending = torch.zeros((0, self.dim), dtype=torch.float32)
+
+    def _encode(self, vectors: torch.Tensor) -> torch.Tensor:
+        """Assign each subvector to its nearest centroid"""
+        width = self.dim // self.subspaces
+        codes = torch.zeros((vectors.shape[0], self.subspaces), dtype=torch.uint8)
+        for j in range(self.subspaces):
+            codes[:, j] = torch.cdist(vectors[:, j * width:(j + 1) * width], self.centroids[j]).argmin(dim=1)
+        return codes
+
+    def decode(self, rows: List[int]) -> torch.Tensor:
+        rows = torch.as_tensor(rows, dtype=torch.long)
+        if not self.trained:
+            return self.pending[rows].clone()
+        codes = self.codes[rows].long()
+        parts = [self.centroids[j][codes[:, j]] for j in range(self.subspaces)]
+        return torch.cat(parts, dim=1)
+
+    def _inner_products(self, queries: torch.Tensor, rows) -> torch.Tensor:
+        if not self.trained:
+            return self.pending[rows] @ queries.T
+        # Lookup table of query-subvector x centroid products, then sum per row
+        width = self.dim // self.subspaces
+        table = torch.einsum("mkw,qmw->mkq", self.centroids,
+                             queries.reshape(len(queries), self.subspaces, width))
+        codes = self.codes[rows].long()
+        return table[torch.arange(self.subspaces), codes].sum(dim=1)
+
+    def take(self, rows: List[int]) -> "ProductQuantizedIndex":
+        rows = torch.as_tensor(rows, dtype=torch.long)
+        index = ProductQuantizedIndex(self.dim, self.subspaces, self.train_size, self.iterations)
+        index.centroids = self.centroids
+        index.norms = self.norms[rows].clone()
+        index.count = len(rows)
+        if self.trained:
+            index.codes = self.codes[rows].clone()
+        else:
+            index.pending = self.pending[rows].clone()
+        return index
+
+    def nbytes(self) -> int:
+        if not self.trained:
+            return self.count * ((self.dim or 0) * 4 + 4)
+        return self.count * (self.subspaces + 4) + self.centroids.numel() * 4
+
+    def state(self) -> Dict[str, Any]:
+        state = {
+            "type": self.kind,
+            "dim": self.dim,
+            "count": self.count,
+            "subspaces": self.subspaces,
+            "train_size": self.train_size,
+            "norms": _to_base64(self.norms[:self.count]),
+        }
+        if self.trained:
+            state["centroids"] = _to_base64(self.centroids)
+            state["codes"] = _to_base64(self.codes[:self.count])
+        else:
+            state["pending"] = _to_base64(self.pending[:self.count])
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "ProductQuantizedIndex":
+        index = cls(state["dim"], state.get("subspaces"), state.get("train_size", PQ_TRAIN_SIZE))
+        index.count = state["count"]
+        index.norms = _from_base64(state["norms"], torch.float32, (index.count,))
+        if "centroids" in state:
+            width = index.dim // index.subspaces
+            index.centroids = _from_base64(state["centroids"], torch.float32, (index.subspaces, 256, width))
+            index.codes = _from_base64(state["codes"], torch.uint8, (index.count, index.subspaces))
+        else:
+            index.pending = _from_base64(state["pending"], torch.float32, (index.count, index.dim))
+        return index
+
+
+def create_quantized_index(mode: str, **options) -> Optional[QuantizedIndex]:
+    """
+    Create an empty index for a quantization mode
+
+    Args:
+        mode: "none", "int8" or "pq"
+        options: Extra constructor arguments (e.g. subspaces for pq)
+
+    Returns:
+        QuantizedIndex instance, or None for unquantized storage
+    """
+    if mode == "int8":
+        return Int8Index()
+    if mode == "pq":
+        return ProductQuantizedIndex(**options)
+    return None
+
+
+def load_quantized_index(state: Dict[str, Any]) -> QuantizedIndex:
+    """
+    Restore an index serialized with QuantizedIndex.state()
+
+    Args:
+        state: Serialized index
+
+    Returns:
+        QuantizedIndex instance
+    """
+    kinds = {"int8": Int8Index, "pq": ProductQuantizedIndex}
+    if state.get("type") not in kinds:
+        raise ValueError(f"Unknown quantized index type: {state.get('type')}")
+    return kinds[state["type"]].from_state(state)
@@ -0,0 +1,312 @@
+"""
+Extraction Cache - Content-addressed on-disk cache of extracted document pages
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+# Bumped whenever extraction or preprocessing changes what a page turns into,
+# so pages cached by older code are not reused
+CACHE_VERSION = 1
+
+# Default size bound of the cache directory
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Entries are written to these subdirectories, one JSON file each
+_KINDS = ("pages", "documents")
+
+
+class ExtractionCache:
+    """
+    Caches extracted page text on disk, keyed by content
+
+    Page entries are keyed by a fingerprint of the page's own content plus
+    the extraction variant (OCR on/off, OCR language), so a document that
+    only partly changed reuses its unchanged pages. Document entries map a
+    hash of the whole file to its page keys, so an unchanged file is served
+    without opening it.
+
+    The cache is bounded in bytes; the least recently used entries are
+    deleted once it grows past the bound. Entries are written atomically,
+    and files that cannot be read are treated as misses.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_BYTES, logger=None):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Size bound of the cached entries
+            logger: Optional logging function
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.log = logger or print
+        self.lock = threading.Lock()
+
+        # Entry path -> size, least recently used first
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self.counters = {"page_hits": 0, "page_misses": 0, "document_hits": 0,
+                         "document_misses": 0, "writes": 0, "evictions": 0}
+        self._scan()
+        self.evict()
+
+    def _scan(self) -> None:
+        """Load the entries already on disk, oldest first"""
+        found = []
+        for kind in _KINDS:
+            root = os.path.join(self.directory, kind)
+            os.makedirs(root, exist_ok=True)
+            for shard in os.scandir(root):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".tmp"):
+                        # Left behind by an interrupted write
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+                        continue
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.path, stat.st_size))
+
+        for _, path, size in sorted(found):
+            self.entries[path] = size
+            self.total_bytes += size
+
+    @staticmethod
+    def _key(variant: str, content: bytes) -> str:
+        """Hash content together with the extraction variant"""
+        digest = hashlib.sha256(f"{CACHE_VERSION}|{variant}|".encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def page_key(self, fingerprint: bytes, variant: str) -> str:
+        """
+        Get the cache key of a page
+
+        Args:
+            fingerprint: Bytes that change whenever the page's content does
+            variant: Extraction settings the text depends on
+
+        Returns:
+            Hex key
+        """
+        return self._key(variant, fingerprint)
+
+    def document_key(self, file_path: str, variant: str) -> str:
+        """
+        Get the cache key of a whole file, by hashing its content
+
+        Args:
+            file_path: Path to the file
+            variant: Extraction settings the text depends on
+
+        Returns:
+            Hex key
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return self._key(variant, digest.digest())
+
+    def _path(self, kind: str, key: str) -> str:
+        """Get the file an entry is stored in"""
+        return os.path.join(self.directory, kind, key[:2], key + ".json")
+
+    def _read(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry and mark it recently used"""
+        path = self._path(kind, key)
+        with self.lock:
+            if path not in self.entries:
+                return None
+            self.entries.move_to_end(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            self._forget(path)
+            return None
+
+    def _write(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        """Write an entry atomically and evict old entries past the size bound"""
+        path = self._path(kind, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            self.log(f"[PDF] Could not write extraction cache entry: {e}")
+            return
+
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(path, 0)
+            self.entries[path] = size
+            self.counters["writes"] += 1
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used entries until the cache fits its bound
+
+        Returns:
+            Number of entries deleted
+        """
+        evicted = []
+        with self.lock:
+            # The newest entry stays even if it alone exceeds the bound
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_path, old_size = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append(old_path)
+            self.counters["evictions"] += len(evicted)
+
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        return len(evicted)
+
+    def _forget(self, path: str) -> None:
+        """Drop an unreadable entry"""
+        with self.lock:
+            self.total_bytes -= self.entries.pop(path, 0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_page(self, key: str) -> Optional[Tuple[str, bool]]:
+        """
+        Look up a cached page
+
+        Args:
+            key: Page key
+
+        Returns:
+            Tuple with the page text and whether OCR produced it, or None
+        """
+        entry = self._read("pages", key)
+        with self.lock:
+            self.counters["page_hits" if entry is not None else "page_misses"] += 1
+        if entry is None:
+            return None
+        return entry.get("text", ""), bool(entry.get("ocr", False))
+
+    def put_page(self, key: str, text: str, used_ocr: bool) -> None:
+        """
+        Cache a page
+
+        Args:
+            key: Page key
+            text: Extracted text
+            used_ocr: Whether OCR produced the text
+        """
+        self._write("pages", key, {"text": text, "ocr": used_ocr})
+
+    def get_document(self, key: str) -> Optional[List[str]]:
+        """
+        Look up the page keys of a cached document
+
+        Args:
+            key: Document key
+
+        Returns:
+            Page keys in page order, or None
+        """
+        entry = self._read("documents", key)
+        with self.lock:
+            self.counters["document_hits" if entry is not None else "document_misses"] += 1
+        return entry.get("pages") if entry is not None else None
+
+    def put_document(self, key: str, page_keys: List[str]) -> None:
+        """
+        Cache the page keys of a document
+
+        Args:
+            key: Document key
+            page_keys: Page keys in page order
+        """
+        self._write("documents", key, {"pages": page_keys, "cached_at": time.time()})
+
+    def clear(self) -> int:
+        """
+        Delete every cached entry
+
+        Returns:
+            Number of entries deleted
+        """
+        with self.lock:
+            paths = list(self.entries)
+            self.entries.clear()
+            self.total_bytes = 0
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return len(paths)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with entry counts, size, bound, hit/miss counters and
+            the page hit rate
+        """
+        with self.lock:
+            pages_root = os.path.join(self.directory, "pages")
+            page_entries = sum(1 for path in self.entries if path.startswith(pages_root))
+            lookups = self.counters["page_hits"] + self.counters["page_misses"]
+            return {
+                "directory": self.directory,
+                "pages": page_entries,
+                "documents": len(self.entries) - page_entries,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                **self.counters,
+                "page_hit_rate": self.counters["page_hits"] / lookups if lookups else 0.0,
+            }
+
+
+# Caches shared by every extractor using the same directory
+_caches: Dict[str, ExtractionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_extraction_cache(directory: str, max_bytes: int = DEFAULT_CACHE_BYTES, logger=None) -> ExtractionCache:
+    """
+    Get the cache for a directory, creating it on first use
+
+    Args:
+        directory: Cache directory
+        max_bytes: Size bound of the cached entries
+        logger: Optional logging function
+
+    Returns:
+        ExtractionCache instance
+    """
+    directory = os.path.abspath(directory)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = ExtractionCache(directory, max_bytes, logger)
+        elif cache.max_bytes != max_bytes:
+            cache.max_bytes = max_bytes
+            cache.evict()
+        return cache
@@ -2,12 +2,19 @@
 File operations utilities for the Irintai assistant
 """
 import os
+import re
 import json
 import shutil
 import subprocess
 import sys
 import time
-from typing import Dict, List, Any, Optional, Tuple, Set
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Set, Iterator
+from file_operations.file_search import compile_search, scan_file, literal_term, TrigramIndex
+from file_operations.file_walker import walk_entries
+from file_operations.json_store import get_json_store
 
 # Supported file extensions
 SUPPORTED_EXTENSIONS = ['.py', '.txt', '.md', '.pdf', '.docx', '.json', '.sty']
@@ -15,15 +22,20 @@ SUPPORTED_EXTENSIONS = ['.py', '.txt', '.md', '.pdf', '.docx', '.json', '.sty']
 class FileOps:
     """File operations utilities for loading, saving, and managing files"""
     
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, search_index_path: Optional[str] = None):
         """
         Initialize the file operations utility
         
         Args:
             logger: Optional logging function
+            search_index_path: Where the trigram index used by indexed searches
+                is kept (defaults to data/search_index.json)
         """
         self.logger = logger
         self.content_cache = {}
+        self.search_index_path = search_index_path or os.path.join("data", "search_index.json")
+        self.search_index: Optional[TrigramIndex] = None
+        self.search_index_lock = threading.Lock()
         
     def _check_path_permissions(self, path: str, write_access: bool = False) -> bool:
         """
@@ -158,42 +170,52 @@ class FileOps:
             self.log(f"[File Error] Failed to append to {file_path}: {e}")
             return False
     
-    def list_files(self, directory: str, extensions: Optional[List[str]] = None) -> List[str]:
+    def walk_files(self, directory: str, extensions: Optional[List[str]] = None,
+                   max_depth: Optional[int] = None, ignore: Optional[List[str]] = None) -> Iterator[os.DirEntry]:
         """
-        List files in a directory with optional extension filtering
+        Walk the files under a directory lazily, in a single pass
         
         Args:
-            directory: Directory to list files from
+            directory: Directory to walk
             extensions: Optional list of file extensions to filter by
+            max_depth: Optional number of directory levels to descend into
+            ignore: Optional fnmatch patterns of file and directory names to skip
             
-        Returns:
-            List of file paths
+        Yields:
+            os.DirEntry objects of the matching files (stat() results are cached)
         """
         # Check path permissions
         if not self._check_path_permissions(directory):
-            return []
+            return
         
-        # Perform the listing directly
         try:
-            files = []
-            for root, _, filenames in os.walk(directory):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    if extensions:
-                        if any(filename.endswith(ext) for ext in extensions):
-                            files.append(file_path)
-                    else:
-                        files.append(file_path)
-                        
-            return files
+            yield from walk_entries(directory, extensions, max_depth=max_depth, ignore=ignore)
         except Exception as e:
             self.log(f"[File Error] Failed to list files in {directory}: {e}")
-            return []
+    
+    def list_files(self, directory: str, extensions: Optional[List[str]] = None,
+                   max_depth: Optional[int] = None, ignore: Optional[List[str]] = None) -> List[str]:
+        """
+        List files in a directory with optional extension filtering
+        
+        Args:
+            directory: Directory to list files from
+            extensions: Optional list of file extensions to filter by
+            max_depth: Optional number of directory levels to descend into
+            ignore: Optional fnmatch patterns of file and directory names to skip
+            
+        Returns:
+            List of file paths
+        """
+        return [entry.path for entry in self.walk_files(directory, extensions, max_depth, ignore)]
     
     def load_json(self, file_path: str) -> Tuple[bool, Any]:
         """
         Load a JSON file
         
+        Saves to the file still waiting to be written are flushed first, so
+        the latest saved data is returned.
+        
         Args:
             file_path: Path to the JSON file
             
@@ -201,6 +223,10 @@ class FileOps:
             Tuple containing success flag and loaded data
         """
         try:
+            store = get_json_store()
+            if store.has_pending(file_path):
+                store.flush(file_path)
+                
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 
@@ -209,30 +235,29 @@ class FileOps:
             self.log(f"[JSON Error] Failed to load {file_path}: {e}")
             return False, None
     
-    def save_json(self, file_path: str, data: Any, indent: int = 2) -> bool:
+    def save_json(self, file_path: str, data: Any, indent: int = 2, compact: bool = False,
+                  wait: bool = True) -> bool:
         """
         Save data to a JSON file
         
+        The file is replaced atomically. With wait=False the write happens
+        on a background thread shortly after the call, and further saves to
+        the same file in the meantime are written once, with the latest data.
+        
         Args:
             file_path: Path to the JSON file
             data: Data to save
             indent: JSON indentation
+            compact: Write without indentation or spaces, for files only read by the program
+            wait: Write before returning (False to write behind)
             
         Returns:
-            True if data saved successfully, False otherwise
+            True if data saved (or queued) successfully, False otherwise
         """
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent)
-                
-            self.log(f"[JSON] Saved to {file_path}")
-            return True
-        except Exception as e:
-            self.log(f"[JSON Error] Failed to save to {file_path}: {e}")
+        if not get_json_store().save(file_path, data, indent=indent, compact=compact, wait=wait):
             return False
+        self.log(f"[JSON] Saved to {file_path}")
+        return True
     
     def copy_file(self, source: str, destination: str) -> bool:
         """
@@ -454,49 +479,61 @@ class FileOps:
         """
         return self.list_files(directory, [extension])
         
-    def get_file_tree(self, directory: str, max_depth: int = 3) -> Dict[str, Any]:
+    def get_file_tree(self, directory: str, max_depth: int = 3, ignore: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Get a tree representation of files in a directory
         
         Args:
             directory: Directory to scan
             max_depth: Maximum directory depth to scan
+            ignore: Optional fnmatch patterns of file and directory names to skip
             
         Returns:
             Dictionary representing the file tree
         """
-        def scan_dir(path: str, current_depth: int) -> Dict[str, Any]:
-            if current_depth > max_depth:
-                return {"name": os.path.basename(path), "type": "directory", "truncated": True}
-                
-            result = {
-                "name": os.path.basename(path),
-                "path": path,
-                "type": "directory",
-                "children": []
-            }
+        if max_depth < 1:
+            return {"name": os.path.basename(directory), "type": "directory", "truncated": True}
             
-            try:
-                for item in os.listdir(path):
-                    item_path = os.path.join(path, item)
-                    if os.path.isdir(item_path):
-                        result["children"].append(scan_dir(item_path, current_depth + 1))
-                    else:
-                        result["children"].append({
-                            "name": item,
-                            "path": item_path,
-                            "type": "file",
-                            "extension": self.get_file_extension(item)
-                        })
-            except Exception as e:
-                self.log(f"[File Tree Error] Failed to scan {path}: {e}")
-                result["error"] = str(e)
-                
-            return result
-            
-        return scan_dir(directory, 1)
+        root = {
+            "name": os.path.basename(directory),
+            "path": directory,
+            "type": "directory",
+            "children": []
+        }
+        # Directory path (without trailing separator) -> (node, depth of its entries)
+        nodes = {os.path.dirname(os.path.join(directory, "")): (root, 1)}
         
-    def search_files(self, directory: str, search_term: str, extensions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        def on_error(path: str, error: OSError) -> None:
+            self.log(f"[File Tree Error] Failed to scan {path}: {error}")
+            nodes[os.path.dirname(os.path.join(path, ""))][0]["error"] = str(error)
+            
+        for entry in walk_entries(directory, max_depth=max_depth, ignore=ignore, include_dirs=True,
+                                  follow_links=True, onerror=on_error):
+            parent, depth = nodes[os.path.dirname(entry.path)]
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if depth >= max_depth:
+                    node = {"name": entry.name, "type": "directory", "truncated": True}
+                else:
+                    node = {"name": entry.name, "path": entry.path, "type": "directory", "children": []}
+                    nodes[entry.path] = (node, depth + 1)
+            else:
+                node = {
+                    "name": entry.name,
+                    "path": entry.path,
+                    "type": "file",
+                    "extension": self.get_file_extension(entry.name)
+                }
+            parent["children"].append(node)
+            
+        return root
+        
+    def search_files(self, directory: str, search_term: str, extensions: Optional[List[str]] = None,
+                     regex: bool = False, case_sensitive: bool = False, use_index: bool = False,
+                     workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Search for files containing a specific term
         
@@ -504,63 +541,150 @@ class FileOps:
             directory: Directory to search
             search_term: Term to search for
             extensions: Optional list of file extensions to filter by
+            regex: Treat search_term as a regular expression
+            case_sensitive: Match case exactly
+            use_index: Narrow literal searches with the persistent trigram index
+            workers: Number of files searched concurrently
             
         Returns:
             List of dictionaries with file information and matches
         """
-        results = []
+        return list(self.iter_search_files(directory, search_term, extensions, regex=regex,
+                                           case_sensitive=case_sensitive, use_index=use_index,
+                                           workers=workers))
+    
+    def iter_search_files(self, directory: str, search_term: str, extensions: Optional[List[str]] = None,
+                          regex: bool = False, case_sensitive: bool = False, use_index: bool = False,
+                          workers: Optional[int] = None, use_processes: bool = False,
+                          max_contexts: int = 5) -> Iterator[Dict[str, Any]]:
+        """
+        Search for files containing a specific term, yielding matches as they are found
+        
+        Files are read in blocks by a pool of workers, a bounded number at a
+        time, and results come back in listing order.
+        
+        Args:
+            directory: Directory to search
+            search_term: Term (or regular expression) to search for
+            extensions: Optional list of file extensions to filter by
+            regex: Treat search_term as a regular expression
+            case_sensitive: Match case exactly
+            use_index: Narrow literal searches with the persistent trigram index
+                (regular expressions with special characters scan every file)
+            workers: Number of files searched concurrently (defaults to the
+                thread pool default)
+            use_processes: Search in worker processes instead of threads, for
+                CPU-heavy regular expressions
+            max_contexts: Matches per file to return context for
+            
+        Yields:
+            Dictionaries with path, name, extension, match count and context
+        """
+        if not search_term:
+            return
+        try:
+            pattern = compile_search(search_term, regex=regex, case_sensitive=case_sensitive)
+        except re.error as e:
+            self.log(f"[Search Error] Invalid pattern {search_term!r}: {e}")
+            return
+        
+        literal = literal_term(search_term, regex)
+        overlap = len(literal) - 1 if literal is not None else 0
         files = self.list_files(directory, extensions)
         
-        for file_path in files:
-            try:
-                success, content = self.read_file(file_path)
-                if success and search_term.lower() in content.lower():
-                    # Count occurrences
-                    count = content.lower().count(search_term.lower())
-                    
-                    # Get some context around matches
-                    context = []
-                    content_lower = content.lower()
-                    search_lower = search_term.lower()
-                    
-                    start = 0
-                    while True:
-                        pos = content_lower.find(search_lower, start)
-                        if pos == -1:
-                            break
-                            
-                        # Get context (50 chars before and after)
-                        ctx_start = max(0, pos - 50)
-                        ctx_end = min(len(content), pos + len(search_term) + 50)
-                        context_str = content[ctx_start:ctx_end]
-                        
-                        # Highlight the match
-                        match_start = max(0, pos - ctx_start)
-                        match_end = match_start + len(search_term)
-                        
-                        context.append({
-                            "before": context_str[:match_start],
-                            "match": context_str[match_start:match_end],
-                            "after": context_str[match_end:]
-                        })
-                        
-                        start = pos + len(search_term)
-                        
-                        # Limit to 5 contexts
-                        if len(context) >= 5:
-                            break
-                    
-                    results.append({
+        if use_index:
+            files = self._indexed_candidates(directory, files, literal)
+        
+        if use_processes:
+            workers = workers or os.cpu_count() or 1
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            workers = workers or min(32, (os.cpu_count() or 1) + 4)
+            executor = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        try:
+            files = iter(files)
+            while True:
+                # Keep a bounded number of files in flight
+                for file_path in files:
+                    pending.append((file_path, executor.submit(scan_file, file_path, pattern, overlap, max_contexts, literal=literal)))
+                    if len(pending) >= 4 * workers:
+                        break
+                if not pending:
+                    break
+                
+                file_path, future = pending.popleft()
+                try:
+                    count, context = future.result()
+                except Exception as e:
+                    self.log(f"[Search Error] Failed to search {file_path}: {e}")
+                    continue
+                if count:
+                    yield {
                         "path": file_path,
                         "name": os.path.basename(file_path),
                         "extension": self.get_file_extension(file_path),
                         "count": count,
                         "context": context
-                    })
-            except Exception as e:
-                self.log(f"[Search Error] Failed to search {file_path}: {e}")
-                
-        return results
+                    }
+        finally:
+            # A caller that stops early leaves no scans behind: drop the queued
+            # ones and wait for those already running
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _indexed_candidates(self, directory: str, files: List[str], literal: Optional[str]) -> List[str]:
+        """
+        Bring the trigram index up to date with a listing and narrow it to
+        the files that may contain a literal term
+        
+        Args:
+            directory: Directory that was listed
+            files: Files found in it
+            literal: Literal search term, or None for regular expressions
+            
+        Returns:
+            Files still worth reading, in listing order
+        """
+        with self.search_index_lock:
+            if self.search_index is None:
+                self.search_index = TrigramIndex(self.search_index_path, logger=self.log)
+            index = self.search_index
+        
+        stale = index.stale(files)
+        if stale:
+            self.log(f"[Search] Indexing {len(stale)} files in {directory}")
+            with ThreadPoolExecutor() as executor:
+                futures = [(entry, executor.submit(TrigramIndex.file_trigrams, entry[0])) for entry in stale]
+                for (file_path, size, mtime_ns), future in futures:
+                    try:
+                        index.add(file_path, size, mtime_ns, future.result())
+                    except Exception as e:
+                        self.log(f"[Search Error] Failed to index {file_path}: {e}")
+        index.prune(directory, set(files))
+        # Written behind, so a burst of searches rewrites the index once
+        index.save()
+        
+        if literal is None:
+            return files
+        candidates = index.candidates(literal)
+        if candidates is None:
+            return files
+        return [file_path for file_path in files if file_path in candidates]
+    
+    def close(self) -> bool:
+        """
+        Write out the search index if it has unsaved changes
+        
+        Returns:
+            True if nothing is left unsaved
+        """
+        with self.search_index_lock:
+            index = self.search_index
+        if index is None:
+            return True
+        return index.save(wait=True)
     
     def get_plugin_directory(self, plugin_id: str, create: bool = True) -> str:
         """
@@ -713,37 +837,21 @@ class FileOps:
         # Perform the directory creation
         return self.file_ops.ensure_dir(directory)
         
-    def list_files(self, directory: str, extensions: Optional[List[str]] = None) -> List[str]:
+    def list_files(self, directory: str, extensions: Optional[List[str]] = None,
+                   max_depth: Optional[int] = None, ignore: Optional[List[str]] = None) -> List[str]:
         """
         List files in a directory with sandbox restrictions
         
         Args:
             directory: Directory to list files from
             extensions: Optional list of file extensions to filter by
+            max_depth: Optional number of directory levels to descend into
+            ignore: Optional fnmatch patterns of file and directory names to skip
             
         Returns:
             List of file paths
         """
-        # Check path permissions
-        if not self._check_path_permissions(directory):
-            return []
-            
-        # Perform the listing directly
-        try:
-            files = []
-            for root, _, filenames in os.walk(directory):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    if extensions:
-                        if any(filename.endswith(ext) for ext in extensions):
-                            files.append(file_path)
-                    else:
-                        files.append(file_path)
-                        
-            return files
-        except Exception as e:
-            self.log(f"[File Error] Failed to list files in {directory}: {e}")
-            return []
+        return [entry.path for entry in self.walk_files(directory, extensions, max_depth, ignore)]
     
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """
@@ -768,42 +876,6 @@ class FileOps:
         # Perform the info retrieval
         return self.file_ops.get_file_info(file_path)
     
-    def load_json(self, file_path: str) -> Tuple[bool, Any]:
-        """
-        Load a JSON file with sandbox restrictions
-        
-        Args:
-            file_path: Path to the JSON file
-            
-        Returns:
-            Tuple containing success flag and loaded data
-        """
-        # Check path permissions
-        if not self._check_path_permissions(file_path):
-            return False, "Access denied"
-            
-        # Perform the JSON load
-        return self.file_ops.load_json(file_path)
-    
-    def save_json(self, file_path: str, data: Any, indent: int = 2) -> bool:
-        """
-        Save data to a JSON file with sandbox restrictions
-        
-        Args:
-            file_path: Path to the JSON file
-            data: Data to save
-            indent: JSON indentation
-            
-        Returns:
-            True if data saved successfully, False otherwise
-        """
-        # Check path permissions
-        if not self._check_path_permissions(file_path, write_access=True):
-            return False
-            
-        # Perform the JSON save
-        return self.file_ops.save_json(file_path, data, indent)
-    
     def copy_file(self, source: str, destination: str) -> bool:
         """
         Copy a file with sandbox restrictions
@@ -1109,17 +1181,7 @@ class PluginSandboxedFileOps:
             
         # Perform the listing directly
         try:
-            files = []
-            for root, _, filenames in os.walk(directory):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    if extensions:
-                        if any(filename.endswith(ext) for ext in extensions):
-                            files.append(file_path)
-                    else:
-                        files.append(file_path)
-                        
-            return files
+            return [entry.path for entry in walk_entries(directory, extensions)]
         except Exception as e:
             self.log(f"[File Error] Failed to list files in {directory}: {e}")
             return []
@@ -1488,17 +1550,7 @@ class PluginSandboxedFileOps:
             
         # Perform the listing directly
         try:
-            files = []
-            for root, _, filenames in os.walk(directory):
-                for filename in filenames:
-                    file_path = os.path.join(root, filename)
-                    if extensions:
-                        if any(filename.endswith(ext) for ext in extensions):
-                            files.append(file_path)
-                    else:
-                        files.append(file_path)
-                        
-            return files
+            return [entry.path for entry in walk_entries(directory, extensions)]
         except Exception as e:
             self.log(f"[File Error] Failed to list files in {directory}: {e}")
             return []
@@ -0,0 +1,383 @@
+"""
+File search utilities - Streaming content search and a persistent trigram index
+"""
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Set, Iterable, Iterator, Pattern
+
+from file_operations.json_store import get_json_store
+
+# Characters of context kept on each side of a match
+CONTEXT_CHARS = 50
+
+# Characters read from a file at a time
+BLOCK_SIZE = 1 << 20
+
+# Seconds a deferred index save waits for further changes
+INDEX_SAVE_DELAY = 5.0
+
+
+def compile_search(search_term: str, regex: bool = False, case_sensitive: bool = False) -> Pattern:
+    """
+    Compile a search term
+
+    Case-insensitive searches use re.IGNORECASE, so file contents are never
+    copied to lower case.
+
+    Args:
+        search_term: Literal text, or a regular expression when regex is set
+        regex: Treat search_term as a regular expression
+        case_sensitive: Match case exactly
+
+    Returns:
+        Compiled pattern
+
+    Raises:
+        re.error: If search_term is not a valid regular expression
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(search_term if regex else re.escape(search_term), flags)
+
+
+def _find_all(haystack: str, needle: str, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """Find the non-overlapping occurrences of a string from an offset on"""
+    start = haystack.find(needle, start)
+    while start != -1:
+        yield start, start + len(needle)
+        start = haystack.find(needle, start + len(needle))
+
+
+def scan_file(file_path: str, pattern: Pattern, overlap: int = 0, max_contexts: int = 5,
+              block_size: int = BLOCK_SIZE, literal: Optional[str] = None) -> Tuple[int, List[Dict[str, str]]]:
+    """
+    Count the matches of a pattern in a file, reading it block by block
+
+    Blocks are cut after their last line break, so matches within a line
+    are never split. overlap extra characters are carried into the next
+    block, so literal terms spanning line breaks are found too.
+
+    Literal terms are searched with str.find and str.count, which are much
+    faster than a regular expression; case-insensitive ones on a lower-case
+    copy of each block.
+
+    Args:
+        file_path: Path to the file
+        pattern: Compiled pattern (see compile_search)
+        overlap: Characters a match may extend past a line break (length of
+            a literal term minus one; 0 for regular expressions)
+        max_contexts: Number of matches to return context for
+        block_size: Characters read at a time
+        literal: The literal term pattern matches, if it is one
+
+    Returns:
+        Tuple with the number of matches and, for the first max_contexts of
+        them, dictionaries with "before", "match" and "after" text
+    """
+    fold = bool(pattern.flags & re.IGNORECASE)
+    needle = None
+    if literal:
+        needle = literal.lower() if fold else literal
+        if len(needle) != len(literal):
+            needle = None
+    # Occurrences of a self-overlapping term cannot be counted by str.count across blocks
+    countable = needle is not None and not any(needle.startswith(needle[i:]) for i in range(1, len(needle)))
+
+    count = 0
+    contexts: List[Dict[str, str]] = []
+    carry = ""
+    history = ""  # text just before carry, for "before" contexts
+    resume = 0  # where in carry the last counted match ended
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(block_size)
+            final = not block
+            text = carry + block
+            if final:
+                cut = len(text)
+            else:
+                cut = min(text.rfind("\n") + 1 or len(text), len(text) - overlap)
+
+            haystack = None
+            if needle is not None:
+                haystack = text.lower() if fold else text
+                if len(haystack) != len(text):
+                    haystack = None
+            if haystack is not None:
+                spans = _find_all(haystack, needle, resume)
+            else:
+                spans = (match.span() for match in pattern.finditer(text, resume))
+
+            for start, end in spans:
+                if start >= cut:
+                    break
+                if start == end:
+                    continue
+                if len(contexts) >= max_contexts and haystack is not None and countable:
+                    # Only counting is left
+                    count += haystack.count(needle, start, cut - 1 + len(needle))
+                    break
+                if len(contexts) < max_contexts:
+                    if not final and end + CONTEXT_CHARS > len(text):
+                        # Wait for the text after the match
+                        cut = start
+                        break
+                    before = text[max(0, start - CONTEXT_CHARS):start]
+                    if len(before) < CONTEXT_CHARS:
+                        before = history[max(0, len(history) - (CONTEXT_CHARS - len(before))):] + before
+                    contexts.append({
+                        "before": before,
+                        "match": text[start:end],
+                        "after": text[end:end + CONTEXT_CHARS]
+                    })
+                count += 1
+                resume = end
+
+            if final:
+                return count, contexts
+            history = (history + text[:cut])[-CONTEXT_CHARS:]
+            carry = text[cut:]
+            resume = max(0, resume - cut)
+
+
+def literal_term(search_term: str, regex: bool) -> Optional[str]:
+    """
+    Get the literal text a search requires, if it is a plain string
+
+    Args:
+        search_term: Search term
+        regex: Whether search_term is a regular expression
+
+    Returns:
+        The literal text, or None for regular expressions with special characters
+    """
+    if not regex or re.escape(search_term) == search_term:
+        return search_term
+    return None
+
+
+class TrigramIndex:
+    """
+    Persistent index of the lower-case character trigrams in files
+
+    A file can only contain a literal term if it contains every trigram of
+    it, so searches read just the files whose trigrams cover the term's.
+    Files are re-indexed when their size or modification time changes.
+    Changes are written behind, at most every INDEX_SAVE_DELAY seconds and
+    at exit, unless saved with wait=True.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, logger=None):
+        """
+        Initialize the index, loading it from disk if it exists
+
+        Args:
+            path: Index file path
+            logger: Optional logging function
+        """
+        self.path = path
+        self.log = logger or print
+        self.lock = threading.RLock()
+        self.files: Dict[str, Dict[str, int]] = {}  # path -> id, size, mtime_ns
+        self.postings: Dict[str, Set[int]] = {}  # trigram -> file ids
+        self.trigrams: Dict[str, List[str]] = {}  # path -> its trigrams, to unindex it
+        self.next_id = 0
+        self.dirty = False
+        self.load()
+
+    def load(self) -> bool:
+        """
+        Load the index from disk
+
+        Returns:
+            True if an index was loaded
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                return False
+            with self.lock:
+                self.files = data["files"]
+                self.postings = {trigram: set(ids) for trigram, ids in data["postings"].items()}
+                self.next_id = data["next_id"]
+                # Not stored: rebuilt from the postings
+                paths = {entry["id"]: path for path, entry in self.files.items()}
+                self.trigrams = {path: [] for path in self.files}
+                for trigram, ids in self.postings.items():
+                    for file_id in ids:
+                        path = paths.get(file_id)
+                        if path is not None:
+                            self.trigrams[path].append(trigram)
+            return True
+        except Exception as e:
+            self.log(f"[Search Error] Failed to load search index {self.path}: {e}")
+            return False
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Build the data written to disk and mark the index clean"""
+        with self.lock:
+            data = {
+                "version": self.VERSION,
+                "next_id": self.next_id,
+                "files": {path: dict(entry) for path, entry in self.files.items()},
+                "postings": {trigram: sorted(ids) for trigram, ids in self.postings.items()}
+            }
+            self.dirty = False
+        return data
+
+    def save(self, wait: bool = False) -> bool:
+        """
+        Write the index to disk atomically, if it changed
+
+        Args:
+            wait: Write now instead of after INDEX_SAVE_DELAY seconds;
+                the data is taken when the file is written either way
+
+        Returns:
+            True if the index is saved or queued
+        """
+        with self.lock:
+            if not self.dirty:
+                return True
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        except OSError as e:
+            self.log(f"[Search Error] Failed to save search index {self.path}: {e}")
+            return False
+        store = get_json_store()
+        if wait and store.has_pending(self.path):
+            store.flush(self.path)
+            return True
+        return store.save(self.path, self._snapshot, compact=True, wait=wait, delay=INDEX_SAVE_DELAY)
+
+    @staticmethod
+    def file_trigrams(file_path: str, block_size: int = BLOCK_SIZE) -> Set[str]:
+        """
+        Collect the lower-case trigrams of a file, reading it block by block
+
+        Args:
+            file_path: Path to the file
+            block_size: Characters read at a time
+
+        Returns:
+            Set of trigrams
+        """
+        trigrams: Set[str] = set()
+        tail = ""
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            for block in iter(lambda: f.read(block_size), ""):
+                text = tail + block.lower()
+                trigrams.update(text[i:i + 3] for i in range(len(text) - 2))
+                tail = text[-2:]
+        return trigrams
+
+    def _unindex(self, file_path: str) -> None:
+        """Drop a file's postings (lock held)"""
+        entry = self.files.pop(file_path, None)
+        if entry is None:
+            return
+        file_id = entry["id"]
+        for trigram in self.trigrams.pop(file_path, ()):
+            ids = self.postings.get(trigram)
+            if ids is None:
+                continue
+            ids.discard(file_id)
+            if not ids:
+                del self.postings[trigram]
+        self.dirty = True
+
+    def stale(self, paths: Iterable[str]) -> List[Tuple[str, int, int]]:
+        """
+        Find the files that are new or changed since they were indexed
+
+        Args:
+            paths: File paths
+
+        Returns:
+            (path, size, mtime_ns) of each file that needs indexing
+        """
+        result = []
+        with self.lock:
+            for file_path in paths:
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entry = self.files.get(file_path)
+                if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                    result.append((file_path, stat.st_size, stat.st_mtime_ns))
+        return result
+
+    def add(self, file_path: str, size: int, mtime_ns: int, trigrams: Set[str]) -> None:
+        """
+        Index (or re-index) a file
+
+        Args:
+            file_path: Path to the file
+            size: File size when its trigrams were collected
+            mtime_ns: Modification time when its trigrams were collected
+            trigrams: Trigrams of the file (see file_trigrams)
+        """
+        with self.lock:
+            self._unindex(file_path)
+            file_id = self.next_id
+            self.next_id += 1
+            self.files[file_path] = {"id": file_id, "size": size, "mtime_ns": mtime_ns}
+            self.trigrams[file_path] = list(trigrams)
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, set()).add(file_id)
+            self.dirty = True
+
+    def prune(self, directory: str, present: Set[str]) -> int:
+        """
+        Drop the indexed files under a directory that are not present any more
+
+        A listing may be filtered by extension, so files missing from it are
+        only dropped once they no longer exist.
+
+        Args:
+            directory: Directory that was listed
+            present: Files found in it
+
+        Returns:
+            Number of files dropped
+        """
+        prefix = os.path.join(directory, "")
+        with self.lock:
+            gone = [path for path in self.files
+                    if path.startswith(prefix) and path not in present and not os.path.exists(path)]
+            for file_path in gone:
+                self._unindex(file_path)
+        return len(gone)
+
+    def candidates(self, term: str) -> Optional[Set[str]]:
+        """
+        Get the indexed files that may contain a literal term
+
+        Args:
+            term: Literal search term
+
+        Returns:
+            Paths of the candidate files, or None when the term is too short
+            to narrow the search
+        """
+        term = term.lower()
+        if len(term) < 3:
+            return None
+        trigrams = {term[i:i + 3] for i in range(len(term) - 2)}
+        with self.lock:
+            ids = None
+            for trigram in sorted(trigrams, key=lambda t: len(self.postings.get(t, ()))):
+                postings = self.postings.get(trigram)
+                if not postings:
+                    return set()
+                ids = set(postings) if ids is None else ids & postings
+                if not ids:
+                    return set()
+            return {path for path, entry in self.files.items() if entry["id"] in ids}
@@ -0,0 +1,76 @@
+"""
+File walker - Single-pass, lazy directory traversal built on os.scandir
+"""
+import os
+import fnmatch
+from typing import List, Optional, Iterator, Callable, Iterable
+
+
+def walk_entries(directory: str,
+                 extensions: Optional[Iterable[str]] = None,
+                 max_depth: Optional[int] = None,
+                 ignore: Optional[Iterable[str]] = None,
+                 include_dirs: bool = False,
+                 follow_links: bool = False,
+                 onerror: Optional[Callable[[str, OSError], None]] = None) -> Iterator[os.DirEntry]:
+    """
+    Walk a directory tree, yielding its entries as they are found
+
+    Entries come in the order os.walk would list them: a directory's
+    entries in listing order, then the contents of each subdirectory in
+    turn. They are os.DirEntry objects, whose is_dir()/is_file() answers
+    come from the directory listing and whose stat() result is cached, so
+    callers need no extra stat calls per path.
+
+    Args:
+        directory: Directory to walk
+        extensions: Only yield files whose name ends with one of these
+            (all extensions are checked in the same traversal)
+        max_depth: Directory levels to descend into; entries directly in
+            directory are at depth 1 (None for no limit)
+        ignore: fnmatch patterns of file and directory names to skip;
+            ignored directories are not descended into
+        include_dirs: Also yield directories, where they are listed
+        follow_links: Descend into symbolic links to directories
+        onerror: Optional function called with (path, error) for directories
+            that cannot be listed; they are skipped either way
+
+    Yields:
+        os.DirEntry objects
+    """
+    suffixes = tuple(extensions) if extensions else None
+    patterns = list(ignore) if ignore else []
+
+    def ignored(name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+    # Depth-first, so subdirectories are finished in listing order
+    stack = [(directory, 1)]
+    while stack:
+        path, depth = stack.pop()
+        subdirectories: List[os.DirEntry] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if patterns and ignored(entry.name):
+                        continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        subdirectories.append(entry)
+                        if include_dirs:
+                            yield entry
+                    elif suffixes is None or entry.name.endswith(suffixes):
+                        yield entry
+        except OSError as e:
+            if onerror:
+                onerror(path, e)
+            continue
+
+        descend = [
+            (entry.path, depth + 1) for entry in subdirectories
+            if (max_depth is None or depth < max_depth) and (follow_links or not entry.is_symlink())
+        ]
+        stack.extend(reversed(descend))
@@ -0,0 +1,336 @@
+"""
+JSON Store - Atomic, write-behind JSON persistence shared by the application
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Any, Dict, Optional, Callable, Union
+
+# Seconds a deferred save waits for further saves to the same path
+DEFAULT_FLUSH_DELAY = 0.25
+
+# Longest a burst of saves can hold back the write of a path
+DEFAULT_MAX_DELAY = 2.0
+
+
+def serialize_json(data: Any, indent: Optional[int] = 2, compact: bool = False,
+                   ensure_ascii: bool = True) -> bytes:
+    """
+    Serialize data to JSON bytes
+
+    Args:
+        data: Data to serialize
+        indent: Indentation for human-readable files
+        compact: Minimal separators and no indentation, for machine-only files
+        ensure_ascii: Escape non-ASCII characters
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if compact:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=ensure_ascii)
+    else:
+        text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
+    return text.encode("utf-8")
+
+
+def write_atomic(path: str, payload: bytes, fsync: bool = True) -> None:
+    """
+    Replace a file's contents atomically
+
+    The payload is written to a temporary file next to the target and
+    renamed over it, so readers see either the old or the new file, never
+    a partial one.
+
+    Args:
+        path: Target path
+        payload: New contents
+        fsync: Flush the temporary file to disk before the rename
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: str, data: Any, indent: Optional[int] = 2, compact: bool = False,
+                      ensure_ascii: bool = True) -> None:
+    """
+    Write JSON to a file atomically, on the calling thread
+
+    Args:
+        path: Target path
+        data: Data to serialize
+        indent: Indentation for human-readable files
+        compact: Minimal separators and no indentation, for machine-only files
+        ensure_ascii: Escape non-ASCII characters
+
+    Raises:
+        OSError: If the file cannot be written
+        TypeError, ValueError: If data cannot be serialized
+    """
+    write_atomic(path, serialize_json(data, indent, compact, ensure_ascii))
+
+
+class JSONStore:
+    """
+    Writes JSON files atomically from a background thread
+
+    Saves to the same path within the flush delay are coalesced into one
+    write of the latest data. Data can be handed over as a value, which is
+    serialized right away so later changes by the caller cannot leak into
+    the file, or as a callable returning the value, which is only called
+    when the file is written. Pending writes are flushed at interpreter exit.
+    """
+
+    def __init__(self, flush_delay: float = DEFAULT_FLUSH_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 logger: Optional[Callable] = None):
+        """
+        Initialize the store
+
+        Args:
+            flush_delay: Seconds a save waits for further saves to the same path
+            max_delay: Longest a burst of saves can hold back a write
+            logger: Optional logging function
+        """
+        self.flush_delay = flush_delay
+        self.max_delay = max_delay
+        self.log = logger or print
+
+        # path -> pending write: payload (bytes or callable), options, due and first-queued times
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        # Paths being written right now; one write per path at a time
+        self.writing: Dict[str, int] = {}
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+        self.stats = {"saves": 0, "writes": 0, "coalesced": 0, "errors": 0}
+
+    def save(self, path: str, data: Union[Any, Callable[[], Any]], indent: Optional[int] = 2,
+             compact: bool = False, ensure_ascii: bool = True, wait: bool = False,
+             delay: Optional[float] = None) -> bool:
+        """
+        Save JSON to a file
+
+        Args:
+            path: Target path
+            data: Data to serialize, or a callable returning it at write time
+            indent: Indentation for human-readable files
+            compact: Minimal separators and no indentation, for machine-only files
+            ensure_ascii: Escape non-ASCII characters
+            wait: Write on the calling thread and return once the file is replaced
+            delay: Seconds to wait for further saves (defaults to flush_delay)
+
+        Returns:
+            True if the data was written (wait=True) or queued, False otherwise
+        """
+        path = os.path.abspath(path)
+        options = {"indent": indent, "compact": compact, "ensure_ascii": ensure_ascii}
+        try:
+            payload = data if callable(data) else serialize_json(data, **options)
+        except (TypeError, ValueError) as e:
+            self.log(f"[JSON Error] Failed to serialize data for {path}: {e}")
+            return False
+
+        if wait or self.closed:
+            with self.condition:
+                # A queued older version must not overwrite this one later
+                self.pending.pop(path, None)
+                self.stats["saves"] += 1
+            return self._write_now(path, payload, options)
+
+        now = time.monotonic()
+        with self.condition:
+            self.stats["saves"] += 1
+            entry = self.pending.get(path)
+            first = entry["first"] if entry else now
+            if entry:
+                self.stats["coalesced"] += 1
+            wait_for = self.flush_delay if delay is None else delay
+            self.pending[path] = {
+                "payload": payload,
+                "options": options,
+                "first": first,
+                "due": min(now + wait_for, first + max(self.max_delay, wait_for)),
+            }
+            self._ensure_thread()
+            self.condition.notify_all()
+        return True
+
+    def _ensure_thread(self) -> None:
+        """Start the flusher thread if it is not running (condition held)"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="JSONStoreFlusher", daemon=True)
+            self.thread.start()
+
+    def _run(self) -> None:
+        """Flusher thread: write pending files once they are due"""
+        while True:
+            with self.condition:
+                while not self.closed:
+                    # Paths being written are held back until that write is done
+                    dues = [entry["due"] for path, entry in self.pending.items() if path not in self.writing]
+                    if dues:
+                        now = time.monotonic()
+                        due = min(dues)
+                        if due <= now:
+                            break
+                        self.condition.wait(due - now)
+                    else:
+                        self.condition.wait()
+                if self.closed:
+                    return
+                now = time.monotonic()
+                ready = [(path, self.pending.pop(path)) for path, entry in list(self.pending.items())
+                         if entry["due"] <= now and path not in self.writing]
+                for path, _ in ready:
+                    self.writing[path] = 1
+
+            for path, entry in ready:
+                try:
+                    self._write(path, entry["payload"], entry["options"])
+                finally:
+                    self._release(path)
+
+    def _write_now(self, path: str, payload: Union[bytes, Callable[[], Any]], options: Dict[str, Any]) -> bool:
+        """Write one file on the calling thread, after any write of it in progress"""
+        with self.condition:
+            # An older version being written must not land after this one
+            while path in self.writing:
+                self.condition.wait()
+            self.writing[path] = 1
+        try:
+            return self._write(path, payload, options)
+        finally:
+            self._release(path)
+
+    def _release(self, path: str) -> None:
+        """Mark a path as no longer being written"""
+        with self.condition:
+            del self.writing[path]
+            self.condition.notify_all()
+
+    def _write(self, path: str, payload: Union[bytes, Callable[[], Any]], options: Dict[str, Any]) -> bool:
+        """Serialize (if needed) and write one file"""
+        try:
+            if callable(payload):
+                payload = serialize_json(payload(), **options)
+            write_atomic(path, payload)
+            with self.condition:
+                self.stats["writes"] += 1
+            return True
+        except Exception as e:
+            with self.condition:
+                self.stats["errors"] += 1
+            self.log(f"[JSON Error] Failed to save to {path}: {e}")
+            return False
+
+    def flush(self, path: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Write pending saves now and wait for them
+
+        Args:
+            path: Only flush this path (all paths when None)
+            timeout: Longest time to wait for writes already in progress
+
+        Returns:
+            True if nothing is left pending or being written
+        """
+        if path is not None:
+            path = os.path.abspath(path)
+        with self.condition:
+            if path is None:
+                ready = list(self.pending.items())
+                self.pending.clear()
+            else:
+                entry = self.pending.pop(path, None)
+                ready = [(path, entry)] if entry else []
+
+        ok = True
+        for ready_path, entry in ready:
+            ok = self._write_now(ready_path, entry["payload"], entry["options"]) and ok
+
+        # Wait for writes the flusher thread already started
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while (self.writing if path is None else path in self.writing):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return ok
+
+    def has_pending(self, path: Optional[str] = None) -> bool:
+        """
+        Check whether saves are waiting to be written
+
+        Args:
+            path: Only check this path (any path when None)
+
+        Returns:
+            True if a write is pending or in progress
+        """
+        with self.condition:
+            if path is None:
+                return bool(self.pending or self.writing)
+            path = os.path.abspath(path)
+            return path in self.pending or path in self.writing
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics
+
+        Returns:
+            Dictionary with save, write, coalesced and error counts and the
+            number of pending paths
+        """
+        with self.condition:
+            return {**self.stats, "pending": len(self.pending)}
+
+    def close(self) -> None:
+        """Flush every pending save and stop the flusher thread; later saves write synchronously"""
+        self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+        # Saves queued while closing
+        self.flush()
+
+
+_store: Optional[JSONStore] = None
+_store_lock = threading.Lock()
+
+
+def get_json_store() -> JSONStore:
+    """
+    Get the application-wide JSON store, which is flushed at exit
+
+    Returns:
+        JSONStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JSONStore()
+            atexit.register(_store.close)
+        return _store
@@ -9,10 +9,14 @@ This module provides improved PDF text extraction capabilities using:
 
 import os
 import re
+import time
 import fitz  # PyMuPDF
 import base64
-from typing import Tuple, List, Dict, Any, Optional
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Tuple, List, Dict, Any, Optional, Iterator
 from file_operations.file_ops import FileOps
+from file_operations.extraction_cache import ExtractionCache
 
 # Try to import OCR dependencies, but make them optional
 try:
@@ -23,20 +27,67 @@ try:
 except ImportError:
     HAS_OCR = False
 
+# Cleanup patterns, compiled once
+_BLANK_LINES = re.compile(r'\n{3,}')
+# Control characters (except tab/newline/CR), Latin-1 bytes and replacement characters
+_CONTROL = r'\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\xFF\uFFFD'
+# Common PDF encoding issues with math symbols
+_MATH_SYMBOLS = {"α": "alpha", "β": "beta", "γ": "gamma",
+                 "Δ": "Delta", "π": "pi", "∞": "infinity"}
+
+_MATH = "".join(_MATH_SYMBOLS)
+
+# Every per-page cleanup step as one alternation, applied in a single scan.
+# Hyphenated breaks and space runs may contain control characters and
+# hyphenated breaks may join math symbols, as the separate passes this
+# replaces removed and spelled those out before handling breaks and spaces.
+_PAGE_CLEANUP = re.compile(
+    r'(?P<blank>\n{3,})'
+    rf'|(?P<hyphen>(?P<left>[a-zA-Z{_MATH}])[{_CONTROL}]*-[ {_CONTROL}]*\n[ {_CONTROL}]*'
+    rf'(?P<right>[a-zA-Z]|(?=[{_MATH}])))'
+    rf'|(?P<control>[{_CONTROL}]+)'
+    rf'|(?P<math>[{_MATH}])'
+    rf'|(?P<spaces> [ {_CONTROL}]+)'
+)
+_PAGE_CLEANUP_REPLACEMENTS = {
+    "blank": lambda match: "\n\n",
+    # A symbol after the break is left for the next match, since its spelled
+    # out name can itself end in a hyphenated break
+    "hyphen": lambda match: _MATH_SYMBOLS.get(match.group("left"), match.group("left")) + match.group("right"),
+    "control": lambda match: "",
+    "math": lambda match: _MATH_SYMBOLS[match.group()],
+    "spaces": lambda match: " ",
+}
+
+# Occurrences after which a line longer than HEADER_MIN_LENGTH characters
+# counts as a repeated header or footer
+HEADER_REPEATS = 3
+HEADER_MIN_LENGTH = 5
+
+# Pages held back by iter_pages while it learns repeated headers and footers,
+# and the number of lines at the top and bottom of a page that may be one
+HEADER_WINDOW = 8
+EDGE_LINES = 3
+
+# Documents shorter than this are extracted in-process unless OCR is on;
+# starting worker processes costs more than it saves on small files
+PARALLEL_MIN_PAGES = 32
+
 
 class PDFFileOps:
     """Extends FileOps with enhanced PDF handling capabilities"""
     
-    def __init__(self, file_ops: FileOps, enable_ocr: bool = False):
+    def __init__(self, file_ops: FileOps, enable_ocr: bool = False, cache: Optional[ExtractionCache] = None):
         """
         Initialize PDF file operations
         
         Args:
             file_ops: Base FileOps instance
             enable_ocr: Whether to enable OCR for image-based text
+            cache: Optional cache of extracted pages
         """
         self.file_ops = file_ops
-        self.pdf_extractor = get_pdf_extractor(logger=file_ops.log, enable_ocr=enable_ocr)
+        self.pdf_extractor = get_pdf_extractor(logger=file_ops.log, enable_ocr=enable_ocr, cache=cache)
         
     def read_pdf(self, file_path: str) -> Tuple[bool, str]:
         """
@@ -61,6 +112,26 @@ class PDFFileOps:
         # Extract text from PDF using enhanced extractor
         return self.pdf_extractor.extract_text_from_pdf(file_path)
         
+    def iter_pdf_pages(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream cleaned pages of a PDF file
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Yields:
+            Page dictionaries (see EnhancedPDFExtractor.iter_pages)
+        """
+        if not os.path.exists(file_path):
+            self.file_ops.log(f"[PDF] File not found: {file_path}")
+            return
+            
+        if not file_path.lower().endswith(".pdf"):
+            self.file_ops.log(f"[PDF] Not a PDF file: {file_path}")
+            return
+            
+        yield from self.pdf_extractor.iter_pages(file_path)
+        
     def get_pdf_metadata(self, file_path: str) -> Dict[str, Any]:
         """
         Get metadata from a PDF file
@@ -115,24 +186,38 @@ class PDFFileOps:
             self.file_ops.log(f"[PDF] Error getting metadata: {e}")
             return {"error": str(e)}
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the extraction cache
+        
+        Returns:
+            Dictionary with cache statistics (empty when caching is off)
+        """
+        cache = self.pdf_extractor.cache
+        return cache.stats() if cache is not None else {}
+
     @staticmethod
-    def extend_file_ops(file_ops: FileOps, enable_ocr: bool = False) -> "PDFFileOps":
+    def extend_file_ops(file_ops: FileOps, enable_ocr: bool = False,
+                        cache: Optional[ExtractionCache] = None) -> "PDFFileOps":
         """
         Extend a FileOps instance with enhanced PDF capabilities
         
         Args:
             file_ops: The FileOps instance to extend
             enable_ocr: Whether to enable OCR for image-based text
+            cache: Optional cache of extracted pages
             
         Returns:
             PDFFileOps instance
         """
-        return PDFFileOps(file_ops, enable_ocr=enable_ocr)
+        return PDFFileOps(file_ops, enable_ocr=enable_ocr, cache=cache)
 
 class EnhancedPDFExtractor:
     """Enhanced PDF extraction with preprocessing and OCR capabilities"""
     
-    def __init__(self, logger=None, ocr_enabled=False, ocr_lang="eng"):
+    def __init__(self, logger=None, ocr_enabled=False, ocr_lang="eng",
+                 workers: Optional[int] = None, page_timeout: float = 120.0,
+                 cache: Optional[ExtractionCache] = None):
         """
         Initialize the PDF extractor with optional OCR support
         
@@ -140,10 +225,17 @@ class EnhancedPDFExtractor:
             logger: Optional logging function
             ocr_enabled: Whether to use OCR when text extraction fails
             ocr_lang: Language for OCR (default: English)
+            workers: Worker processes for page extraction (None for one per
+                CPU, 1 to extract in-process)
+            page_timeout: Seconds allowed per page before it is given up on
+            cache: Optional cache of extracted pages, reused across imports
         """
         self.logger = logger or print
         self.ocr_enabled = ocr_enabled and HAS_OCR
         self.ocr_lang = ocr_lang
+        self.workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        self.page_timeout = page_timeout
+        self.cache = cache
         
         # If OCR is enabled but dependencies aren't installed, log a warning
         if ocr_enabled and not HAS_OCR:
@@ -165,33 +257,18 @@ class EnhancedPDFExtractor:
             
         try:
             self.logger(f"[PDF] Extracting text from {os.path.basename(pdf_path)}")
-            document = fitz.open(pdf_path)
             
             content = []
             images_processed = 0
             
-            for page_num, page in enumerate(document):
-                # First try regular text extraction
-                text = page.get_text("text")
-                
-                # If page has very little text and OCR is enabled, try OCR
-                if len(text.strip()) < 100 and self.ocr_enabled:
-                    # Only process the page with OCR if it likely contains images
-                    if page.get_images():
-                        ocr_text = self._ocr_page(page, page_num)
-                        if ocr_text.strip():
-                            text = ocr_text
-                            images_processed += 1
-                
-                # Clean and preprocess the text
-                text = self._preprocess_text(text)
+            for page_num, text, used_ocr in self._extract_pages(pdf_path):
+                if used_ocr:
+                    images_processed += 1
                 
                 # Add page number as metadata
                 page_header = f"\n\n--- Page {page_num + 1} ---\n\n"
                 content.append(page_header + text)
             
-            document.close()
-            
             if images_processed > 0:
                 self.logger(f"[PDF] Used OCR on {images_processed} pages with minimal text")
                 
@@ -206,67 +283,318 @@ class EnhancedPDFExtractor:
             self.logger(f"[PDF] Error extracting text: {e}")
             return False, f"Error: {str(e)}"
     
-    def _preprocess_text(self, text: str) -> str:
-        """Clean and normalize extracted text"""
-        # Replace multiple newlines with double newline
-        text = re.sub(r'\n{3,}', '\n\n', text)
+    def iter_pages(self, pdf_path: str, window: int = HEADER_WINDOW) -> Iterator[Dict[str, Any]]:
+        """
+        Extract a PDF page by page, yielding cleaned pages as they are ready
         
-        # Remove null bytes and other control characters except newlines and tabs
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\xFF]', '', text)
+        Only a window of pages is held at a time. Lines near the top or bottom
+        of a page that recur on at least HEADER_REPEATS pages seen so far are
+        treated as headers/footers and removed (see _apply_global_cleaning for
+        how this differs from whole-document cleaning), so a page is yielded once the window
+        after it has been extracted.
         
-        # Replace Unicode replacement characters
-        text = text.replace("\uFFFD", "")
+        Args:
+            pdf_path: Path to the PDF file
+            window: Pages to look ahead for repeated headers and footers
+            
+        Yields:
+            Dictionaries with "page" (1-based), "page_count", "text" (ending
+            with a newline unless empty) and "ocr" (whether OCR produced the text)
+        """
+        with fitz.open(pdf_path) as document:
+            page_count = len(document)
+        self.logger(f"[PDF] Streaming text from {os.path.basename(pdf_path)} ({page_count} pages)")
         
-        # Fix common PDF encoding issues with math symbols
-        text = text.replace("α", "alpha")
-        text = text.replace("β", "beta")
-        text = text.replace("γ", "gamma")
-        text = text.replace("Δ", "Delta")
-        text = text.replace("π", "pi")
-        text = text.replace("∞", "infinity")
+        line_counts: Dict[str, int] = {}
+        pending = deque()
+        images_processed = 0
         
-        # Clean up excessive whitespace without removing paragraph breaks
-        text = re.sub(r' {2,}', ' ', text)
+        def finish(page_num: int, text: str, used_ocr: bool) -> Dict[str, Any]:
+            lines = [line for line in text.split("\n") if line_counts.get(line.strip(), 0) < HEADER_REPEATS]
+            text = _BLANK_LINES.sub('\n\n', "\n".join(lines))
+            # Consumers concatenate pages, so a page never runs into the next one
+            if text and not text.endswith("\n"):
+                text += "\n"
+            return {"page": page_num + 1, "page_count": page_count, "text": text, "ocr": used_ocr}
         
-        # Fix hyphens at end of lines (attempt to identify hyphenated words)
-        text = re.sub(r'([a-zA-Z])- *\n *([a-zA-Z])', r'\1\2', text)
+        for page_num, text, used_ocr in self._extract_pages(pdf_path):
+            images_processed += used_ocr
+            for line in set(self._edge_lines(text)):
+                line_counts[line] = line_counts.get(line, 0) + 1
+            pending.append((page_num, text, used_ocr))
+            if len(pending) > window:
+                yield finish(*pending.popleft())
+                
+        while pending:
+            yield finish(*pending.popleft())
+            
+        if images_processed > 0:
+            self.logger(f"[PDF] Used OCR on {images_processed} pages with minimal text")
+    
+    @staticmethod
+    def _edge_lines(text: str) -> List[str]:
+        """
+        Get the lines at the top and bottom of a page that could be a header or footer
         
-        return text
+        Args:
+            text: Page text
+            
+        Returns:
+            Stripped lines longer than HEADER_MIN_LENGTH characters
+        """
+        lines = [line.strip() for line in text.split("\n") if len(line.strip()) > HEADER_MIN_LENGTH]
+        return lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+    
+    def _extract_pages(self, pdf_path: str) -> Iterator[Tuple[int, str, bool]]:
+        """
+        Extract and preprocess every page, in order
+        
+        With a cache, an unchanged file is served from it without being
+        opened, and otherwise only the pages whose content is not cached
+        are extracted.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Yields:
+            Tuples of (page number, preprocessed text, whether OCR was used)
+        """
+        if self.cache is None:
+            with fitz.open(pdf_path) as document:
+                page_count = len(document)
+            for page_num, text, used_ocr, _ in self._extract_page_numbers(pdf_path, list(range(page_count))):
+                yield page_num, text, used_ocr
+            return
+            
+        variant = self._cache_variant()
+        document_key = self.cache.document_key(pdf_path, variant)
+        page_keys = self.cache.get_document(document_key)
+        if page_keys is not None:
+            pages = [self.cache.get_page(key) for key in page_keys]
+            if all(page is not None for page in pages):
+                self.logger(f"[PDF] Using cached text for {os.path.basename(pdf_path)}")
+                for page_num, (text, used_ocr) in enumerate(pages):
+                    yield page_num, text, used_ocr
+                return
+                
+        with fitz.open(pdf_path) as document:
+            page_keys = [self.cache.page_key(self._page_fingerprint(document, page), variant) for page in document]
+        cached = {}
+        for page_num, key in enumerate(page_keys):
+            page = self.cache.get_page(key)
+            if page is not None:
+                cached[page_num] = page
+        if cached:
+            self.logger(f"[PDF] Reusing {len(cached)} of {len(page_keys)} cached pages of {os.path.basename(pdf_path)}")
+            
+        extracted = self._extract_page_numbers(
+            pdf_path, [page_num for page_num in range(len(page_keys)) if page_num not in cached])
+        complete = True
+        try:
+            for page_num, key in enumerate(page_keys):
+                if page_num in cached:
+                    yield (page_num,) + cached[page_num]
+                    continue
+                _, text, used_ocr, finished = next(extracted)
+                if finished:
+                    self.cache.put_page(key, text, used_ocr)
+                else:
+                    complete = False
+                yield page_num, text, used_ocr
+        finally:
+            extracted.close()
+            
+        if complete:
+            self.cache.put_document(document_key, page_keys)
+    
+    def _cache_variant(self) -> str:
+        """Describe the settings extracted text depends on, for cache keys"""
+        return f"ocr={self.ocr_lang}" if self.ocr_enabled else "ocr=off"
+    
+    @staticmethod
+    def _page_fingerprint(document, page) -> bytes:
+        """
+        Get bytes that change whenever the text extracted from a page could
+        
+        Covers the page's content stream, the XObjects (forms and images) it
+        draws and the fonts it uses.
+        
+        Args:
+            document: PyMuPDF document
+            page: PyMuPDF page of document
+            
+        Returns:
+            Fingerprint bytes
+        """
+        parts = [page.read_contents()]
+        xrefs = {item[0] for item in page.get_xobjects()} | {item[0] for item in page.get_images(full=True)}
+        for xref in sorted(xrefs):
+            parts.append(document.xref_stream_raw(xref) or b"")
+        parts.append(repr(page.get_fonts(full=True)).encode("utf-8"))
+        return b"\0".join(parts)
+    
+    def _extract_page_numbers(self, pdf_path: str, page_numbers: List[int]) -> Iterator[Tuple[int, str, bool, bool]]:
+        """
+        Extract and preprocess the given pages, in order
+        
+        Large batches (and any batch when OCR is on) are split into runs of
+        consecutive pages that worker processes extract concurrently, each
+        with its own document handle; results are yielded in page order as
+        they arrive.
+        
+        Runs are submitted only as workers free up, and each must finish
+        within page_timeout per page of its submission. A worker that misses
+        its deadline cannot be cancelled, so the pool's processes are killed
+        and the runs still in progress are resubmitted to a fresh pool.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            page_numbers: Page numbers to extract, ascending
+            
+        Yields:
+            Tuples of (page number, preprocessed text, whether OCR was used,
+            whether extraction finished rather than timed out)
+        """
+        if not page_numbers:
+            return
+            
+        if self.workers <= 1 or len(page_numbers) <= 1 or (
+                len(page_numbers) < PARALLEL_MIN_PAGES and not self.ocr_enabled):
+            with fitz.open(pdf_path) as document:
+                for page_num in page_numbers:
+                    yield (page_num,) + self._extract_page(document[page_num], page_num) + (True,)
+            return
+                
+        # OCR pages go out one at a time so slow pages do not hold up a range
+        workers = min(self.workers, len(page_numbers))
+        range_size = 1 if self.ocr_enabled else max(1, len(page_numbers) // (workers * 4))
+        ranges = []
+        for page_num in page_numbers:
+            if ranges and ranges[-1][1] == page_num and page_num - ranges[-1][0] < range_size:
+                ranges[-1][1] = page_num + 1
+            else:
+                ranges.append([page_num, page_num + 1])
+        
+        waiting = deque(ranges)
+        running = deque()  # [start, stop, future, deadline] in page order
+        executor = ProcessPoolExecutor(max_workers=workers)
+        
+        def submit(start: int, stop: int) -> list:
+            future = executor.submit(_extract_page_range, pdf_path, start, stop, self.ocr_enabled, self.ocr_lang)
+            return [start, stop, future, time.monotonic() + self.page_timeout * (stop - start)]
+            
+        def top_up() -> None:
+            # Keep every worker busy without queueing runs behind each other,
+            # so a run's deadline starts when a worker picks it up
+            busy = sum(1 for item in running if not item[2].done())
+            while waiting and busy < workers:
+                running.append(submit(*waiting.popleft()))
+                busy += 1
+                
+        try:
+            top_up()
+            while running:
+                start, stop, future, deadline = running[0]
+                while not future.done() and time.monotonic() < deadline:
+                    wait([item[2] for item in running if not item[2].done()],
+                         timeout=deadline - time.monotonic(), return_when=FIRST_COMPLETED)
+                    top_up()
+                running.popleft()
+                
+                finished = future.done()
+                if finished:
+                    pages, messages = future.result()
+                else:
+                    self.logger(f"[PDF] Timed out extracting pages {start + 1}-{stop} of {os.path.basename(pdf_path)}")
+                    pages, messages = [("", False)] * (stop - start), []
+                    
+                    # Kill the hung worker (and its pool) and resubmit the runs
+                    # that had not completed to a fresh pool
+                    _terminate_workers(executor)
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                    for item in running:
+                        if not item[2].done() or item[2].exception() is not None:
+                            item[:] = submit(item[0], item[1])
+                            
+                for message in messages:
+                    self.logger(message)
+                for offset, (text, used_ocr) in enumerate(pages):
+                    yield start + offset, text, used_ocr, finished
+                top_up()
+        finally:
+            # Runs still in progress (e.g. the consumer stopped early) are not needed
+            if any(not item[2].done() for item in running):
+                _terminate_workers(executor)
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _extract_page(self, page, page_num: int) -> Tuple[str, bool]:
+        """
+        Extract and preprocess one page
+        
+        Args:
+            page: PyMuPDF page
+            page_num: Zero-based page number
+            
+        Returns:
+            Tuple with the preprocessed text and whether OCR was used
+        """
+        # First try regular text extraction
+        text = page.get_text("text")
+        used_ocr = False
+        
+        # If page has very little text and OCR is enabled, try OCR
+        if len(text.strip()) < 100 and self.ocr_enabled:
+            # Only process the page with OCR if it likely contains images
+            if page.get_images():
+                ocr_text = self._ocr_page(page, page_num)
+                if ocr_text.strip():
+                    text = ocr_text
+                    used_ocr = True
+        
+        # Clean and preprocess the text
+        return self._preprocess_text(text), used_ocr
+    
+    def _preprocess_text(self, text: str) -> str:
+        """
+        Clean and normalize extracted text
+        
+        Collapses blank line runs, removes control characters, spells out
+        common math symbols, collapses space runs and joins hyphenated line
+        breaks, all in one scan of the text.
+        """
+        return _PAGE_CLEANUP.sub(lambda match: _PAGE_CLEANUP_REPLACEMENTS[match.lastgroup](match), text)
     
     def _apply_global_cleaning(self, text: str) -> str:
-        """Apply global text cleaning operations"""
+        """
+        Apply global text cleaning operations
+        
+        Lines repeated across the document (likely headers/footers) are found
+        by hashing every line once, then all their occurrences are removed in
+        a single pass of one compiled alternation, tried in first-seen order
+        like the removals it replaces.
+        
+        iter_pages applies the same rule (HEADER_REPEATS occurrences of a
+        line longer than HEADER_MIN_LENGTH) while streaming, but it only
+        considers the EDGE_LINES at the top and bottom of each page, counts
+        only the pages read so far (at most HEADER_WINDOW ahead), and drops
+        whole lines rather than every occurrence of their text.
+        """
         # Remove PDF artifacts like headers/footers that repeat on every page
-        # This uses a heuristic to detect repeated lines at page boundaries
-        lines = text.split('\n')
-        repeated_lines = self._find_repeated_lines(lines)
+        repeated_lines = self._find_repeated_lines(text.split('\n'))
         
-        for pattern in repeated_lines:
-            if len(pattern) > 5:  # Only remove if substantial pattern found
-                text = text.replace(pattern, '')
+        if repeated_lines:
+            text = re.compile("|".join(map(re.escape, repeated_lines))).sub('', text)
         
         # Final cleanup of multiple blank lines
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text
+        return _BLANK_LINES.sub('\n\n', text)
     
     def _find_repeated_lines(self, lines: List[str]) -> List[str]:
         """Find lines that repeat across pages (likely headers/footers)"""
-        patterns = []
-        threshold = 3  # Minimum occurrences to consider a line as repeating
-        
-        # Count line frequencies
-        line_counts = {}
-        for line in lines:
-            line_clean = line.strip()
-            if len(line_clean) > 5:  # Ignore very short lines
-                line_counts[line_clean] = line_counts.get(line_clean, 0) + 1
-        
-        # Find repeated lines
-        for line, count in line_counts.items():
-            if count >= threshold:
-                patterns.append(line)
-                
-        return patterns
+        # Count line frequencies, ignoring very short lines
+        line_counts = Counter(map(str.strip, lines))
+        return [line for line, count in line_counts.items()
+                if count >= HEADER_REPEATS and len(line) > HEADER_MIN_LENGTH]
     
     def _ocr_page(self, page, page_num: int) -> str:
         """Extract text from a page using OCR"""
@@ -285,6 +613,44 @@ class EnhancedPDFExtractor:
             self.logger(f"[PDF] OCR failed on page {page_num}: {e}")
             return ""
 
-def get_pdf_extractor(logger=None, enable_ocr=False):
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """
+    Kill the worker processes of a process pool
+    
+    Args:
+        executor: Pool whose workers may be stuck in a page
+    """
+    terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+        return
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+
+def _extract_page_range(pdf_path: str, start: int, stop: int,
+                        ocr_enabled: bool, ocr_lang: str) -> Tuple[List[Tuple[str, bool]], List[str]]:
+    """
+    Extract pages [start, stop) of a PDF in a worker process
+    
+    Args:
+        pdf_path: Path to the PDF file
+        start: First page number
+        stop: Page number after the last page
+        ocr_enabled: Whether to use OCR on pages with little text
+        ocr_lang: Language for OCR
+        
+    Returns:
+        Tuple with (text, used OCR) per page and the log messages produced
+    """
+    messages = []
+    extractor = EnhancedPDFExtractor(logger=messages.append, ocr_enabled=ocr_enabled,
+                                     ocr_lang=ocr_lang, workers=1)
+    with fitz.open(pdf_path) as document:
+        pages = [extractor._extract_page(document[page_num], page_num) for page_num in range(start, stop)]
+    return pages, messages
+
+def get_pdf_extractor(logger=None, enable_ocr=False, workers=None, page_timeout=120.0, cache=None):
     """Factory function to create a PDF extractor"""
-    return EnhancedPDFExtractor(logger=logger, ocr_enabled=enable_ocr)
+    return EnhancedPDFExtractor(logger=logger, ocr_enabled=enable_ocr,
+                                workers=workers, page_timeout=page_timeout, cache=cache)
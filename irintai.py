@@ -145,10 +145,24 @@ def main():
 
         # Initialize EventBus for inter-plugin communication
         event_bus = EventBus(logger=logger.log)
-        event_bus.start()  # Start the asynchronous event processing        # Initialize MemorySystem
+        event_bus.start()  # Start the asynchronous event processing
+        
+        # Publish generation queue metrics on the event bus
+        model_manager.set_event_bus(event_bus)
+        
+        # Initialize MemorySystem
         memory_system = MemorySystem(
             index_path="data/vector_store/vector_store.json",
-            logger=logger.log
+            logger=logger.log,
+            search_mode=config_manager.get("memory.search_mode", "vector"),
+            quantization=config_manager.get("memory.quantization", "none"),
+            rerank=config_manager.get("memory.rerank", False),
+            cache_size=config_manager.get("memory.query_cache_size", 256),
+            recency_weight=config_manager.get("memory.recency_weight", 0.1),
+            importance_weight=config_manager.get("memory.importance_weight", 0.1),
+            recency_half_life=config_manager.get("memory.recency_half_life_days", 30.0),
+            mmr_lambda=config_manager.get("memory.mmr_lambda", 0.7),
+            deduplicate=config_manager.get("memory.deduplicate", True)
         )
 
         # Initialize DependencyManager for plugin dependencies
@@ -162,6 +176,12 @@ def main():
             logger=logger.log
         )
         
+        # Optionally embed session reflections into memory in batches
+        if config_manager.get("memory.embed_reflections", False):
+            chat_engine.enable_reflection_embedding(
+                batch_size=config_manager.get("memory.reflection_batch_size", 8)
+            )
+        
         # Create file operations utility with proper sandboxing
         file_ops = FileOps(
             logger=logger.log
@@ -218,6 +238,13 @@ def main():
         # Perform cleanup when the application exits
         logger.log("Shutting down Irintai Assistant...")
         
+        # Drop any queued generation requests
+        model_manager.scheduler.stop()
+        
+        # Flush reflections still waiting to be embedded
+        if chat_engine.reflection_embedder:
+            chat_engine.reflection_embedder.stop()
+        
         # Stop event bus
         event_bus.stop()
         
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Irintai - Headless batch runner
+
+Pushes a JSONL file of prompts through ChatEngine + MemorySystem + model
+without starting the Tk interface, and writes responses with per-request
+timings (queue wait, retrieval, time to first token, total) as JSONL.
+
+Example:
+    python irintai_batch.py prompts.jsonl --model mistral:instruct -c 4 -o results.jsonl
+"""
+
+# Suppress TensorFlow logging messages
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import sys
+import json
+import argparse
+
+from core.batch_runner import BatchRunner, build_headless_core
+from core.generation_scheduler import PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from utils.logger import IrintaiLogger
+
+PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "normal": PRIORITY_NORMAL,
+    "background": PRIORITY_BACKGROUND,
+}
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Irintai headless batch runner")
+    parser.add_argument("input", help="JSONL file of prompts")
+    parser.add_argument("-o", "--output", default="data/batch/results.jsonl",
+                        help="JSONL file for responses and timings")
+    parser.add_argument("-m", "--model", required=True, help="Ollama model to use")
+    parser.add_argument("-c", "--concurrency", type=int, default=4,
+                        help="Number of concurrent conversations")
+    parser.add_argument("--memory-mode", default="auto", choices=["off", "manual", "auto"],
+                        help="Memory mode for each conversation")
+    parser.add_argument("--no-memory", action="store_true", help="Do not load the memory system")
+    parser.add_argument("--index", default="data/vector_store/vector_store.json",
+                        help="Path to the vector store")
+    parser.add_argument("--config", default="data/config.json", help="Path to the configuration file")
+    parser.add_argument("--system-prompt", default=None, help="Override the system prompt")
+    parser.add_argument("--priority", default="background", choices=sorted(PRIORITIES),
+                        help="Generation priority for batch requests")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Use non-streaming generation (TTFT equals total time)")
+    parser.add_argument("--summary", default=None, help="Optional JSON file for the run summary")
+    parser.add_argument("--verbose", action="store_true", help="Echo log messages to the console")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Headless batch entry point"""
+    args = parse_args(argv)
+
+    logger = IrintaiLogger(log_dir="data/logs")
+
+    def log(message, level="INFO"):
+        logger.log(message, level)
+        if args.verbose:
+            print(message)
+
+    if not os.path.exists(args.input):
+        print(f"Input file not found: {args.input}", file=sys.stderr)
+        return 1
+
+    core = build_headless_core(
+        config_path=args.config,
+        model_name=args.model,
+        use_memory=not args.no_memory,
+        index_path=args.index,
+        logger=log
+    )
+
+    runner = BatchRunner(
+        model_manager=core["model_manager"],
+        memory_system=core["memory_system"],
+        concurrency=args.concurrency,
+        memory_mode="off" if args.no_memory else args.memory_mode,
+        system_prompt=args.system_prompt,
+        priority=PRIORITIES[args.priority],
+        stream=not args.no_stream,
+        logger=log
+    )
+
+    try:
+        summary = runner.run(args.input, args.output)
+        summary["scheduler"] = core["model_manager"].get_queue_stats()
+    finally:
+        core["model_manager"].scheduler.stop()
+        core["event_bus"].stop()
+
+    print(json.dumps(summary, indent=2))
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    return 0 if summary["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,14 @@
 #This module provides integration between the memory system and enhanced PDF capabilities.
 
 import os
-from typing import Tuple, Dict, Any, Optional, List
+import json
+import time
+import hashlib
+import threading
+from typing import Tuple, Dict, Any, Optional, List, Callable
 from core.memory_system import MemorySystem
 from file_operations.pdf_file_ops import PDFFileOps
+from file_operations.extraction_cache import get_extraction_cache, DEFAULT_CACHE_BYTES
 from file_operations.file_ops import FileOps
 
 class EnhancedMemoryFileHandler:
@@ -12,7 +17,8 @@ class EnhancedMemoryFileHandler:
     Enhanced file handler for the memory system with improved PDF handling
     """
     
-    def __init__(self, memory_system: MemorySystem, file_ops: FileOps, enable_ocr: bool = False, logger=None):
+    def __init__(self, memory_system: MemorySystem, file_ops: FileOps, enable_ocr: bool = False, logger=None,
+                 cache_max_bytes: Optional[int] = DEFAULT_CACHE_BYTES):
         """
         Initialize the enhanced memory file handler
         
@@ -21,12 +27,31 @@ class EnhancedMemoryFileHandler:
             file_ops: FileOps instance
             enable_ocr: Whether to enable OCR for PDF files
             logger: Optional logger function
+            cache_max_bytes: Size bound of the PDF extraction cache (None or 0 disables it)
         """
         self.memory_system = memory_system
         self.file_ops = file_ops
-        self.pdf_ops = PDFFileOps.extend_file_ops(file_ops, enable_ocr=enable_ocr)
         self.logger = logger or memory_system.log
         
+        # Extracted PDF pages, shared by every handler on the same index
+        self.extraction_cache = None
+        if cache_max_bytes:
+            cache_dir = os.path.join(os.path.dirname(memory_system.index_path), "extraction_cache")
+            try:
+                self.extraction_cache = get_extraction_cache(cache_dir, cache_max_bytes, logger=self.logger)
+            except OSError as e:
+                self.logger(f"[Memory Error] PDF extraction cache unavailable: {e}")
+        self.pdf_ops = PDFFileOps.extend_file_ops(file_ops, enable_ocr=enable_ocr, cache=self.extraction_cache)
+        
+        # Manifest of indexed folder files: path -> size, mtime, content hash, chunks
+        self.manifest_path = os.path.join(os.path.dirname(memory_system.index_path), "folder_manifest.json")
+        self.manifest = self._load_manifest()
+        self.manifest_lock = threading.RLock()
+        self.last_sync = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+        
+        # Background watchers: folder -> stop event
+        self.watchers: Dict[str, threading.Event] = {}
+        
     def add_file_to_memory(self, file_path: str) -> bool:
         """
         Add a file to the memory system with enhanced handling
@@ -44,15 +69,12 @@ class EnhancedMemoryFileHandler:
         if file_ext == '.pdf':
             return self._add_pdf_to_memory(file_path)
         else:
-            # Use standard file handling for other file types
-            success, content = self.file_ops.read_file(file_path)
-            if success:
-                return self.memory_system.add_file_to_index(file_path, content)
-            return False
+            # Other files are streamed from disk by the memory system's chunker
+            return self.memory_system.add_file_to_index(file_path)
             
     def _add_pdf_to_memory(self, pdf_path: str) -> bool:
         """
-        Add a PDF file to memory with enhanced extraction
+        Add a PDF file to memory with enhanced extraction, page by page
         
         Args:
             pdf_path: Path to the PDF file
@@ -60,51 +82,243 @@ class EnhancedMemoryFileHandler:
         Returns:
             True if PDF was successfully added to memory, False otherwise
         """
-        # Use enhanced PDF extraction
-        success, content = self.pdf_ops.read_pdf(pdf_path)
-        
-        if not success:
+        # Stream cleaned pages straight into chunking and embedding, so the
+        # whole document is never held in memory; chunks record their pages
+        pages = (page["text"] for page in self.pdf_ops.iter_pdf_pages(pdf_path))
+        if not self.memory_system.add_stream_to_index(pdf_path, pages, span_key="page"):
             self.logger(f"[Memory PDF] Failed to extract text from {pdf_path}")
             return False
-            
-        # Get PDF metadata for additional context
-        metadata = self.pdf_ops.get_pdf_metadata(pdf_path)
+        return True
         
-        # Add the extracted content to the memory system
-        return self.memory_system.add_file_to_index(pdf_path, content)
-        
-    def add_folder_to_memory(self, folder_path: str, extensions: Optional[List[str]] = None) -> Tuple[int, int]:
+    def add_folder_to_memory(self, folder_path: str, extensions: Optional[List[str]] = None,
+                             progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Tuple[int, int]:
         """
-        Add all files in a folder to memory
+        Add all files in a folder to memory, incrementally
+        
+        Files whose size and modification time (or, failing that, content hash)
+        match the manifest are skipped, unless their chunks are no longer in
+        the memory store (after clear_index or a manual removal). Changed
+        files have their old chunks replaced, and chunks of files deleted from
+        the folder are removed; files merely outside the extensions of this
+        sync are left alone.
+        Empty files and files that failed to index are recorded too, so they
+        are only retried once they change. A summary of the run is left in
+        self.last_sync.
         
         Args:
             folder_path: Path to the folder
             extensions: Optional list of file extensions to include
+            progress_callback: Optional function called with (done, total, path)
+                before each new or changed file is processed
             
         Returns:
-            Tuple with (number of files processed, number of files successfully added)
+            Tuple with (number of new or changed files processed, number of files successfully added)
         """
         # Get default extensions if not provided
         if extensions is None:
             extensions = self.file_ops.get_supported_extensions()
             
-        # Get all matching files
-        all_files = []
-        for ext in extensions:
-            all_files.extend(self.file_ops.get_files_by_type(folder_path, ext))
+        folder_path = os.path.abspath(folder_path)
+        
+        # Get all matching files in one traversal, keeping their cached stat results
+        entries = {os.path.abspath(entry.path): entry for entry in self.file_ops.walk_files(folder_path, extensions)}
+        all_files = sorted(entries)
+        
+        with self.manifest_lock:
+            summary = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
             
-        # Process each file
-        processed = 0
-        successful = 0
-        
-        for file_path in all_files:
-            processed += 1
-            if self.add_file_to_memory(file_path):
-                successful += 1
+            # Work out which files need (re-)indexing
+            pending = []
+            for file_path in all_files:
+                try:
+                    stat = entries[file_path].stat()
+                except OSError:
+                    continue
+                entry = self.manifest.get(file_path)
+                if entry and not self._entry_in_memory(file_path, entry):
+                    # Its chunks were removed from memory; index it afresh
+                    del self.manifest[file_path]
+                    entry = None
+                if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+                    summary["unchanged"] += 1
+                    continue
+                content_hash = self._hash_file(file_path)
+                if entry and entry["hash"] == content_hash:
+                    # Touched but not modified
+                    entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime_ns
+                    summary["unchanged"] += 1
+                    continue
+                pending.append((file_path, stat, content_hash, entry is not None))
+                
+            # Drop chunks of files that disappeared from the folder; files with
+            # other extensions were not listed, so only missing ones count
+            prefix = os.path.join(folder_path, "")
+            present = set(all_files)
+            suffixes = tuple(extensions) if extensions else None
+            deleted = [path for path in self.manifest
+                       if path.startswith(prefix) and path not in present
+                       and ((suffixes is None or path.endswith(suffixes)) or not os.path.exists(path))]
+            if deleted:
+                self.memory_system.remove_paths(deleted)
+                for path in deleted:
+                    del self.manifest[path]
+                summary["removed"] = len(deleted)
+                
+            # Process each new or changed file
+            successful = 0
+            for i, (file_path, stat, content_hash, changed) in enumerate(pending):
+                if progress_callback:
+                    progress_callback(i, len(pending), file_path)
+                    
+                # Replace whatever an earlier version of the file left behind
+                self.memory_system.remove_paths([file_path])
+                added = self.add_file_to_memory(file_path)
+                if added:
+                    successful += 1
+                    summary["updated" if changed else "added"] += 1
+                else:
+                    summary["failed"] += 1
+                self.manifest[file_path] = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                    "hash": content_hash,
+                    "chunks": len(self.memory_system.get_documents_by_path(file_path)),
+                    "failed": not added
+                }
+                    
+            if progress_callback:
+                progress_callback(len(pending), len(pending), "")
                 
-        return processed, successful
+            self._save_manifest()
+            self.last_sync = summary
+            
+        if pending or deleted:
+            self.logger(f"[Memory] Synced {folder_path}: {summary['added']} added, {summary['updated']} updated, "
+                        f"{summary['removed']} removed, {summary['unchanged']} unchanged")
+        return len(pending), successful
+    
+    def _entry_in_memory(self, file_path: str, entry: Dict[str, Any]) -> bool:
+        """
+        Check that the chunks a manifest entry records are still in memory
+        
+        Args:
+            file_path: Path of the indexed file
+            entry: Its manifest entry
+            
+        Returns:
+            False if the file had chunks and none of them are left
+        """
+        if entry.get("failed") or not entry.get("chunks"):
+            return True
+        return bool(self.memory_system.get_documents_by_path(file_path))
+        
+    def watch_folder(self, folder_path: str, extensions: Optional[List[str]] = None,
+                     interval: float = 10.0) -> bool:
+        """
+        Keep a folder in sync with memory in the background
+        
+        The folder is re-synced every interval seconds; thanks to the manifest
+        an unchanged folder costs one stat() per file.
+        
+        Args:
+            folder_path: Path to the folder
+            extensions: Optional list of file extensions to include
+            interval: Seconds between syncs
+            
+        Returns:
+            True if a watcher was started, False if the folder is already watched
+        """
+        folder_path = os.path.abspath(folder_path)
+        if folder_path in self.watchers:
+            return False
+            
+        stop_event = threading.Event()
+        self.watchers[folder_path] = stop_event
+        
+        def watch_loop():
+            while not stop_event.is_set():
+                try:
+                    self.add_folder_to_memory(folder_path, extensions)
+                except Exception as e:
+                    self.logger(f"[Memory Error] Failed to sync {folder_path}: {e}")
+                stop_event.wait(interval)
+                
+        threading.Thread(target=watch_loop, name=f"FolderWatcher-{os.path.basename(folder_path)}",
+                         daemon=True).start()
+        self.logger(f"[Memory] Watching {folder_path} (every {interval:g}s)")
+        return True
+    
+    def stop_watching(self, folder_path: Optional[str] = None) -> None:
+        """
+        Stop background syncing
+        
+        Args:
+            folder_path: Folder to stop watching, or None for all folders
+        """
+        folders = [os.path.abspath(folder_path)] if folder_path else list(self.watchers)
+        for folder in folders:
+            stop_event = self.watchers.pop(folder, None)
+            if stop_event:
+                stop_event.set()
+                
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the PDF extraction cache
+        
+        Returns:
+            Dictionary with cache statistics (empty when caching is off)
+        """
+        return self.pdf_ops.get_cache_stats()
+        
+    @staticmethod
+    def _hash_file(file_path: str) -> Optional[str]:
+        """
+        Hash a file's content without reading it into memory at once
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Hex SHA-1 digest, or None if the file cannot be read
+        """
+        digest = hashlib.sha1()
+        try:
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            return None
+        return digest.hexdigest()
+        
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the folder manifest
+        
+        Returns:
+            Manifest dictionary (empty if missing or unreadable)
+        """
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger(f"[Memory Warning] Ignoring unreadable folder manifest: {e}")
+            return {}
+            
+    def _save_manifest(self) -> None:
+        """Write the folder manifest atomically"""
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            temp_path = self.manifest_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except Exception as e:
+            self.logger(f"[Memory Error] Failed to save folder manifest: {e}")
 
-def enhance_memory_system(memory_system: MemorySystem, file_ops: FileOps, enable_ocr: bool = False) -> EnhancedMemoryFileHandler:
+def enhance_memory_system(memory_system: MemorySystem, file_ops: FileOps, enable_ocr: bool = False,
+                          cache_max_bytes: Optional[int] = DEFAULT_CACHE_BYTES) -> EnhancedMemoryFileHandler:
     """
     Create an enhanced memory file handler with improved PDF capabilities
 
@@ -112,6 +326,7 @@ def enhance_memory_system(memory_system: MemorySystem, file_ops: FileOps, enable
         memory_system: MemorySystem instance
         file_ops: FileOps instance
         enable_ocr: Whether to enable OCR for PDF files
+        cache_max_bytes: Size bound of the PDF extraction cache (None or 0 disables it)
     """
 
-    return EnhancedMemoryFileHandler(memory_system, file_ops, enable_ocr=enable_ocr)
+    return EnhancedMemoryFileHandler(memory_system, file_ops, enable_ocr=enable_ocr, cache_max_bytes=cache_max_bytes)
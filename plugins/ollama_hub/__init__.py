@@ -16,6 +16,7 @@ import time
 import pkg_resources
 from typing import Dict, Any, Optional, Callable, List, Type, Union
 from plugins.ollama_hub.core.ollama_client import OllamaClient
+from file_operations.json_store import get_json_store, write_json_atomic
 
 class PluginDependencyError(Exception):
     """
@@ -271,8 +272,7 @@ class IrintaiPlugin:
             os.makedirs(os.path.dirname(self._config_path), exist_ok=True)
             
             # Save merged configuration
-            with open(self._config_path, 'w') as f:
-                json.dump(self._config, f, indent=2)
+            write_json_atomic(self._config_path, self._config, indent=2)
         
         except (IOError, json.JSONDecodeError) as e:
             self.log(
@@ -497,9 +497,8 @@ class IrintaiPlugin:
                 # Validate updated configuration
                 self._validate_configuration()
                 
-                # Save updated configuration
-                with open(self._config_path, 'w') as f:
-                    json.dump(self._config, f, indent=2)
+                # Save updated configuration; rapid updates are written once
+                get_json_store().save(self._config_path, self._config, indent=2)
                 
                 # Optionally trigger reconfiguration
                 self._on_configuration_update()
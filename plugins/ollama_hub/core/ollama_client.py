@@ -4,6 +4,8 @@ Ollama Client - Direct interface to Ollama API
 import os
 import subprocess
 import json
+import codecs
+import threading
 import re  # For stripping ANSI escape codes
 from typing import Dict, Any, Tuple, Optional, Callable
 
@@ -63,6 +65,84 @@ class OllamaClient:
         except Exception as e:
             self.log(f"[Error] Failed to generate response: {e}")
             return False, f"Error: {str(e)}"
+
+    def generate_stream(self, model: str, prompt: str, params: Dict[str, Any] = None,
+                        on_chunk: Optional[Callable[[str], None]] = None,
+                        should_stop: Optional[Callable[[], bool]] = None) -> Tuple[bool, str]:
+        """
+        Generate a response like generate(), delivering output as it is produced
+
+        Args:
+            model: Model name
+            prompt: The prompt to send
+            params: Optional parameters for generation
+            on_chunk: Optional callback receiving each decoded piece of output
+            should_stop: Optional callable; generation is aborted when it returns True
+
+        Returns:
+            Tuple of (success, response)
+        """
+        try:
+            cmd = ["ollama", "run", model]
+            if params:
+                for key, value in params.items():
+                    if key in ["temperature", "top_p", "top_k", "repeat_penalty", "context", "seed"]:
+                        cmd.extend([f"--{key}", str(value)])
+            cmd.append(prompt)
+            self.log(f"[Run] Streaming command: {' '.join(cmd[:3])} (prompt: {len(prompt)} chars)")
+
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=os.environ.copy()
+            )
+
+            # Drain stderr separately so a chatty spinner cannot block stdout
+            stderr_parts = []
+            stderr_thread = threading.Thread(
+                target=lambda: stderr_parts.append(process.stderr.read()),
+                daemon=True
+            )
+            stderr_thread.start()
+
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            clean = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+            output_parts = []
+
+            while True:
+                if should_stop and should_stop():
+                    process.kill()
+                    self.log("[Run] Generation aborted by caller")
+                    break
+                data = process.stdout.read1(4096)
+                if not data:
+                    break
+                text = clean.sub('', decoder.decode(data))
+                if text:
+                    output_parts.append(text)
+                    if on_chunk:
+                        on_chunk(text)
+
+            tail = clean.sub('', decoder.decode(b"", final=True))
+            if tail:
+                output_parts.append(tail)
+                if on_chunk:
+                    on_chunk(tail)
+
+            return_code = process.wait()
+            stderr_thread.join(timeout=1.0)
+            output = "".join(output_parts).strip()
+
+            if return_code != 0:
+                err = b"".join(stderr_parts).decode("utf-8", errors="replace").strip()
+                self.log(f"[Error] Model error: {err}")
+                return False, err or f"Process exited with return code {return_code}"
+            return True, output
+        except Exception as e:
+            self.log(f"[Error] Failed to generate response: {e}")
+            return False, f"Error: {str(e)}"
+
     def list_models(self, remote=False) -> Tuple[bool, Dict[str, Any]]:
         """
         List models available in Ollama
@@ -35,12 +35,9 @@ def integrate_ollama_hub_ui(notebook, plugin_manager, logger):
     elif isinstance(active_plugins, list):
         # If it's a list of plugin names (strings)
         if 'ollama_hub' in active_plugins:
-            # Get the plugin instance
+            # Get the plugin instance (plugins loaded lazily are only instantiated through it)
             if hasattr(plugin_manager, 'get_plugin_instance'):
                 ollama_plugin = plugin_manager.get_plugin_instance('ollama_hub')
-            elif hasattr(plugin_manager, 'plugins'):
-                # Direct access to plugins dictionary
-                ollama_plugin = plugin_manager.plugins.get('ollama_hub')
         # If it's a list of plugin objects
         else:
             for plugin in active_plugins:
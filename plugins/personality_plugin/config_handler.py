@@ -6,6 +6,8 @@ import json
 import time
 from typing import Dict, Any, Optional
 
+from file_operations.json_store import get_json_store
+
 class ConfigHandler:
     """
     Handles configuration loading, saving, and validation for the Personality Plugin
@@ -39,6 +41,11 @@ class ConfigHandler:
             Configuration dictionary
         """
         try:
+            # Read back a save that is still waiting to be written
+            store = get_json_store()
+            if store.has_pending(self.config_path):
+                store.flush(self.config_path)
+                
             # Check if configuration file exists
             if os.path.exists(self.config_path):
                 with open(self.config_path, 'r', encoding='utf-8') as f:
@@ -74,8 +81,9 @@ class ConfigHandler:
             Success flag
         """
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2)
+            # Written atomically in the background; rapid successive saves are coalesced
+            if not get_json_store().save(self.config_path, self.config, indent=2):
+                return False
                 
             self.logger(f"Configuration saved successfully to {self.config_path}", "INFO")
             return True
@@ -16,6 +16,7 @@ from typing import Dict, List, Any, Optional, Callable, Union
 
 # Import the configuration handler
 from plugins.personality_plugin.config_handler import ConfigHandler
+from file_operations.json_store import get_json_store
 
 class PersonalityPlugin:
     """
@@ -216,8 +217,7 @@ class PersonalityPlugin:
                     self._logger("Failed to save configuration", "WARNING")
             else:
                 # Fallback to direct file saving if config handler isn't available
-                with open(self._config_path, 'w', encoding='utf-8') as f:
-                    json.dump(self._config, f, indent=2)
+                get_json_store().save(self._config_path, self._config, indent=2)
                 self._logger("Configuration saved successfully (direct)", "INFO")
         except Exception as e:
             self._logger(f"Failed to save configuration: {e}", "ERROR")
@@ -779,7 +779,7 @@ class Dashboard:
         sources = set()
         source_types = {}
         
-        for doc in self.memory_system.documents:
+        for doc in self.memory_system.iter_documents():
             source = doc.get("source", "Unknown")
             sources.add(source)
             
@@ -433,6 +433,7 @@ class MainWindow:
             return
             
         # Load and index each file
+        duplicates = 0
         for file_path in files:
             # Read the file
             success, content = self.file_ops.read_file(file_path)
@@ -440,6 +441,8 @@ class MainWindow:
             if success:
                 # Add to memory system
                 self.memory_system.add_file_to_index(file_path, content)
+                ingest = getattr(self.memory_system, "last_ingest", {})
+                duplicates += ingest.get("exact_duplicates", 0) + ingest.get("near_duplicates", 0)
                 self.logger.log(f"[Loaded] {os.path.basename(file_path)}")
             else:
                 self.logger.log(f"[Error] Failed to load {file_path}")
@@ -449,10 +452,10 @@ class MainWindow:
             self.memory_panel.refresh_stats()
             
         # Show confirmation
-        messagebox.showinfo(
-            "Files Loaded", 
-            f"Successfully loaded {len(files)} files into memory."
-        )
+        message = f"Successfully loaded {len(files)} files into memory."
+        if duplicates:
+            message += f"\n{duplicates} duplicate chunks were already in memory and skipped."
+        messagebox.showinfo("Files Loaded", message)
         
     def view_logs(self):
         """Open the log viewer"""
@@ -494,7 +497,7 @@ class MainWindow:
         if reflection:
             messagebox.showinfo(
                 "Reflection Generated", 
-                "Session reflection has been saved to data/reflections/session_reflections.json"
+                "Session reflection has been saved to data/reflections/session_reflections.jsonl"
             )
             
     def on_memory_mode_changed(self, event):
@@ -571,12 +574,20 @@ class MainWindow:
         # Save chat session
         self.chat_engine.save_session()
         
+        # Deliver pending settings notifications and stop the observer thread
+        settings_manager = self.core_app.get("settings_manager")
+        if settings_manager:
+            settings_manager.shutdown()
+        
         # Save configuration
         self.config_manager.save_config()
         
         # Deactivate all active plugins
         self.cleanup_plugins()
-        
+
+        # Write out the file search index
+        self.file_ops.close()
+
         # Log shutdown
         self.logger.log("[System] Irintai Assistant shutting down")
         
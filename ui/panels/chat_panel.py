@@ -238,6 +238,11 @@ class ChatPanel:
         self.prompt_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         self.prompt_entry.bind("<Return>", self.submit_prompt)
         
+        # Speculatively retrieve memory context while the user is typing
+        self.prefetch_delay_ms = self.config_manager.get("memory.prefetch_delay_ms", 300) if self.config_manager else 300
+        self._prefetch_after_id = None
+        self.prompt_entry.bind("<KeyRelease>", self.schedule_memory_prefetch)
+        
         # Add submit button
         self.submit_button = ttk.Button(
             input_frame,
@@ -504,12 +509,36 @@ class ChatPanel:
         # Make console read-only again
         self.console.config(state=tk.DISABLED)
         
+    def schedule_memory_prefetch(self, event=None):
+        """Debounce memory pre-retrieval on the draft prompt"""
+        if event is not None and event.keysym in ("Return", "KP_Enter"):
+            return
+            
+        if self._prefetch_after_id is not None:
+            self.frame.after_cancel(self._prefetch_after_id)
+        self._prefetch_after_id = self.frame.after(self.prefetch_delay_ms, self._prefetch_memory)
+        
+    def _prefetch_memory(self):
+        """Hand the current draft to the chat engine for background retrieval"""
+        self._prefetch_after_id = None
+        draft = self.prompt_entry.get().strip()
+        if draft and hasattr(self.chat_engine, "prefetch_memory"):
+            try:
+                self.chat_engine.prefetch_memory(draft)
+            except Exception as e:
+                self.log(f"[Memory Prefetch] Failed to schedule prefetch: {e}")
+        
     def submit_prompt(self, event=None):
         """Submit the user prompt"""
         prompt = self.prompt_entry.get().strip()
         if not prompt:
             return
             
+        # Send-time retrieval takes over from here
+        if self._prefetch_after_id is not None:
+            self.frame.after_cancel(self._prefetch_after_id)
+            self._prefetch_after_id = None
+            
         # Clear the entry
         self.prompt_entry.delete(0, tk.END)
         
@@ -37,12 +37,18 @@ class MemoryPanel:
         # Get OCR setting from unified settings or use default
         ocr_enabled = settings_manager.get_setting("memory.pdf.ocr_enabled", False) if settings_manager else False
         
+        # Size bound of the cache of extracted PDF pages (0 disables it)
+        cache_size_mb = settings_manager.get_setting("memory.pdf.cache_size_mb", 256) if settings_manager else 256
+        self.pdf_cache_bytes = int(cache_size_mb * 1024 * 1024)
+        
         # Create enhanced memory file handler
-        self.enhanced_memory = enhance_memory_system(memory_system, file_ops, enable_ocr=ocr_enabled)
+        self.enhanced_memory = enhance_memory_system(memory_system, file_ops, enable_ocr=ocr_enabled,
+                                                     cache_max_bytes=self.pdf_cache_bytes)
         
         # Register for OCR setting changes if settings_manager is available
         if settings_manager:
-            settings_manager.register_observer("memory.pdf.ocr_enabled", self._on_ocr_setting_changed)
+            settings_manager.register_observer("memory.pdf.ocr_enabled", self._on_ocr_setting_changed,
+                                               widget=parent)
 
         # Create the main frame
         self.frame = ttk.Frame(parent)
@@ -230,7 +236,8 @@ class MemoryPanel:
         """Toggle OCR functionality"""
         ocr_enabled = self.ocr_enabled_var.get()
         # Create a new enhanced memory handler with the updated OCR setting
-        self.enhanced_memory = enhance_memory_system(self.memory_system, self.file_ops, enable_ocr=ocr_enabled)
+        self.enhanced_memory = enhance_memory_system(self.memory_system, self.file_ops, enable_ocr=ocr_enabled,
+                                                     cache_max_bytes=self.pdf_cache_bytes)
         self.log(f"[Memory] OCR for PDF processing: {'Enabled' if ocr_enabled else 'Disabled'}")
         
     def check_ocr_installation(self):
@@ -506,7 +513,7 @@ class MemoryPanel:
             
         # Group documents by source
         sources = {}
-        for doc in self.memory_system.documents:
+        for doc in self.memory_system.iter_documents():
             source = doc.get("source", "Unknown")
             file_type = os.path.splitext(source)[1] if "." in source else "Unknown"
             timestamp = doc.get("timestamp", "Unknown")
@@ -549,7 +556,7 @@ class MemoryPanel:
         
         # Find all chunks for this source
         chunks = []
-        for doc in self.memory_system.documents:
+        for doc in self.memory_system.iter_documents():
             if doc.get("source") == source:
                 chunks.append(doc)
                 
@@ -686,12 +693,19 @@ class MemoryPanel:
         ttk.Label(progress_window, textvariable=status_var).pack(pady=5)
         
         def load_thread():
-            # Find all supported files in the folder
-            files = []
-            for ext in extensions:
-                files.extend(self.file_ops.get_files_by_type(folder, ext))
+            def report_progress(done, total, file_path):
+                progress_window.nametowidget(progress_window.winfo_children()[1]).config(maximum=max(total, 1))
+                progress_var.set(done)
+                status_var.set(f"Loading {os.path.basename(file_path)}" if file_path else "Complete")
+                progress_window.update()
                 
-            if not files:
+            # Only new or changed files are loaded; files deleted from the folder are dropped
+            processed, successful = self.enhanced_memory.add_folder_to_memory(
+                folder, extensions, progress_callback=report_progress
+            )
+            sync = self.enhanced_memory.last_sync
+            
+            if not processed and not sync["removed"] and not sync["unchanged"]:
                 progress_window.destroy()
                 messagebox.showinfo(
                     "No Files Found",
@@ -699,28 +713,6 @@ class MemoryPanel:
                 )
                 return
                 
-            # Set maximum value for progress bar
-            progress_window.nametowidget(progress_window.winfo_children()[1]).config(maximum=len(files))
-            
-            # Process each file with our enhanced handler
-            successful = 0
-            for i, file_path in enumerate(files):
-                status_var.set(f"Loading {os.path.basename(file_path)}")
-                progress_var.set(i)
-                progress_window.update()
-                
-                # Use our enhanced memory handler which routes PDFs through enhanced processing
-                if self.enhanced_memory.add_file_to_memory(file_path):
-                    successful += 1
-                    self.log(f"[Loaded] {os.path.basename(file_path)}")
-                else:
-                    self.log(f"[Error] Failed to load {file_path}")
-                    
-            # Finish up
-            progress_var.set(len(files))
-            status_var.set("Complete")
-            progress_window.update()
-            
             # Save the index
             self.memory_system.save_index()
             
@@ -733,7 +725,8 @@ class MemoryPanel:
             # Show confirmation
             messagebox.showinfo(
                 "Files Loaded", 
-                f"Successfully loaded {successful} of {len(files)} files into memory."
+                f"Successfully loaded {successful} of {processed} new or changed files into memory.\n"
+                f"{sync['unchanged']} files were unchanged and {sync['removed']} deleted files were removed."
             )
             
         threading.Thread(target=load_thread, daemon=True).start()
@@ -869,7 +862,7 @@ class MemoryPanel:
         
         # Find path for this source
         path = None
-        for doc in self.memory_system.documents:
+        for doc in self.memory_system.iter_documents():
             if doc.get("source") == source and "path" in doc:
                 path = doc["path"]
                 break
@@ -913,29 +906,21 @@ class MemoryPanel:
         if not response:
             return
             
-        # Process each selected item
+        # Collect the sources of the selected rows (the source is the first column)
+        sources = []
         for item_id in selected:
-            # Get the full path for the selected item
-            parent_id = self.docs_tree.parent(item_id)
-            
-            # Only process leaf nodes (actual documents, not categories)
-            if not self.docs_tree.get_children(item_id):
-                # Get the document ID from the item
-                doc_id = self.docs_tree.item(item_id, "text")
-                source = doc_id
-                
-                # If it's a child node, combine with parent to get full source
-                if parent_id:
-                    source = self.docs_tree.item(parent_id, "text") + "/" + doc_id
+            values = self.docs_tree.item(item_id, "values")
+            if values:
+                sources.append(values[0])
                 
-                # Remove from memory system
-                if self.memory_system.remove_document(source):
-                    self.log(f"[Memory] Removed document: {source}")
-                else:
-                    self.log(f"[Memory Error] Failed to remove document: {source}")
+        # Remove all selected sources in one pass; the memory system persists the removal
+        removed = self.memory_system.remove_documents(sources)
+        if removed:
+            self.log(f"[Memory] Removed {removed} chunks from {len(sources)} document(s)")
+        else:
+            self.log(f"[Memory Error] Failed to remove document(s): {', '.join(sources)}")
                     
-        # Save changes and refresh view
-        self.memory_system.save_index()
+        # Refresh view
         self.refresh_stats()
         
     def view_document_info(self):
@@ -962,7 +947,7 @@ class MemoryPanel:
                 
             # Find document in memory system
             doc_info = None
-            for doc in self.memory_system.documents:
+            for doc in self.memory_system.iter_documents():
                 if doc.get("source") == source:
                     doc_info = doc
                     break
@@ -1372,13 +1357,13 @@ class MemoryPanel:
             # Get metadata
             metadata = {
                 "index_path": self.memory_system.index_path,
-                "document_count": len(self.memory_system.documents),
+                "document_count": self.memory_system.count_documents(),
                 "last_updated": self.memory_system.last_updated,
                 "sources": {}
             }
             
             # Group documents by source
-            for doc in self.memory_system.documents:
+            for doc in self.memory_system.iter_documents():
                 source = doc.get("source", "Unknown")
                 if source in metadata["sources"]:
                     metadata["sources"][source]["chunk_count"] += 1
@@ -1481,29 +1466,21 @@ class MemoryPanel:
         if not response:
             return
             
-        # Process each selected item
+        # Collect the sources of the selected rows (the source is the first column)
+        sources = []
         for item_id in selected:
-            # Get the full path for the selected item
-            parent_id = self.docs_tree.parent(item_id)
-            
-            # Only process leaf nodes (actual documents, not categories)
-            if not self.docs_tree.get_children(item_id):
-                # Get the document ID from the item
-                doc_id = self.docs_tree.item(item_id, "text")
-                source = doc_id
+            values = self.docs_tree.item(item_id, "values")
+            if values:
+                sources.append(values[0])
                 
-                # If it's a child node, combine with parent to get full source
-                if parent_id:
-                    source = self.docs_tree.item(parent_id, "text") + "/" + doc_id
-                
-                # Remove from memory system
-                if self.memory_system.remove_document(source):
-                    self.log(f"[Memory] Removed document: {source}")
-                else:
-                    self.log(f"[Memory Error] Failed to remove document: {source}")
+        # Remove all selected sources in one pass; the memory system persists the removal
+        removed = self.memory_system.remove_documents(sources)
+        if removed:
+            self.log(f"[Memory] Removed {removed} chunks from {len(sources)} document(s)")
+        else:
+            self.log(f"[Memory Error] Failed to remove document(s): {', '.join(sources)}")
                     
-        # Save changes and refresh view
-        self.memory_system.save_index()
+        # Refresh view
         self.refresh_stats()
         
     def view_document_info(self):
@@ -1530,7 +1507,7 @@ class MemoryPanel:
                 
             # Find document in memory system
             doc_info = None
-            for doc in self.memory_system.documents:
+            for doc in self.memory_system.iter_documents():
                 if doc.get("source") == source:
                     doc_info = doc
                     break
@@ -1555,5 +1532,6 @@ class MemoryPanel:
     def _on_ocr_setting_changed(self, value):
         """Handler for when OCR setting changes in unified settings panel"""
         # Update the enhanced memory handler with new OCR setting
-        self.enhanced_memory = enhance_memory_system(self.memory_system, self.file_ops, enable_ocr=value)
+        self.enhanced_memory = enhance_memory_system(self.memory_system, self.file_ops, enable_ocr=value,
+                                                     cache_max_bytes=self.pdf_cache_bytes)
         self.log(f"[Memory] OCR for PDF processing: {'Enabled' if value else 'Disabled'}")
\ No newline at end of file